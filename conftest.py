@@ -0,0 +1,73 @@
+"""
+Test Ortamı - Geçici Veritabanı
+
+Davranış testleri (stok defteri, satış kuyruğu, numara dağıtıcı, sorgu
+bütçeleri) her test için boş bir SQLite dosyasında çalışır. Süreç içi
+defter, önbellek ve sayaç durumu test öncesi ve sonrası sıfırlanır;
+gerçek veritabanına (data/cafeflow.db) dokunulmaz.
+"""
+
+import pytest
+from src.database import DatabaseEngine, DatabaseConfig, SequenceAllocator, init_database
+from src.models import Category, Product, Ingredient, Recipe
+from src.modules.cost_cache import ProductCostCache
+from src.modules.catalog import CatalogCache
+from src.modules.report_cache import ReportCache
+from src.modules.sale_queue import SaleIngestionQueue
+from src.modules.stock_ledger import StockLedger
+
+
+def _reset_process_state():
+    """Süreç içi defter, önbellek ve sayaçları boşalt"""
+    StockLedger._products = {}
+    StockLedger._ingredients = {}
+    StockLedger._reserved_products = {}
+    StockLedger._reserved_ingredients = {}
+    SequenceAllocator.reset()
+    ProductCostCache.clear()
+    CatalogCache.invalidate()
+    ReportCache.clear()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Şeması oluşturulmuş geçici veritabanında oturum"""
+    DatabaseEngine.dispose()
+    monkeypatch.setattr(DatabaseConfig, "DB_NAME", str(tmp_path / "cafeflow.db"))
+    _reset_process_state()
+    assert init_database()
+
+    session = DatabaseEngine.create_session()
+    yield session
+    session.close()
+
+    # Arka plan iş parçacıkları geçici veritabanı kapanmadan durdurulur
+    SaleIngestionQueue.stop()
+    StockLedger.stop()
+    DatabaseEngine.dispose()
+    _reset_process_state()
+
+
+@pytest.fixture
+def latte(db):
+    """
+    Tek reçeteli örnek ürün: Latte (200 ml süt), stok 100 adet; Süt 10 l
+
+    Returns:
+        tuple: (product_id, ingredient_id)
+    """
+    category = Category(name="Sıcak İçecekler", code="HOT_DRINK")
+    db.add(category)
+    db.flush()
+
+    product = Product(
+        name="Latte", code="LATTE", category_id=category.id,
+        price=50, kdv_rate=10, quantity=100
+    )
+    milk = Ingredient(name="Süt", unit="l", cost_per_unit=30, quantity=10)
+    db.add_all([product, milk])
+    db.flush()
+
+    db.add(Recipe(product_id=product.id, ingredient_id=milk.id, quantity=200, unit="ml"))
+    db.commit()
+    return product.id, milk.id
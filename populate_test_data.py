@@ -4,15 +4,14 @@
 Örnek malzeme, ürün ve reçete oluşturur
 """
 
+import pandas as pd
 from src.database import DatabaseEngine
-from src.models import Ingredient, Product, Recipe
-from decimal import Decimal
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from src.models import Category
+from src.modules.catalog_import import CatalogImporter
 
 
 def populate_test_data():
-    """Test verisi ekle"""
+    """Test verisi ekle (tek transaction, toplu upsert)"""
     
     db = DatabaseEngine.create_session()
     
@@ -21,6 +20,9 @@ def populate_test_data():
         print("🌱 Test Verisi Yükleniyor...")
         print("=" * 60)
         
+        # Ürünlerin kategorisi boş veritabanında da bulunmalı
+        Category.create_default_categories(db)
+        
         # ============================================================
         # MALZEME VERİSİ
         # ============================================================
@@ -38,121 +40,99 @@ def populate_test_data():
             ("Çay", "g", 0.025),
         ]
         
-        ingredients = {}
-        
-        for name, unit, cost in ingredients_data:
-            existing = db.query(Ingredient).filter(Ingredient.name == name).first()
-            if not existing:
-                ing = Ingredient(
-                    name=name,
-                    unit=unit,
-                    cost_per_unit=cost,
-                    quantity=1000 if unit == "g" else 5000 if unit == "ml" else 100
-                )
-                db.add(ing)
-                db.flush()
-                ingredients[name] = ing
-                print(f"✓ Malzeme: {name} ({unit}) - ₺{cost}")
-            else:
-                ingredients[name] = existing
-        
-        db.commit()
+        ingredients = pd.DataFrame([
+            {
+                "name": name,
+                "unit": unit,
+                "cost_per_unit": cost,
+                "quantity": 1000 if unit == "g" else 5000 if unit == "ml" else 100,
+            }
+            for name, unit, cost in ingredients_data
+        ])
         
         # ============================================================
         # ÜRÜN VERİSİ
         # ============================================================
         
-        # Kahve kategorisini al
-        category = db.query(__import__('src.models', fromlist=['Category']).Category).filter_by(name="Sıcak İçecekler").first()
-        
-        if category:
-            products_data = [
-                ("Sade Kahve", "KAHVE-001", 30.0, 8.0, "İnce öğütülmüş sade kahve"),
-                ("Tatlılı Kahve", "KAHVE-002", 35.0, 8.0, "Şekerli sade kahve"),
-                ("Sütlü Kahve", "KAHVE-003", 40.0, 8.0, "Kahve + Süt karışımı"),
-                ("Türk Çayı", "ÇAY-001", 15.0, 8.0, "Sıcak türk çayı"),
-                ("Limonlu Çay", "ÇAY-002", 18.0, 8.0, "Çay + Limon"),
-            ]
-            
-            products = {}
-            
-            for name, code, margin, kdv, desc in products_data:
-                existing = db.query(Product).filter(Product.code == code).first()
-                if not existing:
-                    prod = Product(
-                        name=name,
-                        code=code,
-                        category_id=category.id,
-                        price=0,
-                        quantity=100,
-                        min_stock_level=10,
-                        profit_margin_value=Decimal(str(margin)),
-                        kdv_rate=Decimal(str(kdv)),
-                        description=desc
-                    )
-                    db.add(prod)
-                    db.flush()
-                    products[name] = prod
-                    print(f"✓ Ürün: {name} (Kar Marjı: %{margin}, KDV: %{kdv})")
-                else:
-                    products[name] = existing
-            
-            db.commit()
-            
-            # ============================================================
-            # REÇETE VERİSİ
-            # ============================================================
-            
-            recipes_data = [
-                ("Sade Kahve", [
-                    ("Kahve Çekirdeği", 7, "g"),
-                    ("Su", 150, "ml"),
-                    ("Bardak", 1, "adet"),
-                ]),
-                ("Tatlılı Kahve", [
-                    ("Kahve Çekirdeği", 7, "g"),
-                    ("Su", 150, "ml"),
-                    ("Şeker", 5, "g"),
-                    ("Bardak", 1, "adet"),
-                ]),
-                ("Sütlü Kahve", [
-                    ("Kahve Çekirdeği", 5, "g"),
-                    ("Su", 100, "ml"),
-                    ("Süt", 100, "ml"),
-                    ("Şeker", 3, "g"),
-                    ("Bardak", 1, "adet"),
-                ]),
-                ("Türk Çayı", [
-                    ("Çay", 3, "g"),
-                    ("Su", 250, "ml"),
-                    ("Bardak", 1, "adet"),
-                ]),
-                ("Limonlu Çay", [
-                    ("Çay", 3, "g"),
-                    ("Su", 250, "ml"),
-                    ("Limon", 10, "g"),
-                    ("Bardak", 1, "adet"),
-                ]),
-            ]
-            
-            for product_name, recipe_items in recipes_data:
-                if products.get(product_name):
-                    prod = products[product_name]
-                    existing_recipes = db.query(Recipe).filter_by(product_id=prod.id).count()
-                    
-                    if existing_recipes == 0:
-                        for ing_name, qty, unit in recipe_items:
-                            if ingredients.get(ing_name):
-                                recipe = Recipe(
-                                    product_id=prod.id,
-                                    ingredient_id=ingredients[ing_name].id,
-                                    quantity=qty,
-                                    unit=unit
-                                )
-                                db.add(recipe)
-                        
-                        db.commit()
-                        print(f"✓ Reçete: {product_name}")
+        products_data = [
+            ("Sade Kahve", "KAHVE-001", 60.0, 30.0, 8.0, "İnce öğütülmüş sade kahve"),
+            ("Tatlılı Kahve", "KAHVE-002", 65.0, 35.0, 8.0, "Şekerli sade kahve"),
+            ("Sütlü Kahve", "KAHVE-003", 75.0, 40.0, 8.0, "Kahve + Süt karışımı"),
+            ("Türk Çayı", "ÇAY-001", 20.0, 15.0, 8.0, "Sıcak türk çayı"),
+            ("Limonlu Çay", "ÇAY-002", 25.0, 18.0, 8.0, "Çay + Limon"),
+        ]
+        
+        products = pd.DataFrame([
+            {
+                "code": code,
+                "name": name,
+                "category": "Sıcak İçecekler",
+                "price": price,
+                "kdv_rate": kdv,
+                "profit_margin": margin,
+                "description": desc,
+                "quantity": 100,
+            }
+            for name, code, price, margin, kdv, desc in products_data
+        ])
+        
+        # ============================================================
+        # REÇETE VERİSİ
+        # ============================================================
+        
+        recipes_data = [
+            ("KAHVE-001", [
+                ("Kahve Çekirdeği", 7, "g"),
+                ("Su", 150, "ml"),
+                ("Bardak", 1, "adet"),
+            ]),
+            ("KAHVE-002", [
+                ("Kahve Çekirdeği", 7, "g"),
+                ("Su", 150, "ml"),
+                ("Şeker", 5, "g"),
+                ("Bardak", 1, "adet"),
+            ]),
+            ("KAHVE-003", [
+                ("Kahve Çekirdeği", 5, "g"),
+                ("Su", 100, "ml"),
+                ("Süt", 100, "ml"),
+                ("Şeker", 3, "g"),
+                ("Bardak", 1, "adet"),
+            ]),
+            ("ÇAY-001", [
+                ("Çay", 3, "g"),
+                ("Su", 250, "ml"),
+                ("Bardak", 1, "adet"),
+            ]),
+            ("ÇAY-002", [
+                ("Çay", 3, "g"),
+                ("Su", 250, "ml"),
+                ("Limon", 10, "g"),
+                ("Bardak", 1, "adet"),
+            ]),
+        ]
+        
+        recipes = pd.DataFrame([
+            {"product_code": code, "ingredient": ing_name, "quantity": qty, "unit": unit}
+            for code, items in recipes_data
+            for ing_name, qty, unit in items
+        ])
+        
+        report = CatalogImporter.import_frames(
+            db,
+            ingredients=ingredients,
+            products=products,
+            recipes=recipes
+        )
+        
+        for error in report["errors"]:
+            print(f"✗ {error}")
+        if not report["written"]:
+            return False
+        
+        print(f"✓ Malzeme: {report['ingredients']['created']} yeni, {report['ingredients']['updated']} güncellendi")
+        print(f"✓ Ürün: {report['products']['created']} yeni, {report['products']['updated']} güncellendi")
+        print(f"✓ Reçete satırı: {report['recipes']['created']} yeni, {report['recipes']['updated']} güncellendi")
         
         print("=" * 60)
         print("✓ Test verisi başarıyla yüklendi!")
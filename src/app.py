@@ -6,6 +6,7 @@ Cafe Muhasebe ve Operasyon Yönetim Sistemi
 
 import streamlit as st
 import sys
+import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
@@ -16,13 +17,15 @@ if str(project_root) not in sys.path:
 
 # İçeri aktarmalar
 from src.database import DatabaseEngine, init_database, populate_initial_data
-from src.models import Category, Product, Sale, Expense, StockMovement, ExpenseCategory
+from src.models import StockMovement, ExpenseCategory
 from src.modules.inventory import render_inventory_page
 from src.modules.expenses import render_expenses_page
 from src.modules.sales import render_sales_page
+from src.modules.reports import ReportsManager
+from src.modules.report_cache import ReportCache
 from src.modules.reports_ui import render_reports_page
 from src.modules.settings import render_settings_page
-from src.utils.locale_utils import format_currency, format_datetime, format_date, format_time
+from src.utils.locale_utils import format_datetime, format_date, format_time, format_frame
 from src.config.locale_config import configure_tr_locale, log_locale_info
 
 
@@ -172,23 +175,20 @@ def page_dashboard():
     st.title("📊 Dashboard")
     st.markdown("---")
     
-    # Veritabanı oturumu al
-    db = DatabaseEngine.create_session()
+    # Salt okunur oturum al (kasa yazmalarıyla çakışmaz)
+    db = DatabaseEngine.create_read_session()
     
     try:
-        # İstatistikleri hesapla
-        total_categories = db.query(Category).count()
-        total_products = db.query(Product).count()
-        total_sales = db.query(Sale).count()
-        total_expenses = db.query(Expense).count()
+        # Tüm göstergeler tek anlık görüntüde (veri sürümü başına önbellekli)
+        snapshot = ReportCache.call(ReportsManager.get_dashboard_snapshot, db)
+        counts = snapshot['counts']
         
-        # Aktif ürünler
-        active_products = db.query(Product).filter(Product.is_active == True).count()
-        
-        # Düşük stok ürünleri
-        low_stock_products = db.query(Product).filter(
-            Product.quantity <= Product.min_stock_level
-        ).count()
+        total_categories = counts['categories']
+        total_products = counts['products']
+        total_sales = counts['sales']
+        total_expenses = counts['expenses']
+        active_products = counts['active_products']
+        low_stock_products = counts['low_stock_products']
         
         # Metrikler satırı 1
         col1, col2, col3, col4 = st.columns(4)
@@ -214,22 +214,23 @@ def page_dashboard():
         # Son satışlar
         st.subheader("📊 Son Satışlar")
         
-        last_sales = db.query(Sale).order_by(Sale.created_at.desc()).limit(10).all()
+        last_sales = snapshot['recent_sales']
         
         if last_sales:
-            sales_data = []
-            for sale in last_sales:
-                sales_data.append({
-                    "Satış No": sale.sale_number,
-                    "Ürün": sale.product.name if sale.product else "N/A",
-                    "Miktar": sale.quantity,
-                    "Tutar": format_currency(float(sale.total_price)),
-                    "Ödeme": sale.payment_method,
-                    "Tarih": sale.created_at.strftime("%d.%m.%Y %H:%M"),
-                })
+            sales_df = pd.DataFrame([
+                {
+                    "Satış No": sale['sale_number'],
+                    "Ürün": sale['product'] or "N/A",
+                    "Miktar": sale['quantity'],
+                    "Tutar": sale['total_price'],
+                    "Ödeme": sale['payment_method'],
+                    "Tarih": sale['created_at'],
+                }
+                for sale in last_sales
+            ])
             
             st.dataframe(
-                sales_data,
+                format_frame(sales_df, currency=("Tutar",), datetime_columns={"Tarih": "%d.%m.%Y %H:%M"}),
                 use_container_width=True,
                 hide_index=True
             )
@@ -239,20 +240,16 @@ def page_dashboard():
         # Düşük stok malzemeleri
         st.subheader("⚠️ Düşük Stok Malzemeleri")
         
-        from src.models import Ingredient
-        low_stock_ingredients = db.query(Ingredient).filter(
-            Ingredient.quantity < 100,
-            Ingredient.is_active == True
-        ).order_by(Ingredient.quantity).limit(10).all()
+        low_stock_ingredients = snapshot['low_stock_ingredients']
         
         if low_stock_ingredients:
             stock_data = []
             for ingredient in low_stock_ingredients:
                 stock_data.append({
-                    "Malzeme": ingredient.name,
-                    "Mevcut": f"{ingredient.quantity:.2f} {ingredient.unit}",
-                    "Eşik": "100",
-                    "Durum": "⚠️ Kritik" if ingredient.quantity < 50 else "⚠️ Düşük",
+                    "Malzeme": ingredient['name'],
+                    "Mevcut": f"{ingredient['quantity']:.2f} {ingredient['unit']}",
+                    "Eşik": f"{ingredient['threshold']:g}",
+                    "Durum": "⚠️ Kritik" if ingredient['quantity'] < ingredient['threshold'] / 2 else "⚠️ Düşük",
                 })
             
             st.dataframe(
@@ -4,14 +4,23 @@
 Veritabanı bağlantısı, ORM konfigürasyonu ve inisiyalizasyonu
 """
 
-from src.database.db_connection import DatabaseEngine, DatabaseConfig, get_db
+from src.database.db_connection import DatabaseEngine, DatabaseConfig, get_db, get_read_db
 from src.database.init_db import init_database, populate_initial_data, reset_database
+from src.database.sequences import SequenceAllocator
+from src.database.query_counter import StatementCounter, assert_max_statements
+from src.database.pagination import KeysetPage, keyset_paginate
 
 __all__ = [
     "DatabaseEngine",
     "DatabaseConfig",
     "get_db",
+    "get_read_db",
     "init_database",
     "populate_initial_data",
     "reset_database",
+    "SequenceAllocator",
+    "StatementCounter",
+    "assert_max_statements",
+    "KeysetPage",
+    "keyset_paginate",
 ]
@@ -6,10 +6,11 @@ ORM (SQLAlchemy) operasyonlarını yönetir.
 """
 
 import os
+from pathlib import Path
 from typing import Generator
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool
 from dotenv import load_dotenv
 import logging
 
@@ -30,6 +31,63 @@ class DatabaseConfig:
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_PORT = os.getenv("DB_PORT", "5432")
     
+    # PostgreSQL okuma replikası (isteğe bağlı, raporlar için)
+    DB_READ_URL = os.getenv("DB_READ_URL", "")
+    
+    # Bağlantı havuzu
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    
+    # SQLite performans profili
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negatif = KiB (64 MB)
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bayt
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milisaniye
+    
+    @staticmethod
+    def get_read_database_url():
+        """
+        Salt okunur (raporlama) bağlantısının URL'sini döndür
+        
+        Returns:
+            str | None: Ayrı bir okuma bağlantısı yoksa None
+        """
+        if DatabaseConfig.DB_TYPE == "sqlite":
+            if DatabaseConfig.is_memory_database():
+                return None
+            db_path = Path(DatabaseConfig.DB_NAME).resolve().as_uri()
+            return f"sqlite:///{db_path}?mode=ro&uri=true"
+        
+        return DatabaseConfig.DB_READ_URL or None
+    
+    @staticmethod
+    def is_memory_database() -> bool:
+        """SQLite bellek içi veritabanı mı? (testler için)"""
+        return DatabaseConfig.DB_TYPE == "sqlite" and DatabaseConfig.DB_NAME in ("", ":memory:")
+    
+    @staticmethod
+    def get_sqlite_pragmas() -> dict:
+        """
+        Her SQLite bağlantısında uygulanacak PRAGMA ayarları
+        
+        Returns:
+            dict: PRAGMA adı -> değer
+        """
+        pragmas = {
+            "foreign_keys": "ON",
+            "busy_timeout": DatabaseConfig.SQLITE_BUSY_TIMEOUT,
+            "synchronous": DatabaseConfig.SQLITE_SYNCHRONOUS,
+            "cache_size": DatabaseConfig.SQLITE_CACHE_SIZE,
+            "mmap_size": DatabaseConfig.SQLITE_MMAP_SIZE,
+        }
+        
+        # Bellek içi veritabanında WAL desteklenmez
+        if not DatabaseConfig.is_memory_database():
+            pragmas["journal_mode"] = DatabaseConfig.SQLITE_JOURNAL_MODE
+        
+        return pragmas
+    
     @staticmethod
     def get_database_url():
         """
@@ -58,6 +116,8 @@ class DatabaseEngine:
     
     _engine = None
     _SessionLocal = None
+    _read_engine = None
+    _ReadSessionLocal = None
     
     @classmethod
     def get_engine(cls):
@@ -72,32 +132,94 @@ class DatabaseEngine:
             
             # SQLite için özel ayarlar
             if DatabaseConfig.DB_TYPE == "sqlite":
-                cls._engine = create_engine(
+                cls._engine = cls._create_sqlite_engine(
                     db_url,
-                    connect_args={"check_same_thread": False},
-                    poolclass=StaticPool,
-                    echo=False  # SQL sorgularını yazdırmak için True yap
+                    DatabaseConfig.get_sqlite_pragmas()
                 )
-                
-                # SQLite'ta foreign key desteğini etkinleştir
-                @event.listens_for(cls._engine, "connect")
-                def set_sqlite_pragma(dbapi_conn, connection_record):
-                    cursor = dbapi_conn.cursor()
-                    cursor.execute("PRAGMA foreign_keys=ON")
-                    cursor.close()
             else:
                 # PostgreSQL için ayarlar
                 cls._engine = create_engine(
                     db_url,
                     pool_pre_ping=True,
-                    pool_size=5,
-                    max_overflow=10
+                    pool_size=DatabaseConfig.DB_POOL_SIZE,
+                    max_overflow=DatabaseConfig.DB_MAX_OVERFLOW
                 )
             
             logger.info(f"✓ Veritabanı engine oluşturuldu: {DatabaseConfig.DB_TYPE}")
         
         return cls._engine
     
+    @classmethod
+    def get_read_engine(cls):
+        """
+        Salt okunur (raporlama) engine'i al veya oluştur
+        
+        SQLite'ta aynı dosyaya mode=ro URI bağlantısı, PostgreSQL'de
+        DB_READ_URL tanımlıysa okuma replikası kullanılır. Aksi halde
+        ana engine döndürülür.
+        
+        Returns:
+            Engine: SQLAlchemy Engine nesnesi
+        """
+        if cls._read_engine is None:
+            read_url = DatabaseConfig.get_read_database_url()
+            
+            if read_url is None:
+                cls._read_engine = cls.get_engine()
+            elif DatabaseConfig.DB_TYPE == "sqlite":
+                # journal_mode salt okunur bağlantıdan değiştirilemez
+                pragmas = DatabaseConfig.get_sqlite_pragmas()
+                pragmas.pop("journal_mode", None)
+                pragmas["query_only"] = "ON"
+                cls._read_engine = cls._create_sqlite_engine(read_url, pragmas)
+                logger.info("✓ Salt okunur veritabanı engine oluşturuldu: sqlite (mode=ro)")
+            else:
+                cls._read_engine = create_engine(
+                    read_url,
+                    pool_pre_ping=True,
+                    pool_size=DatabaseConfig.DB_POOL_SIZE,
+                    max_overflow=DatabaseConfig.DB_MAX_OVERFLOW
+                )
+                logger.info("✓ Salt okunur veritabanı engine oluşturuldu: replika")
+        
+        return cls._read_engine
+    
+    @staticmethod
+    def _create_sqlite_engine(db_url: str, pragmas: dict):
+        """SQLite engine'i havuz ve PRAGMA profiliyle oluştur"""
+        if DatabaseConfig.is_memory_database():
+            # Bellek içi veritabanı tek bağlantıda yaşar
+            pool_args = {"poolclass": StaticPool}
+        else:
+            # Her oturum kendi bağlantısını havuzdan alır; WAL ile
+            # okuyucular (raporlar) yazarları (kasa) bloklamaz
+            pool_args = {
+                "poolclass": QueuePool,
+                "pool_size": DatabaseConfig.DB_POOL_SIZE,
+                "max_overflow": DatabaseConfig.DB_MAX_OVERFLOW,
+                "pool_pre_ping": True,
+            }
+        
+        engine = create_engine(
+            db_url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": DatabaseConfig.SQLITE_BUSY_TIMEOUT / 1000,
+            },
+            echo=False,  # SQL sorgularını yazdırmak için True yap
+            **pool_args
+        )
+        
+        # SQLite performans profili (foreign key, WAL, önbellek, mmap, ...)
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragma(dbapi_conn, connection_record):
+            cursor = dbapi_conn.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+        
+        return engine
+    
     @classmethod
     def get_session_factory(cls):
         """
@@ -145,9 +267,56 @@ class DatabaseEngine:
         SessionLocal = cls.get_session_factory()
         return SessionLocal()
     
+    @classmethod
+    def get_read_session_factory(cls):
+        """
+        Salt okunur oturum fabrikası al (raporlar ve dashboard için)
+        
+        Returns:
+            sessionmaker: SQLAlchemy sessionmaker nesnesi
+        """
+        if cls._ReadSessionLocal is None:
+            cls._ReadSessionLocal = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=cls.get_read_engine()
+            )
+        
+        return cls._ReadSessionLocal
+    
+    @classmethod
+    def get_read_session(cls) -> Generator[Session, None, None]:
+        """
+        Yeni bir salt okunur oturum al
+        
+        Yields:
+            Session: Salt okunur veritabanı oturumu
+        """
+        db = cls.get_read_session_factory()()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    @classmethod
+    def create_read_session(cls) -> Session:
+        """
+        Yeni bir salt okunur oturum oluştur (context manager olmadan)
+        
+        Returns:
+            Session: SQLAlchemy Session nesnesi
+        """
+        return cls.get_read_session_factory()()
+    
     @classmethod
     def dispose(cls):
         """Veritabanı bağlantılarını kapat"""
+        if cls._read_engine is not None:
+            if cls._read_engine is not cls._engine:
+                cls._read_engine.dispose()
+            cls._read_engine = None
+            cls._ReadSessionLocal = None
+        
         if cls._engine is not None:
             cls._engine.dispose()
             cls._engine = None
@@ -169,6 +338,20 @@ def get_db() -> Generator[Session, None, None]:
     yield from DatabaseEngine.get_session()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Salt okunur veritabanı oturumu (raporlama sorguları için)
+    
+    Örnek kullanım:
+        db = next(get_read_db())
+        trend = ReportsManager.get_sales_trend(db)
+    
+    Yields:
+        Session: Salt okunur veritabanı oturumu
+    """
+    yield from DatabaseEngine.get_read_session()
+
+
 # Test fonksiyonu
 def test_connection():
     """Veritabanı bağlantısını test et"""
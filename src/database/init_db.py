@@ -4,14 +4,32 @@
 Veritabanı şemasını oluşturur ve varsayılan verilerle doldurur
 """
 
+import sys
 import logging
-from src.database.db_connection import DatabaseEngine
-from src.models import Base, Category, ExpenseCategory
+from datetime import date, datetime, timedelta
+from sqlalchemy import inspect, func, select
+from src.database.db_connection import DatabaseEngine, DatabaseConfig
+from src.models import (
+    Base, Category, ExpenseCategory, DailyRollup, Sale, Expense, Product, IngredientSnapshot
+)
 from src.models.base import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
+# Yönetilen indeksler: (indeks adı, tablo, kolonlar)
+# Rapor ve listeleme sorgularının created_at aralık filtreleri için
+MANAGED_INDEXES = [
+    ("ix_sales_created_at", "sales", ("created_at",)),
+    ("ix_sales_product_created_at", "sales", ("product_id", "created_at")),
+    ("ix_sales_payment_created_at", "sales", ("payment_method", "created_at")),
+    ("ix_expenses_created_at", "expenses", ("created_at",)),
+    ("ix_expenses_category_created_at", "expenses", ("category", "created_at")),
+    ("ix_stock_movements_created_at", "stock_movements", ("created_at",)),
+    ("ix_recipes_product_id", "recipes", ("product_id",)),
+]
+
+
 def init_database():
     """
     Veritabanı şemasını oluştur
@@ -20,16 +38,152 @@ def init_database():
     try:
         engine = DatabaseEngine.get_engine()
         
+        # Özet tablosu yeni mi oluşturulacak? (mevcut veritabanında backfill için)
+        rollups_missing = not inspect(engine).has_table(DailyRollup.__tablename__)
+        # Malzeme hareket defteri yeni mi? (mevcut stoklar başlangıç görüntüsü olur)
+        snapshots_missing = not inspect(engine).has_table(IngredientSnapshot.__tablename__)
+        
         # Tüm tabloları oluştur
         Base.metadata.create_all(bind=engine)
         logger.info("✓ Veritabanı şeması başarıyla oluşturuldu")
         
+        # Zaman aralığı indekslerini oluştur / mevcut veritabanına ekle
+        ensure_indexes(engine)
+        
+        if rollups_missing:
+            rebuild_daily_rollups()
+        
+        if snapshots_missing:
+            db = DatabaseEngine.create_session()
+            try:
+                IngredientSnapshot.baseline(db)
+            finally:
+                db.close()
+        
         return True
     except Exception as e:
         logger.error(f"✗ Veritabanı şeması oluşturulamadı: {str(e)}")
         return False
 
 
+def ensure_indexes(engine=None) -> list:
+    """
+    Yönetilen indeksleri oluştur (mevcut veritabanlarında veri kaybı olmadan)
+    
+    Eksik indeksler CREATE INDEX IF NOT EXISTS ile eklenir; tablo yeniden
+    oluşturulmaz, mevcut indeksler değiştirilmez.
+    
+    Args:
+        engine: SQLAlchemy engine (varsayılan: uygulama engine'i)
+        
+    Returns:
+        list: Yeni oluşturulan indeks adları
+    """
+    engine = engine or DatabaseEngine.get_engine()
+    inspector = inspect(engine)
+    
+    created = []
+    with engine.begin() as conn:
+        for index_name, table_name, columns in MANAGED_INDEXES:
+            if not inspector.has_table(table_name):
+                continue
+            
+            existing = {ix["name"] for ix in inspector.get_indexes(table_name)}
+            if index_name in existing:
+                continue
+            
+            conn.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS {index_name} "
+                f"ON {table_name} ({', '.join(columns)})"
+            )
+            created.append(index_name)
+            logger.info(f"✓ İndeks oluşturuldu: {index_name} ({table_name})")
+    
+    return created
+
+
+def explain_query_plan(db, statement) -> list:
+    """
+    Sorgunun çalıştırma planını döndür (SQLite: EXPLAIN QUERY PLAN, PostgreSQL: EXPLAIN)
+    
+    Args:
+        db: Veritabanı oturumu
+        statement: SQLAlchemy select ifadesi veya Query nesnesi
+        
+    Returns:
+        list: Plan satırları (metin)
+    """
+    if hasattr(statement, "statement"):
+        statement = statement.statement
+    
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    
+    if connection.dialect.name == "sqlite":
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        return [row[-1] for row in rows]
+    
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+    return [row[0] for row in rows]
+
+
+def get_index_usage_report() -> dict:
+    """
+    Tipik zaman aralığı sorgularının indeks kullanımını raporla
+    
+    Returns:
+        dict: Sorgu adı -> {"plan": [...], "uses_index": bool}
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=30)
+    
+    queries = {
+        "Satışlar (tarih aralığı)": select(Sale.id).where(
+            Sale.created_at >= start_date, Sale.created_at <= end_date
+        ),
+        "Ürün satışları (ürün + tarih)": select(
+            Sale.product_id, func.count(Sale.id)
+        ).where(
+            Sale.created_at >= start_date, Sale.created_at <= end_date
+        ).group_by(Sale.product_id),
+        "Kategori satışları (tarih aralığı)": select(
+            Category.name, func.count(Sale.id)
+        ).join(
+            Product, Product.category_id == Category.id
+        ).join(
+            Sale, Sale.product_id == Product.id
+        ).where(
+            Sale.created_at >= start_date, Sale.created_at < end_date
+        ).group_by(Category.id),
+        "Masraflar (tarih aralığı)": select(Expense.id).where(
+            Expense.created_at >= start_date, Expense.created_at <= end_date
+        ),
+        "Masraflar (kategori + tarih)": select(Expense.id).where(
+            Expense.category == "KİRA",
+            Expense.created_at >= start_date,
+            Expense.created_at <= end_date
+        ),
+        "Satış geçmişi (imleçli sayfa)": select(Sale.id).where(
+            Sale.created_at >= start_date,
+            (Sale.created_at < end_date) | ((Sale.created_at == end_date) & (Sale.id < 1000)),
+        ).order_by(Sale.created_at.desc(), Sale.id.desc()).limit(51),
+    }
+    
+    db = DatabaseEngine.create_session()
+    try:
+        report = {}
+        for name, statement in queries.items():
+            plan = explain_query_plan(db, statement)
+            report[name] = {
+                "plan": plan,
+                "uses_index": any("INDEX" in line.upper() for line in plan),
+            }
+        return report
+    finally:
+        db.close()
+
+
 def populate_initial_data():
     """
     Veritabanını varsayılan verilerle doldur
@@ -87,6 +241,62 @@ def _create_default_expense_categories(db):
     db.commit()
 
 
+def rebuild_daily_rollups(start_date: date = None, end_date: date = None):
+    """
+    Günlük özet (daily_rollups) tablosunu ham satış/masraf verisinden yeniden oluştur
+    
+    Args:
+        start_date: İlk gün (isteğe bağlı, varsayılan: tüm geçmiş)
+        end_date: Son gün (isteğe bağlı, dahil)
+    """
+    db = DatabaseEngine.create_session()
+    try:
+        row_count = DailyRollup.rebuild(db, start_date, end_date)
+        logger.info(f"✓ Günlük özet tablosu yeniden oluşturuldu ({row_count} satır)")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"✗ Günlük özet tablosu oluşturulamadı: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+def snapshot_ingredient_stock():
+    """Malzeme hareket defterinden yeni stok görüntüsü al"""
+    db = DatabaseEngine.create_session()
+    try:
+        count = IngredientSnapshot.take(db)
+        logger.info(f"✓ Malzeme stok görüntüsü alındı ({count} malzeme)")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"✗ Malzeme stok görüntüsü alınamadı: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+def rebuild_ingredient_stock():
+    """
+    Malzeme stoklarını (`ingredients.quantity`) hareket defterinden yeniden hesapla
+    """
+    from src.modules.stock_ledger import StockLedger
+    
+    db = DatabaseEngine.create_session()
+    try:
+        count = IngredientSnapshot.rebuild_quantities(db)
+        logger.info(f"✓ Malzeme stokları hareket defterinden hesaplandı ({count} malzeme)")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"✗ Malzeme stokları hesaplanamadı: {str(e)}")
+        return False
+    finally:
+        db.close()
+        StockLedger.clear()
+
+
 def reset_database():
     """
     Veritabanını sıfırla (İçeriği sil, şemayı yeniden oluştur)
@@ -133,6 +343,37 @@ if __name__ == "__main__":
     # Setup logging
     logging.basicConfig(level=logging.INFO)
     
+    # İndeks kullanım raporu:
+    #   python -m src.database.init_db --index-report
+    if "--index-report" in sys.argv:
+        print(f"🔎 İndeks kullanım raporu ({DatabaseConfig.DB_TYPE})\n")
+        for name, entry in get_index_usage_report().items():
+            status = "✓" if entry["uses_index"] else "✗"
+            print(f"{status} {name}")
+            for line in entry["plan"]:
+                print(f"     {line}")
+        exit(0)
+    
+    # Özet tablosu backfill komutu:
+    #   python -m src.database.init_db --rebuild-rollups [YYYY-MM-DD] [YYYY-MM-DD]
+    if "--rebuild-rollups" in sys.argv:
+        args = sys.argv[sys.argv.index("--rebuild-rollups") + 1:]
+        start = date.fromisoformat(args[0]) if len(args) > 0 else None
+        end = date.fromisoformat(args[1]) if len(args) > 1 else None
+        print("🔁 Günlük özet tablosu yeniden oluşturuluyor...")
+        exit(0 if rebuild_daily_rollups(start, end) else 1)
+    
+    # Malzeme hareket defteri komutları:
+    #   python -m src.database.init_db --snapshot-ingredients
+    #   python -m src.database.init_db --rebuild-ingredient-stock
+    if "--snapshot-ingredients" in sys.argv:
+        print("📸 Malzeme stok görüntüsü alınıyor...")
+        exit(0 if snapshot_ingredient_stock() else 1)
+    
+    if "--rebuild-ingredient-stock" in sys.argv:
+        print("🔁 Malzeme stokları hareket defterinden hesaplanıyor...")
+        exit(0 if rebuild_ingredient_stock() else 1)
+    
     print("\n" + "="*60)
     print("🗄️  CafeFlow - Veritabanı İnisiyalizasyonu")
     print("="*60 + "\n")
@@ -0,0 +1,85 @@
+"""
+📄 CafeFlow - Anahtar Kümesi (Keyset) Sayfalama
+
+Listeleri OFFSET yerine son görülen satırın sıralama anahtarıyla
+(ör. (created_at, id)) sayfalar. Her sayfa, indeks üzerinde imleçten
+sonraki `limit + 1` satırı okur; tablo ne kadar büyürse büyüsün sayfa
+başına bellek ve gecikme sabittir.
+
+Kullanım:
+    page = keyset_paginate(query, (Sale.created_at, Sale.id), cursor, limit=50)
+    next_page = keyset_paginate(query, (Sale.created_at, Sale.id), page.next_cursor)
+"""
+
+from typing import NamedTuple
+from sqlalchemy import and_, or_
+
+
+MAX_PAGE_SIZE = 500
+
+
+class KeysetPage(NamedTuple):
+    """Bir liste sayfası"""
+    items: list
+    next_cursor: tuple   # Sonraki sayfanın imleci (son sayfada None)
+    limit: int
+
+    @property
+    def has_more(self) -> bool:
+        """Sonraki sayfa var mı?"""
+        return self.next_cursor is not None
+
+
+def _after_cursor(columns: tuple, cursor: tuple, descending: bool):
+    """
+    (c1, c2, ...) > / < (v1, v2, ...) satır karşılaştırması
+
+    Satır değeri sözdizimi yerine açık OR/AND zinciri üretilir; SQLite ve
+    PostgreSQL'de aynı şekilde çalışır ve ilk kolonun indeksini kullanır.
+    """
+    conditions = []
+    for position, (column, value) in enumerate(zip(columns, cursor)):
+        equal_prefix = [columns[i] == cursor[i] for i in range(position)]
+        beyond = column < value if descending else column > value
+        conditions.append(and_(*equal_prefix, beyond))
+    return or_(*conditions)
+
+
+def keyset_paginate(
+    query,
+    sort_columns: tuple,
+    cursor: tuple = None,
+    limit: int = 50,
+    descending: bool = True
+) -> KeysetPage:
+    """
+    Sorgunun imleçten sonraki sayfasını al
+
+    Args:
+        query: Filtrelenmiş ORM sorgusu (sıralama uygulanmamış)
+        sort_columns: Sıralama anahtarı; son kolon benzersiz olmalı (ör. id)
+        cursor: Önceki sayfanın next_cursor değeri (ilk sayfa için None)
+        limit: Sayfa boyutu (1..MAX_PAGE_SIZE)
+        descending: Azalan sıralama (en yeni önce)
+
+    Returns:
+        KeysetPage: Sayfa öğeleri ve sonraki imleç
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"Sayfa boyutu 1 ile {MAX_PAGE_SIZE} arasında olmalıdır!")
+
+    if cursor is not None:
+        if len(cursor) != len(sort_columns):
+            raise ValueError("Geçersiz sayfa imleci!")
+        query = query.filter(_after_cursor(sort_columns, cursor, descending))
+
+    order = [column.desc() if descending else column.asc() for column in sort_columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = tuple(getattr(last, column.key) for column in sort_columns)
+
+    return KeysetPage(items=rows, next_cursor=next_cursor, limit=limit)
@@ -0,0 +1,69 @@
+"""
+🔢 CafeFlow - SQL İfade Sayacı
+
+Bir kod bloğunun veritabanına kaç SQL ifadesi gönderdiğini sayar.
+N+1 sorgu gerilemelerini yakalamak için testlerde ve geliştirme sırasında
+kullanılır.
+
+Kullanım:
+    with assert_max_statements(2):
+        SalesManager.get_sales_by_period(db, start, end)
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import event
+from src.database.db_connection import DatabaseEngine
+
+
+class StatementCounter:
+    """Motor üzerinde çalışan SQL ifadelerini sayan bağlam yöneticisi"""
+
+    def __init__(self, *engines):
+        """
+        Args:
+            *engines: İzlenecek motorlar (varsayılan: ana ve salt okunur motor)
+        """
+        if not engines:
+            engines = {DatabaseEngine.get_engine(), DatabaseEngine.get_read_engine()}
+        self.engines = list(engines)
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        """Sayılan ifade sayısı"""
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+        return False
+
+
+@contextmanager
+def assert_max_statements(max_count: int, *engines):
+    """
+    Blok en fazla max_count SQL ifadesi çalıştırmalı
+
+    Args:
+        max_count: İzin verilen en fazla ifade sayısı
+        *engines: İzlenecek motorlar (varsayılan: ana ve salt okunur motor)
+
+    Raises:
+        AssertionError: Sınır aşılırsa (çalışan ifadelerle birlikte)
+    """
+    with StatementCounter(*engines) as counter:
+        yield counter
+
+    if counter.count > max_count:
+        statements = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise AssertionError(
+            f"En fazla {max_count} SQL ifadesi bekleniyordu, {counter.count} çalıştı:\n{statements}"
+        )
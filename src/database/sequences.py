@@ -0,0 +1,180 @@
+"""
+🔢 CafeFlow - Numara Dağıtıcı Modülü
+
+Satış numarası gibi benzersiz numaraları okuma-yazma yarışı olmadan üretir.
+Her süreç veritabanından bir numara bloğu ayırır ve bloğu bellekten dağıtır;
+PostgreSQL'de yerel SEQUENCE, SQLite'ta `number_sequences` tablosu kullanılır.
+"""
+
+import os
+import re
+import threading
+import logging
+from typing import Callable, Optional
+from sqlalchemy import select, update, insert, text
+from sqlalchemy.exc import IntegrityError
+from src.database.db_connection import DatabaseEngine, DatabaseConfig
+from src.models import NumberSequence
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceAllocator:
+    """
+    Blok tabanlı numara dağıtıcı
+
+    Numaralar süreç içinde tekrarlanmaz ve paralel kasalar (süreçler)
+    arasında çakışmaz. Yalnızca artan (monoton) numara garantisi verilir,
+    boşluksuz numara garantisi verilmez: süreç kapanırken kullanılmamış
+    blok numaraları ve yazılamayan (geri alınan) satışların numaraları
+    tekrar kullanılmaz; paralel kasaların numaraları zamana göre sıralı
+    olmaz. BLOCK_SIZE=1 blok kaybını önler ama her satışa ayrı bir yazma
+    transaction'ı ekler.
+    """
+
+    BLOCK_SIZE = int(os.getenv("SEQUENCE_BLOCK_SIZE", "20"))
+
+    _allocators = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str,
+        block_size: int = None,
+        seed: Optional[Callable] = None
+    ):
+        """
+        Args:
+            name: Sayaç adı
+            block_size: Bir seferde ayrılacak numara sayısı
+            seed: Sayaç ilk kez oluşturulurken başlangıç değerini
+                döndüren fonksiyon (bağlantı nesnesi alır)
+        """
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            raise ValueError(f"Geçersiz sayaç adı: {name}")
+
+        self.name = name
+        self.block_size = max(1, block_size or SequenceAllocator.BLOCK_SIZE)
+        self._seed = seed
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    @classmethod
+    def get(cls, name: str, seed: Optional[Callable] = None) -> "SequenceAllocator":
+        """
+        İsimle kayıtlı dağıtıcıyı al veya oluştur
+
+        Args:
+            name: Sayaç adı
+            seed: Başlangıç değeri fonksiyonu (yalnızca ilk oluşturmada)
+
+        Returns:
+            SequenceAllocator: Süreç genelinde paylaşılan dağıtıcı
+        """
+        with cls._registry_lock:
+            if name not in cls._allocators:
+                cls._allocators[name] = cls(name, seed=seed)
+            return cls._allocators[name]
+
+    @classmethod
+    def reset(cls):
+        """Süreçteki tüm ayrılmış blokları unut (bağlantı değişiminde)"""
+        with cls._registry_lock:
+            cls._allocators = {}
+
+    def next_value(self) -> int:
+        """Sıradaki numarayı al"""
+        return self.next_values(1)[0]
+
+    def next_values(self, count: int) -> list:
+        """
+        Art arda kullanılacak birden fazla numara al
+
+        Blokta yeterli numara yoksa eksik kısım (en az BLOCK_SIZE kadar)
+        tek seferde ayrılır; çok kalemli sipariş tek gidiş-dönüş ister.
+
+        Args:
+            count: İstenen numara sayısı
+
+        Returns:
+            list: Artan sırada numaralar
+        """
+        values = []
+        with self._lock:
+            while len(values) < count:
+                if self._next >= self._end:
+                    self._next, self._end = self._reserve_block(count - len(values))
+                take = min(self._end - self._next, count - len(values))
+                values.extend(range(self._next, self._next + take))
+                self._next += take
+
+        return values
+
+    def _reserve_block(self, needed: int = 1) -> tuple:
+        """
+        Veritabanından [başlangıç, bitiş) numara bloğu ayır
+
+        Args:
+            needed: Hemen kullanılacak numara sayısı (blok en az bu kadar olur;
+                PostgreSQL SEQUENCE'ta blok boyutu sabittir)
+        """
+        engine = DatabaseEngine.get_engine()
+        size = max(self.block_size, needed)
+
+        if DatabaseConfig.DB_TYPE == "postgresql":
+            return self._reserve_native_block(engine)
+
+        table = NumberSequence.__table__
+
+        while True:
+            # Okumadan önce yaz: UPDATE satır kilidini alır, ardından
+            # okunan değer yalnızca bu işleme aittir
+            with engine.begin() as conn:
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.name == self.name)
+                    .values(next_value=table.c.next_value + size)
+                )
+                if result.rowcount:
+                    end = conn.execute(
+                        select(table.c.next_value).where(table.c.name == self.name)
+                    ).scalar()
+                    return end - size, end
+
+            # Sayaç henüz yok: başlangıç değeriyle oluştur
+            try:
+                with engine.begin() as conn:
+                    start = self._seed(conn) if self._seed else 1
+                    conn.execute(insert(table).values(name=self.name, next_value=start + size))
+                    logger.info(f"✓ Sayaç oluşturuldu: {self.name} (başlangıç: {start})")
+                    return start, start + size
+            except IntegrityError:
+                # Başka bir süreç aynı anda oluşturdu, UPDATE ile tekrar dene
+                continue
+
+    def _reserve_native_block(self, engine) -> tuple:
+        """PostgreSQL SEQUENCE ile blok ayır (INCREMENT BY blok boyutu)"""
+        sequence_name = f"{self.name}_seq"
+
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": sequence_name}
+            ).scalar()
+            if not exists:
+                start = self._seed(conn) if self._seed else 1
+                conn.execute(text(
+                    f"CREATE SEQUENCE IF NOT EXISTS {sequence_name} "
+                    f"START WITH {int(start)} INCREMENT BY {self.block_size}"
+                ))
+
+            # Tek nextval çağrısı tüm bloğu ayırır
+            start, increment = conn.execute(
+                text(
+                    "SELECT nextval(:name), "
+                    "(SELECT increment_by FROM pg_sequences WHERE sequencename = :name)"
+                ),
+                {"name": sequence_name}
+            ).one()
+
+        return start, start + increment
@@ -13,6 +13,10 @@ from src.models.expense import Expense
 from src.models.expense_category import ExpenseCategory
 from src.models.ingredient import Ingredient
 from src.models.recipe import Recipe
+from src.models.number_sequence import NumberSequence
+from src.models.daily_rollup import DailyRollup
+from src.models.ingredient_movement import IngredientMovement, IngredientSnapshot
+from src.models.loader_profiles import LOADER_PROFILES, loader_options
 
 # Tüm modelleri dışa aktarma
 __all__ = [
@@ -26,4 +30,10 @@ __all__ = [
     "ExpenseCategory",
     "Ingredient",
     "Recipe",
+    "NumberSequence",
+    "DailyRollup",
+    "IngredientMovement",
+    "IngredientSnapshot",
+    "LOADER_PROFILES",
+    "loader_options",
 ]
@@ -0,0 +1,262 @@
+"""
+📅 CafeFlow - Günlük Özet (Rollup) Modeli
+
+Gün × ürün × ödeme yöntemi bazında satış ve masraf toplamları.
+Satış, iade ve masraf yazıldıkça flush sırasında artımlı olarak güncellenir;
+raporlar ham tabloları taramak yerine bu tablodan okur.
+"""
+
+from datetime import datetime, timedelta, date
+from sqlalchemy import (
+    Column, String, Integer, Numeric, Date, UniqueConstraint,
+    event, inspect, func, select, delete, literal
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from src.models.base import BaseModel
+from src.models.sale import Sale
+from src.models.expense import Expense
+
+
+class DailyRollup(BaseModel):
+    """
+    Günlük Özet Modeli
+
+    Özellikler:
+        - day: Gün
+        - product_id: Ürün ID'si (0 = masraf satırı)
+        - payment_method: Ödeme yöntemi
+        - sale_count / quantity: Satış adedi ve satılan miktar
+        - revenue / kdv_amount / product_cost: Gelir, KDV ve maliyet toplamları
+        - gross_profit / net_profit: Kâr toplamları
+        - expense_count / expense_amount: Masraf adedi ve toplamı
+    """
+
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "product_id", "payment_method", name="uq_daily_rollups_key"),
+    )
+
+    # Masraf satırları ürüne bağlı değildir
+    EXPENSE_PRODUCT_ID = 0
+
+    day = Column(Date, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False, default=0)
+    payment_method = Column(String(20), nullable=False)
+
+    # Satış toplamları (iade edilen satışlar hariç)
+    sale_count = Column(Integer, default=0, nullable=False)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    kdv_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    product_cost = Column(Numeric(12, 2), default=0, nullable=False)
+    gross_profit = Column(Numeric(12, 2), default=0, nullable=False)
+    net_profit = Column(Numeric(12, 2), default=0, nullable=False)
+
+    # Masraf toplamları
+    expense_count = Column(Integer, default=0, nullable=False)
+    expense_amount = Column(Numeric(12, 2), default=0, nullable=False)
+
+    SALE_MEASURES = (
+        "sale_count", "quantity", "revenue", "kdv_amount",
+        "product_cost", "gross_profit", "net_profit",
+    )
+    EXPENSE_MEASURES = ("expense_count", "expense_amount")
+
+    def __str__(self) -> str:
+        """Özet açıklaması"""
+        return f"{self.day} - Ürün {self.product_id} / {self.payment_method}"
+
+    @classmethod
+    def apply_deltas(cls, connection, deltas: dict) -> None:
+        """
+        Toplam farklarını tabloya atomik olarak ekle (INSERT ... ON CONFLICT)
+
+        Args:
+            connection: Veritabanı bağlantısı
+            deltas: {(day, product_id, payment_method): {ölçü: fark}}
+        """
+        table = cls.__table__
+        dialect_insert = (
+            postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+        )
+        now = datetime.utcnow()
+
+        for (day, product_id, payment_method), values in deltas.items():
+            values = {k: v for k, v in values.items() if v}
+            if not values:
+                continue
+
+            stmt = dialect_insert(table).values(
+                day=day,
+                product_id=product_id,
+                payment_method=payment_method,
+                created_at=now,
+                updated_at=now,
+                **values
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "product_id", "payment_method"],
+                set_={
+                    "updated_at": now,
+                    **{k: table.c[k] + stmt.excluded[k] for k in values},
+                }
+            )
+            connection.execute(stmt)
+
+    @classmethod
+    def rebuild(cls, db_session, start_date: date = None, end_date: date = None) -> int:
+        """
+        Özet tabloyu ham satış/masraf tablolarından yeniden oluştur (backfill)
+
+        Args:
+            db_session: Veritabanı oturumu
+            start_date: İlk gün (isteğe bağlı, varsayılan: tüm geçmiş)
+            end_date: Son gün (isteğe bağlı, dahil)
+
+        Returns:
+            int: Oluşturulan özet satırı sayısı
+        """
+        table = cls.__table__
+
+        delete_stmt = delete(table)
+        if start_date:
+            delete_stmt = delete_stmt.where(table.c.day >= start_date)
+        if end_date:
+            delete_stmt = delete_stmt.where(table.c.day <= end_date)
+        db_session.execute(delete_stmt)
+
+        def in_range(query, column):
+            if start_date:
+                query = query.where(column >= datetime.combine(start_date, datetime.min.time()))
+            if end_date:
+                query = query.where(
+                    column < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+                )
+            return query
+
+        sale_day = func.date(Sale.created_at)
+        sales_select = in_range(
+            select(
+                sale_day,
+                Sale.product_id,
+                Sale.payment_method,
+                func.count(Sale.id),
+                func.sum(Sale.quantity),
+                func.sum(Sale.total_with_kdv),
+                func.sum(Sale.kdv_amount),
+                func.sum(Sale.product_cost),
+                func.sum(Sale.gross_profit),
+                func.sum(Sale.net_profit),
+            ).where(Sale.is_refunded == False),
+            Sale.created_at
+        ).group_by(sale_day, Sale.product_id, Sale.payment_method)
+
+        expense_day = func.date(Expense.created_at)
+        expenses_select = in_range(
+            select(
+                expense_day,
+                literal(cls.EXPENSE_PRODUCT_ID),
+                Expense.payment_method,
+                func.count(Expense.id),
+                func.sum(Expense.amount),
+            ),
+            Expense.created_at
+        ).group_by(expense_day, Expense.payment_method)
+
+        key_columns = ["day", "product_id", "payment_method"]
+        db_session.execute(
+            table.insert().from_select(key_columns + list(cls.SALE_MEASURES), sales_select)
+        )
+        db_session.execute(
+            table.insert().from_select(key_columns + list(cls.EXPENSE_MEASURES), expenses_select)
+        )
+        db_session.commit()
+
+        count_query = select(func.count()).select_from(table)
+        if start_date:
+            count_query = count_query.where(table.c.day >= start_date)
+        if end_date:
+            count_query = count_query.where(table.c.day <= end_date)
+        return db_session.execute(count_query).scalar()
+
+
+# ============================================================
+# ARTIMLI GÜNCELLEME (FLUSH OLAYI)
+# ============================================================
+
+def _value(obj, key: str, old: bool):
+    """Flush edilen nesnede alanın eski (flush öncesi) veya yeni değeri"""
+    if old:
+        history = inspect(obj).attrs[key].history
+        if history.deleted:
+            return history.deleted[0]
+    return getattr(obj, key)
+
+
+def _sale_contribution(sale: Sale, old: bool):
+    """Satışın özet tabloya katkısı (iade edilmişse yok)"""
+    if _value(sale, "is_refunded", old):
+        return None
+
+    created_at = _value(sale, "created_at", old)
+    key = (created_at.date(), _value(sale, "product_id", old), _value(sale, "payment_method", old))
+    return key, {
+        "sale_count": 1,
+        "quantity": _value(sale, "quantity", old) or 0,
+        "revenue": _value(sale, "total_with_kdv", old) or 0,
+        "kdv_amount": _value(sale, "kdv_amount", old) or 0,
+        "product_cost": _value(sale, "product_cost", old) or 0,
+        "gross_profit": _value(sale, "gross_profit", old) or 0,
+        "net_profit": _value(sale, "net_profit", old) or 0,
+    }
+
+
+def _expense_contribution(expense: Expense, old: bool):
+    """Masrafın özet tabloya katkısı"""
+    created_at = _value(expense, "created_at", old)
+    key = (
+        created_at.date(),
+        DailyRollup.EXPENSE_PRODUCT_ID,
+        _value(expense, "payment_method", old),
+    )
+    return key, {
+        "expense_count": 1,
+        "expense_amount": _value(expense, "amount", old) or 0,
+    }
+
+
+def _add(deltas: dict, contribution, sign: int) -> None:
+    if contribution is None:
+        return
+    key, values = contribution
+    bucket = deltas.setdefault(key, {})
+    for name, value in values.items():
+        bucket[name] = bucket.get(name, 0) + sign * value
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_daily_rollups(session, flush_context):
+    """Yeni/değişen/silinen satış ve masrafları özet tabloya yansıt"""
+    deltas = {}
+
+    for obj in session.new:
+        if isinstance(obj, Sale):
+            _add(deltas, _sale_contribution(obj, old=False), +1)
+        elif isinstance(obj, Expense):
+            _add(deltas, _expense_contribution(obj, old=False), +1)
+
+    for obj in session.dirty:
+        if isinstance(obj, (Sale, Expense)) and session.is_modified(obj, include_collections=False):
+            contribution = _sale_contribution if isinstance(obj, Sale) else _expense_contribution
+            _add(deltas, contribution(obj, old=True), -1)
+            _add(deltas, contribution(obj, old=False), +1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Sale):
+            _add(deltas, _sale_contribution(obj, old=True), -1)
+        elif isinstance(obj, Expense):
+            _add(deltas, _expense_contribution(obj, old=True), -1)
+
+    if deltas:
+        DailyRollup.apply_deltas(session.connection(), deltas)
@@ -80,6 +80,16 @@ class Ingredient(BaseModel):
         
         return result
     
+    @staticmethod
+    def to_base(quantity: float, unit: str) -> float:
+        """Stok birimindeki miktarı temel birime çevir (kg -> g, l -> ml)"""
+        return quantity * Ingredient.CONVERSIONS.get(unit, 1)
+    
+    @staticmethod
+    def from_base(quantity: float, unit: str) -> float:
+        """Temel birimdeki miktarı stok birimine çevir"""
+        return quantity / Ingredient.CONVERSIONS.get(unit, 1)
+    
     def is_low_stock(self, threshold: float = 100):
         """Stok düşük mü?"""
         return self.quantity < threshold
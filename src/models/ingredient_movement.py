@@ -0,0 +1,313 @@
+"""
+📒 CafeFlow - Malzeme Stok Hareketi ve Anlık Görüntü Modelleri
+
+Malzeme stoğu için yalnızca eklenen (append-only) hareket defteri.
+Her giriş, çıkış ve satış tüketimi bir satır olarak yazılır; periyodik
+anlık görüntüler (snapshot) sayesinde herhangi bir andaki stok, tüm
+geçmişi taramadan "son görüntü + sonraki hareketler" ile bulunur.
+Miktarlar temel birimde (g, ml, adet) tutulur.
+"""
+
+from datetime import datetime
+from sqlalchemy import (
+    Column, String, Integer, Float, ForeignKey, event, inspect, func, select
+)
+from sqlalchemy.orm import Session
+from src.models.base import BaseModel
+from src.models.ingredient import Ingredient
+
+
+class IngredientMovement(BaseModel):
+    """
+    Malzeme Stok Hareketi Modeli
+
+    Özellikler:
+        - ingredient_id: Malzeme ID'si
+        - movement_type: Hareket türü (GİRİŞ, ÇIKIŞ, SATIŞ, AYARLAMA)
+        - quantity: İşaretli miktar, temel birimde (+ giriş, - çıkış)
+        - reason: Hareket sebebi
+        - reference_number: Satış numarası vb.
+    """
+
+    __tablename__ = "ingredient_movements"
+
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False, index=True)
+    movement_type = Column(String(20), nullable=False)
+    quantity = Column(Float, nullable=False)
+    reason = Column(String(200), nullable=True)
+    reference_number = Column(String(50), nullable=True, index=True)
+
+    MOVEMENT_TYPES = {
+        "GİRİŞ": "Stok Girişi",
+        "ÇIKIŞ": "Stok Çıkışı",
+        "SATIŞ": "Satış Tüketimi",
+        "AYARLAMA": "Stok Ayarlaması",
+    }
+
+    def __str__(self) -> str:
+        """Hareket açıklaması"""
+        return f"{self.movement_type} - {self.quantity} ({self.reason})"
+
+    @property
+    def movement_type_display(self) -> str:
+        """Hareket türünü Türkçe göster"""
+        return self.MOVEMENT_TYPES.get(self.movement_type, self.movement_type)
+
+    @classmethod
+    def for_consumption(cls, base_needs: dict, reference_number: str = None) -> list:
+        """
+        Satış tüketimi için hareket satırları oluştur (oturuma eklemeden)
+
+        Args:
+            base_needs: {ingredient_id: temel birimde tüketim}
+            reference_number: Satış numarası
+
+        Returns:
+            list: IngredientMovement nesneleri
+        """
+        return [
+            cls(
+                ingredient_id=ingredient_id,
+                movement_type="SATIŞ",
+                quantity=-required,
+                reason="Satış",
+                reference_number=reference_number
+            )
+            for ingredient_id, required in base_needs.items()
+            if required > 0
+        ]
+
+    @classmethod
+    def quantities_at(
+        cls,
+        db_session,
+        at: datetime = None,
+        ingredient_ids=None,
+        until_movement_id: int = None
+    ) -> dict:
+        """
+        Malzemelerin belirli bir andaki stoğu (son görüntü + sonraki hareketler)
+
+        Args:
+            db_session: Veritabanı oturumu
+            at: Zaman (varsayılan: şimdi)
+            ingredient_ids: Yalnızca bu malzemeler (varsayılan: tümü)
+            until_movement_id: Yalnızca bu ID'ye kadarki hareketler
+
+        Returns:
+            dict: {ingredient_id: temel birimde miktar}
+        """
+        at = at or datetime.utcnow()
+        snapshots = IngredientSnapshot.__table__
+
+        # Her malzemenin zamandan önceki son görüntüsü
+        latest = select(
+            snapshots.c.ingredient_id,
+            func.max(snapshots.c.id).label("snapshot_id")
+        ).where(snapshots.c.created_at <= at)
+        if ingredient_ids is not None:
+            latest = latest.where(snapshots.c.ingredient_id.in_(ingredient_ids))
+        latest = latest.group_by(snapshots.c.ingredient_id).subquery()
+
+        base = dict(db_session.execute(
+            select(snapshots.c.ingredient_id, snapshots.c.quantity)
+            .join(latest, snapshots.c.id == latest.c.snapshot_id)
+        ).all())
+
+        # Görüntüden sonraki hareketler (görüntüsü olmayanlar için tüm geçmiş)
+        movements = cls.__table__
+        delta_query = select(
+            movements.c.ingredient_id,
+            func.sum(movements.c.quantity)
+        ).select_from(
+            movements
+            .outerjoin(latest, latest.c.ingredient_id == movements.c.ingredient_id)
+            .outerjoin(snapshots, snapshots.c.id == latest.c.snapshot_id)
+        ).where(
+            movements.c.created_at <= at,
+            movements.c.id > func.coalesce(snapshots.c.movement_id, 0)
+        )
+        if ingredient_ids is not None:
+            delta_query = delta_query.where(movements.c.ingredient_id.in_(ingredient_ids))
+        if until_movement_id is not None:
+            delta_query = delta_query.where(movements.c.id <= until_movement_id)
+        delta_query = delta_query.group_by(movements.c.ingredient_id)
+
+        for ingredient_id, delta in db_session.execute(delta_query).all():
+            base[ingredient_id] = base.get(ingredient_id, 0) + (delta or 0)
+
+        return base
+
+    @classmethod
+    def quantity_at(cls, db_session, ingredient_id: int, at: datetime = None) -> float:
+        """
+        Tek malzemenin belirli bir andaki stoğu (temel birimde)
+
+        Args:
+            db_session: Veritabanı oturumu
+            ingredient_id: Malzeme ID'si
+            at: Zaman (varsayılan: şimdi)
+
+        Returns:
+            float: Temel birimde miktar
+        """
+        return cls.quantities_at(db_session, at, [ingredient_id]).get(ingredient_id, 0)
+
+
+class IngredientSnapshot(BaseModel):
+    """
+    Malzeme Stok Anlık Görüntüsü
+
+    Özellikler:
+        - ingredient_id: Malzeme ID'si
+        - quantity: Görüntü anındaki stok (temel birimde)
+        - movement_id: Görüntüye dahil edilen son hareket ID'si
+    """
+
+    __tablename__ = "ingredient_snapshots"
+
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False, index=True)
+    quantity = Column(Float, nullable=False)
+    movement_id = Column(Integer, nullable=False, default=0)
+
+    def __str__(self) -> str:
+        """Görüntü açıklaması"""
+        return f"Malzeme {self.ingredient_id}: {self.quantity} (hareket #{self.movement_id})"
+
+    @classmethod
+    def take(cls, db_session) -> int:
+        """
+        Tüm malzemeler için hareket defterinden yeni görüntü al
+
+        Args:
+            db_session: Veritabanı oturumu
+
+        Returns:
+            int: Yazılan görüntü sayısı
+        """
+        movement_id = db_session.execute(
+            select(func.max(IngredientMovement.id))
+        ).scalar() or 0
+        quantities = IngredientMovement.quantities_at(
+            db_session, until_movement_id=movement_id
+        )
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "ingredient_id": ingredient_id,
+                "quantity": quantity,
+                "movement_id": movement_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for ingredient_id, quantity in quantities.items()
+        ]
+        if rows:
+            db_session.execute(cls.__table__.insert(), rows)
+        db_session.commit()
+        return len(rows)
+
+    @classmethod
+    def baseline(cls, db_session) -> int:
+        """
+        Hareket defteri olmayan mevcut veritabanı için başlangıç görüntüsü
+        (malzemelerin mevcut `quantity` değerlerinden)
+
+        Returns:
+            int: Yazılan görüntü sayısı
+        """
+        movement_id = db_session.execute(
+            select(func.max(IngredientMovement.id))
+        ).scalar() or 0
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "ingredient_id": ingredient_id,
+                "quantity": Ingredient.to_base(quantity or 0, unit),
+                "movement_id": movement_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for ingredient_id, quantity, unit in db_session.execute(
+                select(Ingredient.id, Ingredient.quantity, Ingredient.unit)
+            ).all()
+        ]
+        if rows:
+            db_session.execute(cls.__table__.insert(), rows)
+        db_session.commit()
+        return len(rows)
+
+    @classmethod
+    def rebuild_quantities(cls, db_session) -> int:
+        """
+        Malzemelerin `quantity` alanını hareket defterinden yeniden hesapla
+
+        Returns:
+            int: Güncellenen malzeme sayısı
+        """
+        quantities = IngredientMovement.quantities_at(db_session)
+        ingredients = db_session.query(Ingredient).filter(
+            Ingredient.id.in_(quantities)
+        ).all()
+
+        # Defterden gelen değer yeni bir hareket değildir
+        db_session.info[MOVEMENT_LOGGED_KEY] = True
+        try:
+            for ingredient in ingredients:
+                ingredient.quantity = Ingredient.from_base(
+                    quantities[ingredient.id], ingredient.unit
+                )
+            db_session.commit()
+        finally:
+            db_session.info.pop(MOVEMENT_LOGGED_KEY, None)
+        return len(ingredients)
+
+
+# ============================================================
+# DEFTER DIŞI DEĞİŞİKLİKLER (FLUSH OLAYI)
+# ============================================================
+
+# Bu bayrakla işaretlenen oturumların stok değişiklikleri deftere zaten yazılmıştır
+MOVEMENT_LOGGED_KEY = "ingredient_movement_logged"
+
+
+@event.listens_for(Session, "after_flush")
+def _log_direct_quantity_changes(session, flush_context):
+    """`Ingredient.quantity` alanına doğrudan yapılan değişiklikleri deftere ekle"""
+    if session.info.get(MOVEMENT_LOGGED_KEY):
+        return
+
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Ingredient) and inspect(obj).attrs.quantity.history.has_changes()
+    ]
+    if not changed:
+        return
+
+    # Doğrudan atama mutlak sayımdır: fark, satırdaki eski değere göre değil
+    # deftere göre alınır (yüklenen eski değer, başka oturumların satışlarını içermeyebilir)
+    existing = [obj.id for obj in changed if obj not in session.new]
+    logged = IngredientMovement.quantities_at(session, ingredient_ids=existing) if existing else {}
+
+    rows = []
+    now = datetime.utcnow()
+    for obj in changed:
+        history = inspect(obj).attrs.quantity.history
+        new = (history.added[0] or 0) if history.added else 0
+        delta = Ingredient.to_base(new, obj.unit) - logged.get(obj.id, 0)
+        if abs(delta) < 1e-9:
+            continue
+
+        rows.append({
+            "ingredient_id": obj.id,
+            "movement_type": "AYARLAMA" if obj not in session.new else "GİRİŞ",
+            "quantity": delta,
+            "reason": "Açılış stoku" if obj in session.new else "Doğrudan düzeltme",
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    if rows:
+        session.connection().execute(IngredientMovement.__table__.insert(), rows)
@@ -0,0 +1,83 @@
+"""
+🔗 CafeFlow - İlişki Yükleme Profilleri
+
+İlişkiler varsayılan olarak tembel (lazy="select") yüklenir; listelerde
+her satır için ayrı sorgu (N+1) çalışır. Liste ekranları ve yönetici
+fonksiyonları ihtiyaç duydukları ilişkileri adlandırılmış bir profille
+önceden (joinedload/selectinload) yükler.
+
+Profiller:
+    - pos: Satış ekranı (ürün + kategori + reçete malzemeleri)
+    - history: Geçmiş listeleri (satış/stok hareketi + ürün)
+    - report: Raporlar (satış + ürün + kategori, ürün + reçete)
+
+Kullanım:
+    db.query(Sale).options(*loader_options(Sale, "history"))
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+from src.models.product import Product
+from src.models.recipe import Recipe
+from src.models.sale import Sale
+from src.models.stock_movement import StockMovement
+
+
+LOADER_PROFILES = {
+    "pos": {
+        Product: (
+            joinedload(Product.category),
+            selectinload(Product.recipe_items).joinedload(Recipe.ingredient),
+        ),
+        Recipe: (
+            joinedload(Recipe.ingredient),
+        ),
+    },
+    "history": {
+        Sale: (
+            joinedload(Sale.product),
+        ),
+        StockMovement: (
+            joinedload(StockMovement.product),
+        ),
+        Product: (
+            joinedload(Product.category),
+        ),
+    },
+    "report": {
+        Sale: (
+            joinedload(Sale.product).joinedload(Product.category),
+        ),
+        Product: (
+            joinedload(Product.category),
+            selectinload(Product.recipe_items).joinedload(Recipe.ingredient),
+        ),
+        Recipe: (
+            joinedload(Recipe.ingredient),
+            joinedload(Recipe.product),
+        ),
+        StockMovement: (
+            joinedload(StockMovement.product),
+        ),
+    },
+}
+
+
+def loader_options(model, profile: str = None) -> tuple:
+    """
+    Model için profilin yükleme seçenekleri
+
+    Args:
+        model: ORM sınıfı (ör: Sale)
+        profile: Profil adı (pos, history, report); None ise seçenek yok
+
+    Returns:
+        tuple: Query.options(...) / select().options(...) için seçenekler
+
+    Raises:
+        ValueError: Bilinmeyen profil
+    """
+    if profile is None:
+        return ()
+    if profile not in LOADER_PROFILES:
+        raise ValueError(f"Geçersiz yükleme profili: {profile}")
+    return LOADER_PROFILES[profile].get(model, ())
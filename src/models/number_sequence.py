@@ -0,0 +1,27 @@
+"""
+🔢 CafeFlow - Numara Sırası Modeli
+
+Satış numarası gibi benzersiz numaraların blok blok dağıtıldığı sayaçlar
+"""
+
+from sqlalchemy import Column, String, Integer
+from src.models.base import BaseModel
+
+
+class NumberSequence(BaseModel):
+    """
+    Numara Sırası (Sayaç) Modeli
+    
+    Özellikler:
+        - name: Sayaç adı (örn: sale_number)
+        - next_value: Henüz dağıtılmamış ilk numara
+    """
+    
+    __tablename__ = "number_sequences"
+    
+    name = Column(String(50), unique=True, nullable=False, index=True)
+    next_value = Column(Integer, nullable=False, default=1)
+    
+    def __str__(self) -> str:
+        """Sayaç açıklaması"""
+        return f"{self.name} -> {self.next_value}"
@@ -0,0 +1,250 @@
+"""
+🗂️ CafeFlow - Katalog Anlık Görüntüsü
+
+Aktif ürün, kategori ve malzeme listelerini süreç genelinde (tüm Streamlit
+oturumları için) salt okunur, değiştirilemez kayıtlar olarak saklar.
+Kayıtlara ID ve kod ile sözlükten erişilir; seçim kutuları her yeniden
+çalıştırmada veritabanını sorgulamaz.
+
+Görüntü yalnızca katalog alanları (ad, kod, kategori, fiyat, aktiflik...)
+değiştiğinde yeniden oluşturulur; satışların değiştirdiği stok miktarları
+görüntüye dahil değildir ve görüntüyü geçersiz kılmaz.
+"""
+
+import os
+import time
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.models import Product, Category, Ingredient
+
+
+class ProductRecord(NamedTuple):
+    """Ürün katalog kaydı"""
+    id: int
+    code: str
+    name: str
+    description: str
+    category_id: int
+    price: float
+    kdv_rate: float
+    profit_margin: float
+    unit: str
+    is_active: bool
+
+
+class CategoryRecord(NamedTuple):
+    """Ürün kategorisi katalog kaydı"""
+    id: int
+    code: str
+    name: str
+    description: str
+    is_active: bool
+    display_order: int
+
+
+class IngredientRecord(NamedTuple):
+    """Malzeme katalog kaydı"""
+    id: int
+    name: str
+    unit: str
+    is_active: bool
+
+
+class CatalogSnapshot:
+    """Değiştirilemez katalog görüntüsü (ID ve kod indeksli)"""
+
+    def __init__(self, version: int, products: list, categories: list, ingredients: list):
+        self.version = version
+        self.products = tuple(products)
+        self.categories = tuple(categories)
+        self.ingredients = tuple(ingredients)
+
+        self.products_by_id = MappingProxyType({p.id: p for p in self.products})
+        self.products_by_code = MappingProxyType({p.code: p for p in self.products})
+        self.categories_by_id = MappingProxyType({c.id: c for c in self.categories})
+        self.categories_by_code = MappingProxyType({c.code: c for c in self.categories})
+        self.ingredients_by_id = MappingProxyType({i.id: i for i in self.ingredients})
+
+    def active_products(self, category_id: int = None) -> tuple:
+        """Aktif ürünler (ada göre sıralı, isteğe bağlı kategori filtresi)"""
+        return tuple(
+            p for p in self.products
+            if p.is_active and (category_id is None or p.category_id == category_id)
+        )
+
+    def active_categories(self) -> tuple:
+        """Aktif kategoriler"""
+        return tuple(c for c in self.categories if c.is_active)
+
+    def active_ingredients(self) -> tuple:
+        """Aktif malzemeler"""
+        return tuple(i for i in self.ingredients if i.is_active)
+
+    def product_name(self, product_id: int) -> str:
+        """Seçim kutuları için ürün adı"""
+        record = self.products_by_id.get(product_id)
+        return record.name if record else ""
+
+    def category_name(self, category_id: int) -> str:
+        """Seçim kutuları için kategori adı"""
+        record = self.categories_by_id.get(category_id)
+        return record.name if record else ""
+
+    def ingredient_name(self, ingredient_id: int) -> str:
+        """Seçim kutuları için malzeme adı"""
+        record = self.ingredients_by_id.get(ingredient_id)
+        return record.name if record else ""
+
+
+class CatalogCache:
+    """Süreç genelinde paylaşılan katalog görüntüsü"""
+
+    # Diğer süreçlerdeki değişiklikler için üst sınır (saniye)
+    TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+    # Görüntüyü geçersiz kılan katalog alanları
+    CATALOG_FIELDS = {
+        Product: ("code", "name", "description", "category_id", "price",
+                  "kdv_rate", "profit_margin_value", "unit", "is_active"),
+        Category: ("code", "name", "description", "is_active", "display_order"),
+        Ingredient: ("name", "unit", "is_active"),
+    }
+
+    _snapshot = None
+    _built_at = 0.0
+    _version = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: Session) -> CatalogSnapshot:
+        """
+        Güncel katalog görüntüsünü al (gerekirse yeniden oluştur)
+
+        Args:
+            db: Veritabanı oturumu (yalnızca yeniden oluşturmada kullanılır)
+
+        Returns:
+            CatalogSnapshot: Değiştirilemez katalog görüntüsü
+        """
+        with cls._lock:
+            snapshot = cls._snapshot
+            if (
+                snapshot is not None
+                and snapshot.version == cls._version
+                and time.monotonic() - cls._built_at < cls.TTL
+            ):
+                return snapshot
+            version = cls._version
+
+        snapshot = cls._build(db, version)
+
+        with cls._lock:
+            # Oluşturma sırasında katalog değiştiyse görüntüyü saklama
+            if version == cls._version:
+                cls._snapshot = snapshot
+                cls._built_at = time.monotonic()
+
+        return snapshot
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Katalog sürümünü artır (sonraki get yeniden oluşturur)"""
+        with cls._lock:
+            cls._version += 1
+            cls._snapshot = None
+
+    @staticmethod
+    def _build(db: Session, version: int) -> CatalogSnapshot:
+        """Katalog tablolarını üç sorguyla düz kayıtlara oku"""
+        products = [
+            ProductRecord(
+                id=row.id,
+                code=row.code,
+                name=row.name,
+                description=row.description,
+                category_id=row.category_id,
+                price=float(row.price or 0),
+                kdv_rate=float(row.kdv_rate or 0),
+                profit_margin=float(row.profit_margin_value or 0),
+                unit=row.unit,
+                is_active=bool(row.is_active)
+            )
+            for row in db.query(
+                Product.id, Product.code, Product.name, Product.description,
+                Product.category_id, Product.price, Product.kdv_rate,
+                Product.profit_margin_value, Product.unit, Product.is_active
+            ).order_by(Product.name).all()
+        ]
+
+        categories = [
+            CategoryRecord(
+                id=row.id,
+                code=row.code,
+                name=row.name,
+                description=row.description,
+                is_active=bool(row.is_active),
+                display_order=row.display_order or 0
+            )
+            for row in db.query(
+                Category.id, Category.code, Category.name, Category.description,
+                Category.is_active, Category.display_order
+            ).order_by(Category.name).all()
+        ]
+
+        ingredients = [
+            IngredientRecord(
+                id=row.id,
+                name=row.name,
+                unit=row.unit,
+                is_active=bool(row.is_active)
+            )
+            for row in db.query(
+                Ingredient.id, Ingredient.name, Ingredient.unit, Ingredient.is_active
+            ).order_by(Ingredient.name).all()
+        ]
+
+        return CatalogSnapshot(version, products, categories, ingredients)
+
+
+# ============================================================
+# GEÇERSİZ KILMA OLAYLARI
+# ============================================================
+
+_PENDING_KEY = "catalog_cache_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_changes(session, flush_context):
+    """Ürün/kategori/malzeme katalog alanı değişikliklerini işaretle"""
+    if session.info.get(_PENDING_KEY):
+        return
+
+    for obj in list(session.new) + list(session.deleted):
+        if type(obj) in CatalogCache.CATALOG_FIELDS:
+            session.info[_PENDING_KEY] = True
+            return
+
+    for obj in session.dirty:
+        fields = CatalogCache.CATALOG_FIELDS.get(type(obj))
+        if not fields:
+            continue
+        attrs = inspect(obj).attrs
+        if any(getattr(attrs, field).history.has_changes() for field in fields):
+            session.info[_PENDING_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_catalog_changes(session):
+    """Commit edilen katalog değişikliğinden sonra görüntüyü yenile"""
+    if session.info.pop(_PENDING_KEY, False):
+        CatalogCache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_changes(session):
+    """Geri alınan değişiklikler görüntüyü etkilemez"""
+    session.info.pop(_PENDING_KEY, None)
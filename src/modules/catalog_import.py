@@ -0,0 +1,548 @@
+"""
+📥 CafeFlow - Toplu Katalog İçe Aktarımı
+
+Malzeme, ürün ve reçete satırlarını bir CSV veya XLSX dosyasından tek
+transaction içinde ekler/günceller (upsert). Her tablo için mevcut kayıtlar
+tek sorguyla önceden okunur; satır başına varlık sorgusu, flush ve commit
+yapılmaz. Yeni kayıtlar IMPORT_BATCH_SIZE'lık gruplar halinde yazılır.
+
+Dosya biçimleri:
+    - XLSX: "ingredients", "products" ve "recipes" sayfaları
+    - CSV: Tek dosya; `record_type` kolonu (ingredient, product, recipe)
+      satırın hangi tabloya ait olduğunu belirtir
+
+Kolonlar:
+    - ingredients: name, unit, cost_per_unit, quantity (açılış stoku)
+    - products: code, name, category (kod veya ad), price (yeni ürün için
+      zorunlu), kdv_rate, profit_margin, description, quantity (stok adedi,
+      yeni ürün için varsayılan 0)
+    - recipes: product_code, ingredient, quantity, unit
+
+Reçete miktarları `Ingredient.convert_quantity` ile malzemenin stok
+birimine çevrilir; uyumsuz birimler (ör. g -> ml) hata olarak raporlanır.
+Dosyada reçetesi bulunan ürünün mevcut reçetesi dosyadakiyle değiştirilir.
+Hatalı satır varsa hiçbir kayıt yazılmaz.
+
+Komut satırı:
+    python -m src.modules.catalog_import menu.xlsx
+    python -m src.modules.catalog_import menu.csv --dry-run
+"""
+
+import os
+import sys
+import logging
+from decimal import Decimal
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from src.database import DatabaseEngine
+from src.models import Ingredient, Product, Recipe, Category
+from src.modules.cost_cache import ProductCostCache
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogImporter:
+    """Malzeme, ürün ve reçetelerin toplu upsert'i"""
+
+    BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+    # Tablo -> (zorunlu kolonlar, isteğe bağlı kolonlar)
+    SHEETS = {
+        "ingredients": (("name", "unit", "cost_per_unit"), ("quantity",)),
+        "products": (("code", "name", "category"),
+                     ("price", "kdv_rate", "profit_margin", "description", "quantity")),
+        "recipes": (("product_code", "ingredient", "quantity", "unit"), ()),
+    }
+
+    # Eşleştirmede kullanılan metin kolonları (Excel'de sayı olarak okunabilir)
+    KEY_COLUMNS = ("name", "code", "category", "product_code", "ingredient", "unit")
+
+    # Yeni ürünler için boş bırakılabilen alanların varsayılanları (fiyat zorunludur)
+    PRODUCT_DEFAULTS = {
+        "kdv_rate": Decimal("8.0"),
+        "profit_margin_value": Decimal("30.0"),
+        "quantity": 0,
+    }
+
+    # CSV record_type değeri -> tablo
+    RECORD_TYPES = {
+        "ingredient": "ingredients",
+        "product": "products",
+        "recipe": "recipes",
+    }
+
+    @staticmethod
+    def import_file(path: str, dry_run: bool = False, file_name: str = None) -> dict:
+        """
+        CSV/XLSX dosyasını içe aktar
+
+        Args:
+            path: Dosya yolu veya dosya benzeri nesne (ör. Streamlit yüklemesi)
+            dry_run: Yalnızca doğrula, yazma
+            file_name: Biçim tespiti için dosya adı (path dosya nesnesiyse)
+
+        Returns:
+            dict: import_frames raporu
+        """
+        frames = CatalogImporter.read_file(path, file_name)
+
+        db = DatabaseEngine.create_session()
+        try:
+            return CatalogImporter.import_frames(db, dry_run=dry_run, **frames)
+        finally:
+            db.close()
+
+    @staticmethod
+    def read_file(path, file_name: str = None) -> dict:
+        """
+        Dosyayı tablo -> DataFrame sözlüğüne oku
+
+        Raises:
+            ValueError: Desteklenmeyen biçim, eksik record_type kolonu veya
+                XLSX için openpyxl eksik
+        """
+        name = (file_name or str(path)).lower()
+
+        if name.endswith(".xlsx"):
+            try:
+                sheets = pd.read_excel(path, sheet_name=None, dtype=object, engine="openpyxl")
+            except ImportError:
+                raise ValueError("XLSX içe aktarımı için openpyxl kurulu olmalı!")
+            return {
+                sheet: frame for sheet, frame in sheets.items()
+                if sheet in CatalogImporter.SHEETS
+            }
+
+        if name.endswith(".csv"):
+            frame = pd.read_csv(path, dtype=object, encoding="utf-8-sig")
+            if "record_type" not in frame.columns:
+                raise ValueError("CSV dosyasında 'record_type' kolonu olmalıdır!")
+            record_types = frame["record_type"].str.strip().str.lower()
+            return {
+                sheet: frame[record_types == record_type].drop(columns="record_type")
+                for record_type, sheet in CatalogImporter.RECORD_TYPES.items()
+            }
+
+        raise ValueError("Desteklenen dosya biçimleri: .csv, .xlsx")
+
+    @staticmethod
+    def import_frames(
+        db: Session,
+        ingredients: pd.DataFrame = None,
+        products: pd.DataFrame = None,
+        recipes: pd.DataFrame = None,
+        dry_run: bool = False
+    ) -> dict:
+        """
+        Malzeme, ürün ve reçete tablolarını doğrula ve tek commit ile yaz
+
+        Args:
+            db: Veritabanı oturumu
+            ingredients: Malzeme satırları
+            products: Ürün satırları
+            recipes: Reçete satırları
+            dry_run: Yalnızca doğrula, yazma
+
+        Returns:
+            dict: ingredients/products/recipes sayıları (created, updated,
+                deleted), valid_rows, errors listesi ve written (yazıldı mı?)
+        """
+        frames = {
+            "ingredients": ingredients,
+            "products": products,
+            "recipes": recipes,
+        }
+        errors = []
+        rows = {
+            sheet: CatalogImporter._records(sheet, frame, errors)
+            for sheet, frame in frames.items()
+        }
+
+        # Varlık kontrolü: tablo başına tek ön okuma
+        existing_ingredients = CatalogImporter._prefetch(
+            db, Ingredient, Ingredient.name,
+            {row["name"] for _, row in rows["ingredients"]}
+            | {row["ingredient"] for _, row in rows["recipes"]}
+        )
+        existing_products = CatalogImporter._prefetch(
+            db, Product, Product.code,
+            {row["code"] for _, row in rows["products"]}
+            | {row["product_code"] for _, row in rows["recipes"]}
+        )
+        categories = {}
+        for category in db.query(Category).all():
+            categories[category.code] = category
+            categories[category.name] = category
+
+        ingredient_rows = CatalogImporter._validate_ingredients(
+            rows["ingredients"], existing_ingredients, errors
+        )
+        product_rows = CatalogImporter._validate_products(
+            rows["products"], existing_products, categories, errors
+        )
+
+        # Reçeteler dosyadaki (henüz yazılmamış) malzeme birimlerine göre de doğrulanır
+        units = {name: ingredient.unit for name, ingredient in existing_ingredients.items()}
+        units.update({row["name"]: row["unit"] for row in ingredient_rows})
+        known_products = set(existing_products) | {row["code"] for row in product_rows}
+        recipe_lines = CatalogImporter._validate_recipes(
+            rows["recipes"], units, known_products, errors
+        )
+
+        report = {
+            "ingredients": {"created": 0, "updated": 0},
+            "products": {"created": 0, "updated": 0},
+            "recipes": {"created": 0, "updated": 0, "deleted": 0},
+            "valid_rows": {
+                "ingredients": len(ingredient_rows),
+                "products": len(product_rows),
+                "recipes": sum(len(items) for items in recipe_lines.values()),
+            },
+            "errors": errors,
+            "written": False,
+        }
+        if errors or dry_run:
+            return report
+
+        try:
+            CatalogImporter._upsert_ingredients(
+                db, ingredient_rows, existing_ingredients, report["ingredients"]
+            )
+            CatalogImporter._upsert_products(
+                db, product_rows, existing_products, report["products"]
+            )
+            CatalogImporter._replace_recipes(
+                db, recipe_lines, existing_ingredients, existing_products, report["recipes"]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Toplu eklenen reçete satırları oturum olaylarından geçmez
+        ProductCostCache.invalidate_products(
+            [existing_products[code].id for code in recipe_lines]
+        )
+
+        report["written"] = True
+        logger.info(
+            "✓ Katalog içe aktarıldı: %s malzeme, %s ürün, %s reçete satırı",
+            sum(report["ingredients"].values()),
+            sum(report["products"].values()),
+            report["recipes"]["created"] + report["recipes"]["updated"]
+        )
+        return report
+
+    # ============================================================
+    # OKUMA VE DOĞRULAMA
+    # ============================================================
+
+    @staticmethod
+    def _records(sheet: str, frame: pd.DataFrame, errors: list) -> list:
+        """DataFrame'i (satır no, sözlük) listesine çevir; eksik kolonları raporla"""
+        if frame is None or frame.empty:
+            return []
+
+        frame = frame.rename(columns=lambda column: str(column).strip().lower())
+        required, optional = CatalogImporter.SHEETS[sheet]
+        missing = [column for column in required if column not in frame.columns]
+        if missing:
+            errors.append(f"{sheet}: eksik kolonlar: {', '.join(missing)}")
+            return []
+
+        frame = frame.reindex(columns=list(required) + list(optional))
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        # Satır numarası dosyadaki satırdır (başlık 1. satır); CSV'nin record_type
+        # alt kümeleri özgün indeksi korur
+        if pd.api.types.is_integer_dtype(frame.index):
+            row_numbers = frame.index + 2
+        else:
+            row_numbers = range(2, len(frame) + 2)
+
+        records = []
+        for row_no, record in zip(row_numbers, frame.to_dict("records")):
+            for key in CatalogImporter.KEY_COLUMNS:
+                value = record.get(key)
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                if value is not None:
+                    value = str(value).strip() or None
+                if key in record:
+                    record[key] = value
+            records.append((int(row_no), record))
+        return records
+
+    @staticmethod
+    def _number(value, field: str, row_no: int, sheet: str, errors: list,
+                positive: bool = False):
+        """Sayısal alanı doğrula (Türkçe ondalık virgül kabul edilir)"""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            errors.append(f"{sheet} satır {row_no}: '{field}' boş olamaz")
+            return None
+        try:
+            number = float(str(value).replace(",", ".")) if isinstance(value, str) else float(value)
+        except ValueError:
+            errors.append(f"{sheet} satır {row_no}: '{field}' sayı olmalı ({value})")
+            return None
+        if number < 0 or (positive and number == 0):
+            errors.append(f"{sheet} satır {row_no}: '{field}' 0'dan büyük olmalı ({value})")
+            return None
+        return number
+
+    @staticmethod
+    def _validate_ingredients(records: list, existing: dict, errors: list) -> list:
+        """Malzeme satırlarını doğrula"""
+        valid, seen = [], set()
+        for row_no, row in records:
+            name, unit = row["name"], row["unit"]
+            if not name:
+                errors.append(f"ingredients satır {row_no}: 'name' boş olamaz")
+                continue
+            if name in seen:
+                errors.append(f"ingredients satır {row_no}: '{name}' dosyada birden fazla")
+                continue
+            seen.add(name)
+
+            if unit not in Ingredient.UNITS:
+                errors.append(
+                    f"ingredients satır {row_no}: geçersiz birim '{unit}' "
+                    f"({', '.join(Ingredient.UNITS)})"
+                )
+                continue
+            current = existing.get(name)
+            if current is not None and current.unit != unit:
+                errors.append(
+                    f"ingredients satır {row_no}: '{name}' birimi değiştirilemez "
+                    f"({current.unit} -> {unit})"
+                )
+                continue
+
+            cost = CatalogImporter._number(
+                row["cost_per_unit"], "cost_per_unit", row_no, "ingredients", errors, positive=True
+            )
+            quantity = 0.0
+            if row["quantity"] is not None:
+                quantity = CatalogImporter._number(
+                    row["quantity"], "quantity", row_no, "ingredients", errors
+                )
+            if cost is not None and quantity is not None:
+                valid.append({"name": name, "unit": unit, "cost_per_unit": cost, "quantity": quantity})
+        return valid
+
+    @staticmethod
+    def _validate_products(records: list, existing: dict, categories: dict, errors: list) -> list:
+        """Ürün satırlarını doğrula (yeni ürünlerde fiyat zorunlu)"""
+        valid, seen = [], set()
+        for row_no, row in records:
+            code, name = row["code"], row["name"]
+            if not code or not name:
+                errors.append(f"products satır {row_no}: 'code' ve 'name' boş olamaz")
+                continue
+            if code in seen:
+                errors.append(f"products satır {row_no}: '{code}' dosyada birden fazla")
+                continue
+            seen.add(code)
+
+            category = categories.get(row["category"])
+            if category is None:
+                errors.append(f"products satır {row_no}: kategori bulunamadı '{row['category']}'")
+                continue
+
+            record = {"code": code, "name": name, "category_id": category.id}
+            if row["description"] is not None:
+                record["description"] = row["description"]
+
+            if row["price"] is None and code not in existing:
+                errors.append(f"products satır {row_no}: yeni ürün '{code}' için 'price' boş olamaz")
+                continue
+
+            # Boş bırakılan alanlar mevcut üründe değiştirilmez
+            invalid = False
+            for column, field in (("price", "price"), ("kdv_rate", "kdv_rate"),
+                                  ("profit_margin", "profit_margin_value")):
+                if row[column] is None:
+                    continue
+                number = CatalogImporter._number(
+                    row[column], column, row_no, "products", errors, positive=column == "price"
+                )
+                if number is None:
+                    invalid = True
+                else:
+                    record[field] = Decimal(str(number))
+
+            if row["quantity"] is not None:
+                quantity = CatalogImporter._number(
+                    row["quantity"], "quantity", row_no, "products", errors
+                )
+                if quantity is None:
+                    invalid = True
+                elif not quantity.is_integer():
+                    errors.append(f"products satır {row_no}: 'quantity' tam sayı olmalı ({row['quantity']})")
+                    invalid = True
+                else:
+                    record["quantity"] = int(quantity)
+
+            if not invalid:
+                valid.append(record)
+        return valid
+
+    @staticmethod
+    def _validate_recipes(records: list, units: dict, known_products: set, errors: list) -> dict:
+        """
+        Reçete satırlarını doğrula ve malzemenin stok birimine çevir
+
+        Returns:
+            dict: {ürün kodu: {malzeme adı: stok biriminde miktar}}
+        """
+        lines = {}
+        for row_no, row in records:
+            product_code, ingredient = row["product_code"], row["ingredient"]
+            if product_code not in known_products:
+                errors.append(f"recipes satır {row_no}: ürün bulunamadı '{product_code}'")
+                continue
+            if ingredient not in units:
+                errors.append(f"recipes satır {row_no}: malzeme bulunamadı '{ingredient}'")
+                continue
+
+            quantity = CatalogImporter._number(
+                row["quantity"], "quantity", row_no, "recipes", errors, positive=True
+            )
+            if quantity is None:
+                continue
+            try:
+                quantity = Ingredient.convert_quantity(quantity, row["unit"], units[ingredient])
+            except (ValueError, KeyError):
+                errors.append(
+                    f"recipes satır {row_no}: '{row['unit']}' birimi "
+                    f"'{ingredient}' ({units[ingredient]}) ile uyumlu değil"
+                )
+                continue
+
+            product_lines = lines.setdefault(product_code, {})
+            # Aynı malzeme birden fazla satırdaysa miktarlar toplanır
+            product_lines[ingredient] = product_lines.get(ingredient, 0) + quantity
+        return lines
+
+    # ============================================================
+    # YAZMA
+    # ============================================================
+
+    @staticmethod
+    def _prefetch(db: Session, model, key_column, keys: set) -> dict:
+        """Anahtarı verilen mevcut kayıtları tek seferde (parçalı IN) oku"""
+        keys = [key for key in keys if key is not None]
+        found = {}
+        for start in range(0, len(keys), CatalogImporter.BATCH_SIZE):
+            batch = keys[start:start + CatalogImporter.BATCH_SIZE]
+            for obj in db.query(model).filter(key_column.in_(batch)).all():
+                found[getattr(obj, key_column.key)] = obj
+        return found
+
+    @staticmethod
+    def _add_in_batches(db: Session, objects: list) -> None:
+        """Yeni kayıtları gruplar halinde ekle (grup başına bir flush)"""
+        for start in range(0, len(objects), CatalogImporter.BATCH_SIZE):
+            db.add_all(objects[start:start + CatalogImporter.BATCH_SIZE])
+            db.flush()
+
+    @staticmethod
+    def _upsert_ingredients(db: Session, rows: list, existing: dict, counts: dict) -> None:
+        """Malzemeleri ekle/güncelle (mevcut malzemenin stoğu değiştirilmez)"""
+        new = []
+        for row in rows:
+            ingredient = existing.get(row["name"])
+            if ingredient is None:
+                ingredient = Ingredient(**row)
+                existing[row["name"]] = ingredient
+                new.append(ingredient)
+            elif ingredient.cost_per_unit != row["cost_per_unit"]:
+                ingredient.cost_per_unit = row["cost_per_unit"]
+                counts["updated"] += 1
+
+        CatalogImporter._add_in_batches(db, new)
+        counts["created"] = len(new)
+
+    @staticmethod
+    def _upsert_products(db: Session, rows: list, existing: dict, counts: dict) -> None:
+        """Ürünleri ekle/güncelle"""
+        new = []
+        for row in rows:
+            product = existing.get(row["code"])
+            if product is None:
+                product = Product(**{**CatalogImporter.PRODUCT_DEFAULTS, **row})
+                existing[row["code"]] = product
+                new.append(product)
+                continue
+
+            changed = False
+            for field, value in row.items():
+                if getattr(product, field) != value:
+                    setattr(product, field, value)
+                    changed = True
+            if changed:
+                counts["updated"] += 1
+
+        CatalogImporter._add_in_batches(db, new)
+        counts["created"] = len(new)
+
+    @staticmethod
+    def _replace_recipes(
+        db: Session,
+        lines: dict,
+        ingredients: dict,
+        products: dict,
+        counts: dict
+    ) -> None:
+        """Dosyadaki ürünlerin reçetelerini dosyadakiyle değiştir"""
+        product_ids = [products[code].id for code in lines]
+        current = {}
+        for start in range(0, len(product_ids), CatalogImporter.BATCH_SIZE):
+            batch = product_ids[start:start + CatalogImporter.BATCH_SIZE]
+            for recipe in db.query(Recipe).filter(Recipe.product_id.in_(batch)).all():
+                current[(recipe.product_id, recipe.ingredient_id)] = recipe
+
+        new = []
+        for product_code, items in lines.items():
+            product = products[product_code]
+            for ingredient_name, quantity in items.items():
+                ingredient = ingredients[ingredient_name]
+                recipe = current.pop((product.id, ingredient.id), None)
+                if recipe is None:
+                    new.append({
+                        "product_id": product.id,
+                        "ingredient_id": ingredient.id,
+                        "quantity": quantity,
+                        "unit": ingredient.unit,
+                    })
+                elif recipe.quantity != quantity or recipe.unit != ingredient.unit:
+                    recipe.quantity = quantity
+                    recipe.unit = ingredient.unit
+                    counts["updated"] += 1
+
+        # Dosyada artık bulunmayan reçete satırları
+        for recipe in current.values():
+            db.delete(recipe)
+        counts["deleted"] = len(current)
+
+        # Yeni satırların ID'si gerekmez: RETURNING'siz toplu INSERT (executemany)
+        for start in range(0, len(new), CatalogImporter.BATCH_SIZE):
+            db.execute(insert(Recipe), new[start:start + CatalogImporter.BATCH_SIZE])
+        counts["created"] = len(new)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print(__doc__)
+        exit(1)
+
+    result = CatalogImporter.import_file(args[0], dry_run="--dry-run" in sys.argv)
+    for error in result["errors"]:
+        print(f"✗ {error}")
+    for sheet in ("ingredients", "products", "recipes"):
+        print(f"{sheet}: {result[sheet]}")
+    print("✓ Yazıldı" if result["written"] else "✗ Yazılmadı")
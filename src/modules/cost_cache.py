@@ -0,0 +1,164 @@
+"""
+💾 CafeFlow - Ürün Maliyet Önbelleği
+
+Reçete maliyetlerini (ürün başına malzeme maliyeti) süreç içinde saklar.
+Reçete ve malzeme maliyeti değişiklikleri SQLAlchemy flush/commit
+olaylarıyla yakalanır ve ilgili ürünlerin maliyeti önbellekten silinir.
+"""
+
+import os
+import time
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.models import Ingredient, Recipe, loader_options
+
+
+class ProductCostCache:
+    """Ürün ID'si -> toplam malzeme maliyeti önbelleği"""
+
+    # Diğer süreçlerdeki değişiklikler için üst sınır (saniye)
+    TTL = float(os.getenv("COST_CACHE_TTL", "300"))
+
+    _costs = {}         # product_id -> (maliyet, zaman)
+    _dependents = {}    # ingredient_id -> {product_id, ...}
+    _generation = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: Session, product_id: int) -> float:
+        """
+        Ürün maliyetini al (önbellekte yoksa reçeteden hesapla)
+
+        Args:
+            db: Veritabanı oturumu
+            product_id: Ürün ID'si
+
+        Returns:
+            float: Toplam malzeme maliyeti
+        """
+        with cls._lock:
+            cached = cls._costs.get(product_id)
+            if cached and time.monotonic() - cached[1] < cls.TTL:
+                return cached[0]
+            generation = cls._generation
+
+        recipe_items = db.query(Recipe).options(
+            *loader_options(Recipe, "pos")
+        ).filter(Recipe.product_id == product_id).all()
+
+        return cls._store(product_id, recipe_items, generation)
+
+    @classmethod
+    def compute(cls, product_id: int, recipe_items: list) -> float:
+        """
+        Önceden yüklenmiş reçete satırlarından maliyeti hesapla ve sakla
+
+        Args:
+            product_id: Ürün ID'si
+            recipe_items: Ürünün Recipe satırları (malzemeleri yüklü)
+
+        Returns:
+            float: Toplam malzeme maliyeti
+        """
+        with cls._lock:
+            generation = cls._generation
+        return cls._store(product_id, recipe_items, generation)
+
+    @classmethod
+    def _store(cls, product_id: int, recipe_items: list, generation: int) -> float:
+        """Maliyeti hesapla; arada geçersiz kılma olmadıysa önbelleğe yaz"""
+        total_cost = 0
+        ingredient_ids = set()
+        for item in recipe_items:
+            if item.ingredient:
+                total_cost += item.quantity * item.ingredient.cost_per_unit
+                ingredient_ids.add(item.ingredient_id)
+
+        with cls._lock:
+            # Hesaplama sırasında bir değişiklik olduysa eski değeri saklama
+            if generation == cls._generation:
+                cls._costs[product_id] = (total_cost, time.monotonic())
+                for ingredient_id in ingredient_ids:
+                    cls._dependents.setdefault(ingredient_id, set()).add(product_id)
+
+        return total_cost
+
+    @classmethod
+    def invalidate_products(cls, product_ids) -> None:
+        """Verilen ürünlerin maliyetini önbellekten sil"""
+        with cls._lock:
+            cls._generation += 1
+            for product_id in product_ids:
+                cls._costs.pop(product_id, None)
+
+    @classmethod
+    def invalidate_ingredients(cls, ingredient_ids) -> None:
+        """Verilen malzemeleri kullanan tüm ürünlerin maliyetini sil"""
+        with cls._lock:
+            cls._generation += 1
+            for ingredient_id in ingredient_ids:
+                for product_id in cls._dependents.pop(ingredient_id, ()):
+                    cls._costs.pop(product_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Önbelleği tamamen temizle"""
+        with cls._lock:
+            cls._generation += 1
+            cls._costs = {}
+            cls._dependents = {}
+
+
+# ============================================================
+# GEÇERSİZ KILMA OLAYLARI
+# ============================================================
+
+_PENDING_KEY = "cost_cache_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cost_changes(session, flush_context):
+    """Flush edilen reçete/malzeme maliyeti değişikliklerini topla"""
+    product_ids = set()
+    ingredient_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Recipe):
+            product_ids.add(obj.product_id)
+            product_ids.update(inspect(obj).attrs.product_id.history.deleted or ())
+        elif isinstance(obj, Ingredient) and obj.id is not None:
+            attrs = inspect(obj).attrs
+            if (
+                obj in session.deleted
+                or attrs.cost_per_unit.history.has_changes()
+                or attrs.unit.history.has_changes()
+            ):
+                ingredient_ids.add(obj.id)
+
+    if not product_ids and not ingredient_ids:
+        return
+
+    # Aynı oturumdaki sonraki hesaplamalar için hemen, diğer oturumların
+    # commit öncesi okuduğu eski değerler için commit sonrası tekrar sil
+    ProductCostCache.invalidate_products(product_ids)
+    ProductCostCache.invalidate_ingredients(ingredient_ids)
+
+    pending = session.info.setdefault(_PENDING_KEY, (set(), set()))
+    pending[0].update(product_ids)
+    pending[1].update(ingredient_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cost_changes(session):
+    """Commit edilen değişiklikler için önbelleği tekrar geçersiz kıl"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        ProductCostCache.invalidate_products(pending[0])
+        ProductCostCache.invalidate_ingredients(pending[1])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cost_changes(session):
+    """Geri alınan işlemin bekleyen kayıtlarını bırak"""
+    session.info.pop(_PENDING_KEY, None)
@@ -5,13 +5,15 @@ Sabit ve değişken masrafları takip eder, CRUD işlemleri ve raporlama
 """
 
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from src.database import DatabaseEngine
+from sqlalchemy import func, case
+from src.database import DatabaseEngine, KeysetPage, keyset_paginate
 from src.models import Expense, ExpenseCategory
-from src.utils.locale_utils import format_currency, format_datetime
+from src.utils.locale_utils import format_currency, format_frame, format_currency_series
+from src.utils.date_buckets import date_bucket, in_period
+from src.modules.pager_ui import current_cursor, render_pager
 
 
 def load_expense_categories(db: Session) -> dict:
@@ -91,7 +93,110 @@ class ExpenseManager:
             list: Masraf listesi
         """
         return db.query(Expense).order_by(Expense.created_at.desc()).all()
-    
+
+    # Sayfalı liste sıralamaları: ad -> (sıralama anahtarı, azalan mı?)
+    PAGE_SORTS = {
+        "newest": ((Expense.created_at, Expense.id), True),
+        "oldest": ((Expense.created_at, Expense.id), False),
+        "amount_desc": ((Expense.amount, Expense.id), True),
+    }
+
+    @staticmethod
+    def _filtered_query(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        category: str = None,
+        payment_method: str = None,
+        is_recurring: bool = None,
+    ):
+        """Liste filtrelerini veritabanı sorgusuna çevir"""
+        query = db.query(Expense)
+        if start_date is not None:
+            query = query.filter(Expense.created_at >= start_date)
+        if end_date is not None:
+            query = query.filter(Expense.created_at <= end_date)
+        if category is not None:
+            query = query.filter(Expense.category == category)
+        if payment_method is not None:
+            query = query.filter(Expense.payment_method == payment_method)
+        if is_recurring is not None:
+            query = query.filter(Expense.is_recurring == is_recurring)
+        return query
+
+    @staticmethod
+    def get_expenses_page(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        category: str = None,
+        payment_method: str = None,
+        is_recurring: bool = None,
+        sort: str = "newest",
+        cursor: tuple = None,
+        limit: int = 50,
+    ) -> KeysetPage:
+        """
+        Masrafları imleç tabanlı sayfalarla al
+
+        Filtreler ve sıralama veritabanında uygulanır; her çağrı yalnızca bir
+        sayfa (limit + 1 satır) okur.
+
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (dahil)
+            end_date: Bitiş (dahil)
+            category: Kategori filtresi
+            payment_method: Ödeme yöntemi filtresi
+            is_recurring: Tekrarlayan filtresi (None: tümü)
+            sort: Sıralama (newest, oldest, amount_desc)
+            cursor: Önceki sayfanın next_cursor değeri
+            limit: Sayfa boyutu
+
+        Returns:
+            KeysetPage: Masraflar ve sonraki sayfa imleci
+        """
+        if sort not in ExpenseManager.PAGE_SORTS:
+            raise ValueError(f"Geçersiz sıralama: {sort}")
+        sort_columns, descending = ExpenseManager.PAGE_SORTS[sort]
+
+        query = ExpenseManager._filtered_query(
+            db, start_date, end_date, category, payment_method, is_recurring
+        )
+        return keyset_paginate(query, sort_columns, cursor, limit, descending)
+
+    @staticmethod
+    def get_expense_totals(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        category: str = None,
+        payment_method: str = None,
+        is_recurring: bool = None,
+    ) -> dict:
+        """
+        Filtrelenmiş masrafların özet istatistikleri (tek toplama sorgusu)
+
+        Returns:
+            dict: count, total, recurring, average
+        """
+        query = ExpenseManager._filtered_query(
+            db, start_date, end_date, category, payment_method, is_recurring
+        )
+        row = query.with_entities(
+            func.count(Expense.id),
+            func.coalesce(func.sum(Expense.amount), 0),
+            func.coalesce(func.sum(case((Expense.is_recurring == True, 1), else_=0)), 0),
+        ).one()
+
+        count, total, recurring = int(row[0]), float(row[1]), int(row[2])
+        return {
+            "count": count,
+            "total": total,
+            "recurring": recurring,
+            "average": total / count if count else 0,
+        }
+
     @staticmethod
     def get_expenses_by_date_range(
         db: Session,
@@ -271,13 +376,15 @@ class ExpenseManager:
         if not year:
             year = datetime.now().year
         
+        # Yıl filtresi indeksli aralık olarak; ay anahtarı lehçeye göre
+        month = date_bucket(db, Expense.created_at, "month_of_year")
         query = db.query(
-            func.strftime('%m', Expense.created_at).label("month"),
+            month.label("month"),
             func.sum(Expense.amount).label("total")
         ).filter(
-            func.strftime('%Y', Expense.created_at) == str(year)
+            in_period(Expense.created_at, year)
         ).group_by(
-            func.strftime('%m', Expense.created_at)
+            month
         ).order_by("month")
         
         months = {
@@ -310,28 +417,48 @@ class ExpenseManager:
         Returns:
             dict: Masraf özeti
         """
-        query = db.query(Expense)
+        # Kategori başına adet, tutar ve tekrarlayan adedi: tek gruplu sorgu
+        query = db.query(
+            Expense.category,
+            ExpenseCategory.name,
+            func.count(Expense.id).label("count"),
+            func.sum(Expense.amount).label("total"),
+            func.sum(case((Expense.is_recurring == True, 1), else_=0)).label("recurring")
+        ).outerjoin(
+            ExpenseCategory, ExpenseCategory.code == Expense.category
+        )
         
         if start_date:
             query = query.filter(Expense.created_at >= start_date)
         if end_date:
             query = query.filter(Expense.created_at <= end_date)
         
-        expenses = query.all()
+        rows = query.group_by(
+            Expense.category, ExpenseCategory.name
+        ).order_by(func.sum(Expense.amount).desc()).all()
         
-        total_amount = sum(float(e.amount) for e in expenses)
-        recurring_count = len([e for e in expenses if e.is_recurring])
-        non_recurring_count = len([e for e in expenses if not e.is_recurring])
+        total_count = 0
+        total_amount = 0.0
+        recurring_count = 0
+        category_summary = {}
+        for category, category_name, count, total, recurring in rows:
+            total_count += count
+            total_amount += float(total or 0)
+            recurring_count += int(recurring or 0)
+            
+            name = category_name or Expense.EXPENSE_CATEGORIES.get(category, category)
+            category_summary[name] = category_summary.get(name, 0) + float(total or 0)
         
-        category_summary = ExpenseManager.get_expenses_by_category_sum(db, start_date, end_date)
+        # Takvim günü sayısı (başlangıç ve bitiş günü dahil)
+        days = (end_date.date() - start_date.date()).days + 1 if end_date and start_date else 0
         
         return {
-            "total_count": len(expenses),
+            "total_count": total_count,
             "total_amount": total_amount,
             "recurring_count": recurring_count,
-            "non_recurring_count": non_recurring_count,
+            "non_recurring_count": total_count - recurring_count,
             "category_summary": category_summary,
-            "average_per_day": total_amount / (end_date - start_date).days if end_date and start_date else 0
+            "average_per_day": total_amount / days if days > 0 else 0
         }
 
 
@@ -396,69 +523,76 @@ def render_expenses_page():
             
             st.markdown("---")
             
-            # Masrafları al
-            expenses = ExpenseManager.get_expenses_by_date_range(
+            sort_labels = {"newest": "En yeni", "oldest": "En eski", "amount_desc": "En yüksek tutar"}
+            col1, col2 = st.columns(2)
+            with col1:
+                expense_sort = st.selectbox(
+                    "Sıralama",
+                    list(ExpenseManager.PAGE_SORTS.keys()),
+                    format_func=lambda x: sort_labels[x],
+                    key="expense_list_sort"
+                )
+            with col2:
+                page_size = st.selectbox("Sayfa Boyutu", [25, 50, 100, 200], index=1, key="expense_page_size")
+            
+            # Filtreler veritabanında uygulanır
+            filters = {
+                "start_date": datetime.combine(start_date, datetime.min.time()),
+                "end_date": datetime.combine(end_date, datetime.max.time()),
+                "category": next(
+                    (k for k, v in cats.items() if v == category_filter), None
+                ) if category_filter != "Tümü" else None,
+                "payment_method": next(
+                    (k for k, v in Expense.PAYMENT_METHODS.items() if v == payment_filter), None
+                ) if payment_filter != "Tümü" else None,
+                "is_recurring": {"Tekrarlayan": True, "Tek Seferlik": False}.get(recurring_filter),
+            }
+            
+            signature = (tuple(filters.values()), expense_sort, page_size)
+            page = ExpenseManager.get_expenses_page(
                 db,
-                datetime.combine(start_date, datetime.min.time()),
-                datetime.combine(end_date, datetime.max.time())
+                sort=expense_sort,
+                cursor=current_cursor("expense_list_pages", signature),
+                limit=page_size,
+                **filters
             )
-            
-            # Filtrele
-            if category_filter != "Tümü":
-                category_key = next(
-                    (k for k, v in cats.items() if v == category_filter),
-                    None
-                )
-                expenses = [e for e in expenses if e.category == category_key]
-            
-            if payment_filter != "Tümü":
-                payment_key = next(
-                    (k for k, v in Expense.PAYMENT_METHODS.items() if v == payment_filter),
-                    None
-                )
-                expenses = [e for e in expenses if e.payment_method == payment_key]
-            
-            if recurring_filter == "Tekrarlayan":
-                expenses = [e for e in expenses if e.is_recurring]
-            elif recurring_filter == "Tek Seferlik":
-                expenses = [e for e in expenses if not e.is_recurring]
+            expenses = page.items
             
             if expenses:
                 # Veri tablosu
-                expense_data = []
-                for expense in expenses:
-                    expense_data.append({
-                        "ID": expense.id,
-                        "Tarih": expense.created_at.strftime("%d.%m.%Y %H:%M"),
-                        "Açıklama": expense.description,
-                        "Kategori": expense.category_display,
-                        "Tutar": format_currency(float(expense.amount)),
-                        "Ödeme": expense.payment_method_display,
-                        "Referans": expense.reference_number or "-",
-                        "Tür": expense.recurring_type_display,
-                    })
-                
-                df = pd.DataFrame(expense_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
+                df = pd.DataFrame({
+                    "ID": [expense.id for expense in expenses],
+                    "Tarih": [expense.created_at for expense in expenses],
+                    "Açıklama": [expense.description for expense in expenses],
+                    "Kategori": [expense.category_display for expense in expenses],
+                    "Tutar": [float(expense.amount) for expense in expenses],
+                    "Ödeme": [expense.payment_method_display for expense in expenses],
+                    "Referans": [expense.reference_number or "-" for expense in expenses],
+                    "Tür": [expense.recurring_type_display for expense in expenses],
+                })
+                st.dataframe(
+                    format_frame(df, currency=("Tutar",), datetime_columns={"Tarih": "%d.%m.%Y %H:%M"}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                render_pager("expense_list_pages", page)
                 
-                # İstatistikler
+                # İstatistikler (tüm filtrelenmiş kayıtlar üzerinden)
+                totals = ExpenseManager.get_expense_totals(db, **filters)
                 st.markdown("---")
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("Toplam Masraf", len(expenses))
+                    st.metric("Toplam Masraf", totals["count"])
                 
                 with col2:
-                    total = sum(float(e.amount) for e in expenses)
-                    st.metric("Toplam Tutar", format_currency(total))
+                    st.metric("Toplam Tutar", format_currency(totals["total"]))
                 
                 with col3:
-                    recurring = len([e for e in expenses if e.is_recurring])
-                    st.metric("Tekrarlayan", recurring)
+                    st.metric("Tekrarlayan", totals["recurring"])
                 
                 with col4:
-                    avg = sum(float(e.amount) for e in expenses) / len(expenses)
-                    st.metric("Ort. Masraf", format_currency(avg))
+                    st.metric("Ort. Masraf", format_currency(totals["average"]))
             else:
                 st.info("Masraf kaydı bulunamadı")
         
@@ -611,7 +745,7 @@ def render_expenses_page():
                     list(category_data.items()),
                     columns=["Kategori", "Tutar"]
                 )
-                category_df["Tutar"] = category_df["Tutar"].apply(lambda x: format_currency(x))
+                category_df["Tutar"] = format_currency_series(category_df["Tutar"])
                 
                 st.dataframe(category_df, use_container_width=True, hide_index=True)
                 
@@ -673,20 +807,26 @@ def render_expenses_page():
         with tab4:
             st.subheader("Masraf Düzenle / Sil")
             
-            # Masraf seç
-            all_expenses = ExpenseManager.get_all_expenses(db)
+            # Masraf seç (en yeniden eskiye, sayfa sayfa)
+            edit_page = ExpenseManager.get_expenses_page(
+                db,
+                cursor=current_cursor("expense_edit_pages", ()),
+                limit=100
+            )
+            expenses_by_id = {e.id: e for e in edit_page.items}
             
-            if all_expenses:
+            if expenses_by_id:
                 selected_expense_id = st.selectbox(
                     "Masraf Seç",
-                    options=[e.id for e in all_expenses],
-                    format_func=lambda x: next(
-                        (f"{e.created_at.strftime('%d.%m.%Y')} - {e.description} (₺{e.amount})" for e in all_expenses if e.id == x),
-                        ""
+                    options=list(expenses_by_id.keys()),
+                    format_func=lambda x: (
+                        f"{expenses_by_id[x].created_at.strftime('%d.%m.%Y')} - "
+                        f"{expenses_by_id[x].description} (₺{expenses_by_id[x].amount})"
                     )
                 )
+                render_pager("expense_edit_pages", edit_page)
                 
-                selected_expense = next((e for e in all_expenses if e.id == selected_expense_id), None)
+                selected_expense = expenses_by_id.get(selected_expense_id)
                 
                 if selected_expense:
                     st.markdown("---")
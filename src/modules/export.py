@@ -0,0 +1,416 @@
+"""
+📤 CafeFlow - Toplu Veri Dışa Aktarımı
+
+Satış, masraf ve stok hareketlerini sabit boyutlu parçalar halinde
+CSV, gzip'li CSV veya Parquet dosyasına yazar. Her parça ayrı ve kısa bir
+okuma transaction'ı ile (id > son_id sırasıyla) çekilir; bellek kullanımı
+parça boyutuyla sınırlıdır ve kasa veritabanı uzun süre meşgul edilmez.
+
+Artımlı dışa aktarım (incremental=True) her veri seti için en son yazılan
+ID'yi EXPORT_PATH altındaki durum dosyasında saklar; bir sonraki çalıştırma
+yalnızca bu ID'den sonraki kayıtları yazar.
+
+Komut satırı:
+    python -m src.modules.export sales csv.gz --incremental
+    python -m src.modules.export expenses parquet 2025-01-01 2025-03-31
+"""
+
+import os
+import sys
+import gzip
+import json
+import logging
+from datetime import datetime, date
+from sqlalchemy import select, func
+from src.database import DatabaseEngine
+from src.models import (
+    Sale, Expense, ExpenseCategory, Product, Category,
+    StockMovement, Ingredient, IngredientMovement
+)
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DataExporter:
+    """Parçalı ve kaldığı yerden devam edebilen dışa aktarım"""
+
+    EXPORT_PATH = os.getenv("EXPORT_PATH", "data/exports")
+    CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+
+    # Biçim -> dosya uzantısı
+    FORMATS = {
+        "csv": "csv",
+        "csv.gz": "csv.gz",
+        "parquet": "parquet",
+    }
+
+    # Veri seti -> kolon tipleri (tüm parçalarda aynı şema)
+    DATASETS = {
+        "sales": {
+            "id": "int64",
+            "sale_number": "string",
+            "created_at": "datetime64[ns]",
+            "product": "string",
+            "category": "string",
+            "quantity": "int64",
+            "sale_price_without_kdv": "float64",
+            "kdv_rate": "float64",
+            "kdv_amount": "float64",
+            "total_with_kdv": "float64",
+            "product_cost": "float64",
+            "net_profit": "float64",
+            "payment_method": "string",
+            "is_refunded": "bool",
+            "refund_reason": "string",
+        },
+        "expenses": {
+            "id": "int64",
+            "created_at": "datetime64[ns]",
+            "category_code": "string",
+            "category": "string",
+            "description": "string",
+            "amount": "float64",
+            "payment_method": "string",
+            "is_recurring": "bool",
+            "notes": "string",
+        },
+        "stock_movements": {
+            "id": "int64",
+            "created_at": "datetime64[ns]",
+            "product": "string",
+            "movement_type": "string",
+            "quantity": "int64",
+            "reason": "string",
+            "reference_number": "string",
+        },
+        "ingredient_movements": {
+            "id": "int64",
+            "created_at": "datetime64[ns]",
+            "ingredient": "string",
+            "movement_type": "string",
+            "quantity": "float64",
+            "reason": "string",
+            "reference_number": "string",
+        },
+    }
+
+    @staticmethod
+    def export(
+        dataset: str,
+        fmt: str = "csv",
+        start_date: datetime = None,
+        end_date: datetime = None,
+        since_id: int = None,
+        incremental: bool = False,
+        path: str = None,
+        chunk_size: int = None
+    ) -> dict:
+        """
+        Veri setini dosyaya parça parça yaz
+
+        Args:
+            dataset: Veri seti (sales, expenses, stock_movements, ingredient_movements)
+            fmt: Biçim (csv, csv.gz, parquet)
+            start_date: Başlangıç (isteğe bağlı)
+            end_date: Bitiş (isteğe bağlı)
+            since_id: Yalnızca bu ID'den büyük kayıtlar
+            incremental: True ise since_id durum dosyasından okunur ve
+                başarılı yazımdan sonra güncellenir
+            path: Hedef dosya (varsayılan: EXPORT_PATH altında zaman damgalı)
+            chunk_size: Parça başına satır (varsayılan: CHUNK_SIZE)
+
+        Returns:
+            dict: Dosya yolu, satır sayısı, ilk/son ID
+
+        Raises:
+            ValueError: Geçersiz veri seti/biçim veya eksik Parquet desteği
+        """
+        if dataset not in DataExporter.DATASETS:
+            raise ValueError(f"Geçersiz veri seti: {dataset}")
+        if fmt not in DataExporter.FORMATS:
+            raise ValueError(f"Geçersiz dışa aktarım biçimi: {fmt}")
+
+        if incremental and since_id is None:
+            since_id = DataExporter.get_last_exported_id(dataset)
+
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(
+                DataExporter.EXPORT_PATH,
+                f"{dataset}_{stamp}.{DataExporter.FORMATS[fmt]}"
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Yarım kalan dosya tamamlanmış bir dışa aktarımla karışmasın
+        partial_path = f"{path}.part"
+        chunks = DataExporter.iter_chunks(
+            dataset, start_date, end_date, since_id, chunk_size
+        )
+
+        try:
+            if fmt == "parquet":
+                row_count, first_id, last_id = DataExporter._write_parquet(
+                    chunks, partial_path, DataExporter.DATASETS[dataset]
+                )
+            else:
+                row_count, first_id, last_id = DataExporter._write_csv(
+                    chunks, partial_path, list(DataExporter.DATASETS[dataset]),
+                    compress=(fmt == "csv.gz")
+                )
+            os.replace(partial_path, path)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        if incremental and last_id is not None:
+            DataExporter._save_last_exported_id(dataset, last_id)
+
+        logger.info(f"✓ {dataset} dışa aktarıldı: {row_count} satır -> {path}")
+        return {
+            "dataset": dataset,
+            "path": path,
+            "rows": row_count,
+            "first_id": first_id,
+            "last_id": last_id if last_id is not None else since_id,
+        }
+
+    @staticmethod
+    def iter_chunks(
+        dataset: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        since_id: int = None,
+        chunk_size: int = None
+    ):
+        """
+        Veri setini ID sırasıyla tipli DataFrame parçaları olarak üret
+
+        Her parça salt okunur oturumda ayrı bir transaction ile okunur
+        (WHERE id > son_id ORDER BY id LIMIT parça).
+
+        Yields:
+            pd.DataFrame: En fazla chunk_size satırlık parça
+        """
+        chunk_size = chunk_size or DataExporter.CHUNK_SIZE
+        dtypes = DataExporter.DATASETS[dataset]
+        query, id_column, date_column = DataExporter._dataset_query(dataset)
+
+        if start_date:
+            query = query.where(date_column >= start_date)
+        if end_date:
+            query = query.where(date_column <= end_date)
+
+        last_id = since_id or 0
+        db = DatabaseEngine.create_read_session()
+        try:
+            while True:
+                rows = db.execute(
+                    query.where(id_column > last_id)
+                    .order_by(id_column)
+                    .limit(chunk_size)
+                ).all()
+                # Parçalar arasında okuma transaction'ını açık tutma
+                db.rollback()
+
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                yield pd.DataFrame.from_records(
+                    rows, columns=list(dtypes)
+                ).astype(dtypes)
+
+                if len(rows) < chunk_size:
+                    break
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_last_exported_id(dataset: str) -> int:
+        """Artımlı dışa aktarımda en son yazılan ID (yoksa None)"""
+        state = DataExporter._load_state()
+        return state.get(dataset, {}).get("last_id")
+
+    @staticmethod
+    def reset_incremental(dataset: str = None) -> None:
+        """Artımlı dışa aktarım durumunu sıfırla (tümü veya tek veri seti)"""
+        state = DataExporter._load_state()
+        if dataset is None:
+            state = {}
+        else:
+            state.pop(dataset, None)
+        DataExporter._write_state(state)
+
+    # ================================================================
+    # YARDIMCI FONKSİYONLAR
+    # ================================================================
+
+    @staticmethod
+    def _dataset_query(dataset: str):
+        """Veri seti sorgusu, ID kolonu ve tarih kolonu"""
+        if dataset == "sales":
+            query = select(
+                Sale.id,
+                Sale.sale_number,
+                Sale.created_at,
+                Product.name,
+                Category.name,
+                Sale.quantity,
+                Sale.sale_price_without_kdv,
+                Sale.kdv_rate,
+                Sale.kdv_amount,
+                Sale.total_with_kdv,
+                Sale.product_cost,
+                Sale.net_profit,
+                Sale.payment_method,
+                Sale.is_refunded,
+                Sale.refund_reason
+            ).join(
+                Product, Sale.product_id == Product.id
+            ).join(
+                Category, Product.category_id == Category.id
+            )
+            return query, Sale.id, Sale.created_at
+
+        if dataset == "expenses":
+            query = select(
+                Expense.id,
+                Expense.created_at,
+                Expense.category,
+                func.coalesce(ExpenseCategory.name, Expense.category),
+                Expense.description,
+                Expense.amount,
+                Expense.payment_method,
+                Expense.is_recurring,
+                Expense.notes
+            ).outerjoin(
+                ExpenseCategory, ExpenseCategory.code == Expense.category
+            )
+            return query, Expense.id, Expense.created_at
+
+        if dataset == "stock_movements":
+            query = select(
+                StockMovement.id,
+                StockMovement.created_at,
+                Product.name,
+                StockMovement.movement_type,
+                StockMovement.quantity,
+                StockMovement.reason,
+                StockMovement.reference_number
+            ).join(
+                Product, StockMovement.product_id == Product.id
+            )
+            return query, StockMovement.id, StockMovement.created_at
+
+        query = select(
+            IngredientMovement.id,
+            IngredientMovement.created_at,
+            Ingredient.name,
+            IngredientMovement.movement_type,
+            IngredientMovement.quantity,
+            IngredientMovement.reason,
+            IngredientMovement.reference_number
+        ).join(
+            Ingredient, IngredientMovement.ingredient_id == Ingredient.id
+        )
+        return query, IngredientMovement.id, IngredientMovement.created_at
+
+    @staticmethod
+    def _write_csv(chunks, path: str, columns: list, compress: bool = False) -> tuple:
+        """Parçaları CSV'ye ekle (Excel için UTF-8 BOM ile)"""
+        row_count, first_id, last_id = 0, None, None
+        opener = gzip.open if compress else open
+
+        with opener(path, "wt", encoding="utf-8-sig", newline="") as handle:
+            header = True
+            for frame in chunks:
+                frame.to_csv(handle, header=header, index=False)
+                header = False
+                row_count += len(frame)
+                first_id = first_id if first_id is not None else int(frame["id"].iloc[0])
+                last_id = int(frame["id"].iloc[-1])
+
+            if header:
+                # Boş dışa aktarımda da başlık satırı olsun
+                handle.write(",".join(columns) + "\n")
+
+        return row_count, first_id, last_id
+
+    @staticmethod
+    def _write_parquet(chunks, path: str, dtypes: dict) -> tuple:
+        """Parçaları tek Parquet dosyasına satır grubu olarak yaz"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet dışa aktarımı için pyarrow kurulu olmalı!")
+
+        row_count, first_id, last_id = 0, None, None
+        schema = pa.Schema.from_pandas(
+            pd.DataFrame(columns=list(dtypes)).astype(dtypes), preserve_index=False
+        )
+
+        with pq.ParquetWriter(path, schema) as writer:
+            for frame in chunks:
+                writer.write_table(
+                    pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+                )
+                row_count += len(frame)
+                first_id = first_id if first_id is not None else int(frame["id"].iloc[0])
+                last_id = int(frame["id"].iloc[-1])
+
+        return row_count, first_id, last_id
+
+    @staticmethod
+    def _state_path() -> str:
+        """Artımlı dışa aktarım durum dosyası"""
+        return os.path.join(DataExporter.EXPORT_PATH, "export_state.json")
+
+    @staticmethod
+    def _load_state() -> dict:
+        """Durum dosyasını oku"""
+        try:
+            with open(DataExporter._state_path(), encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _write_state(state: dict) -> None:
+        """Durum dosyasını atomik olarak yaz"""
+        path = DataExporter._state_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+            json.dump(state, handle, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def _save_last_exported_id(dataset: str, last_id: int) -> None:
+        """Veri setinin en son yazılan ID'sini kaydet"""
+        state = DataExporter._load_state()
+        state[dataset] = {
+            "last_id": last_id,
+            "exported_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        DataExporter._write_state(state)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print(__doc__)
+        exit(1)
+
+    start = date.fromisoformat(args[2]) if len(args) > 2 else None
+    end = date.fromisoformat(args[3]) if len(args) > 3 else None
+    result = DataExporter.export(
+        args[0],
+        args[1] if len(args) > 1 else "csv",
+        start_date=datetime.combine(start, datetime.min.time()) if start else None,
+        end_date=datetime.combine(end, datetime.max.time()) if end else None,
+        incremental="--incremental" in sys.argv
+    )
+    print(f"✓ {result['rows']} satır -> {result['path']} (son ID: {result['last_id']})")
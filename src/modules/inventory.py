@@ -8,10 +8,13 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 from sqlalchemy.orm import Session
+from sqlalchemy import update
 from decimal import Decimal
 from src.database import DatabaseEngine
-from src.models import Product, Ingredient, Recipe, Category
-from src.utils.locale_utils import format_currency, format_date, format_datetime
+from src.models import Product, Ingredient, Recipe, IngredientMovement, loader_options
+from src.modules.stock_ledger import StockLedger, SYNCED_SESSION_KEY
+from src.modules.catalog import CatalogCache
+from src.utils.locale_utils import format_currency
 
 
 class InventoryManager:
@@ -24,13 +27,44 @@ class InventoryManager:
         quantity: float,
         reason: str = "Giriş"
     ) -> bool:
-        """Malzemeye stok ekle"""
+        """
+        Malzemeye stok ekle
+        
+        Giriş, hareket defterine tek satır olarak yazılır ve `quantity`
+        alanına aynı transaction içinde göreli UPDATE ile eklenir
+        (eşzamanlı satışların düşümü ezilmez).
+        """
         ingredient = db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
         if not ingredient:
             raise ValueError(f"Malzeme bulunamadı")
         
-        ingredient.add_stock(quantity)
-        db.commit()
+        if quantity <= 0:
+            raise ValueError("Miktar 0'dan büyük olmalı!")
+        
+        db.add(IngredientMovement(
+            ingredient_id=ingredient.id,
+            movement_type="GİRİŞ",
+            quantity=Ingredient.to_base(quantity, ingredient.unit),
+            reason=reason
+        ))
+        # Giriş deftere ve hareket defterine bu fonksiyonda işlenir
+        db.info[SYNCED_SESSION_KEY] = True
+        try:
+            db.execute(
+                update(Ingredient)
+                .where(Ingredient.id == ingredient.id)
+                .values(quantity=Ingredient.quantity + quantity)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.info.pop(SYNCED_SESSION_KEY, None)
+        
+        # Defter kaydı tablodaki yeni değerden yeniden yüklenir
+        StockLedger.forget(ingredient_ids=[ingredient.id])
         return True
     
     @staticmethod
@@ -40,19 +74,74 @@ class InventoryManager:
         quantity: float,
         reason: str = "Çıkış"
     ) -> bool:
-        """Malzemeden stok çıkar"""
+        """
+        Malzemeden stok çıkar
+        
+        Stok, stok defteri üzerinden kontrol edilip ayrılır; çıkış hareket
+        defterine tek satır olarak yazılır ve `quantity` alanından aynı
+        transaction içinde korumalı göreli UPDATE ile düşülür.
+        """
         ingredient = db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
         if not ingredient:
             raise ValueError(f"Malzeme bulunamadı")
         
-        ingredient.remove_stock(quantity)
-        db.commit()
+        if quantity <= 0:
+            raise ValueError("Miktar 0'dan büyük olmalı!")
+        
+        reservation = StockLedger.reserve(
+            {}, {ingredient.id: quantity}, {}, {ingredient.id: ingredient}
+        )
+        try:
+            db.add(IngredientMovement(
+                ingredient_id=ingredient.id,
+                movement_type="ÇIKIŞ",
+                quantity=-reservation["ingredients"][ingredient.id],
+                reason=reason
+            ))
+            StockLedger.write_consumption(db, [reservation])
+            db.commit()
+        except Exception:
+            db.rollback()
+            StockLedger.release(reservation)
+            raise
+        
+        StockLedger.confirm(reservation)
         return True
     
     @staticmethod
-    def get_all_products(db: Session, category_id: int = None, active_only: bool = True):
-        """Tüm ürünleri al"""
-        query = db.query(Product)
+    def get_ingredient_movements(
+        db: Session,
+        ingredient_id: int,
+        limit: int = 50
+    ) -> list:
+        """Malzemenin son stok hareketleri (en yeni önce)"""
+        return db.query(IngredientMovement).filter(
+            IngredientMovement.ingredient_id == ingredient_id
+        ).order_by(IngredientMovement.id.desc()).limit(limit).all()
+    
+    @staticmethod
+    def get_ingredient_stock_at(db: Session, at: datetime) -> dict:
+        """
+        Malzemelerin belirli bir andaki stoğu (anlık görüntü + hareketler)
+        
+        Returns:
+            dict: {ingredient_id: malzemenin stok biriminde miktar}
+        """
+        quantities = IngredientMovement.quantities_at(db, at)
+        units = dict(db.query(Ingredient.id, Ingredient.unit).filter(
+            Ingredient.id.in_(quantities)
+        ).all())
+        return {
+            ingredient_id: Ingredient.from_base(quantity, units[ingredient_id])
+            for ingredient_id, quantity in quantities.items()
+            if ingredient_id in units
+        }
+    
+    @staticmethod
+    def get_all_products(db: Session, category_id: int = None, active_only: bool = True,
+                         profile: str = None):
+        """Tüm ürünleri al (profile: ilişki yükleme profili, ör. "report")"""
+        query = db.query(Product).options(*loader_options(Product, profile))
         if active_only:
             query = query.filter(Product.is_active == True)
         if category_id:
@@ -216,7 +305,8 @@ def render_inventory_page():
                 st.subheader("Malzeme Stok Girişi")
                 
                 with st.form("ingredient_add_stock_form"):
-                    ingredients = SalesManager.get_all_ingredients(db)
+                    catalog = CatalogCache.get(db)
+                    ingredients = catalog.active_ingredients()
                     
                     col1, col2 = st.columns(2)
                     
@@ -224,7 +314,7 @@ def render_inventory_page():
                         ingredient_id = st.selectbox(
                             "Malzeme Seçin *",
                             options=[ing.id for ing in ingredients],
-                            format_func=lambda x: next((ing.name for ing in ingredients if ing.id == x), "")
+                            format_func=catalog.ingredient_name
                         )
                     
                     with col2:
@@ -247,7 +337,8 @@ def render_inventory_page():
                 st.subheader("Malzeme Stok Çıkışı")
                 
                 with st.form("ingredient_remove_stock_form"):
-                    ingredients = SalesManager.get_all_ingredients(db)
+                    catalog = CatalogCache.get(db)
+                    ingredients = catalog.active_ingredients()
                     
                     col1, col2 = st.columns(2)
                     
@@ -255,7 +346,7 @@ def render_inventory_page():
                         ingredient_id = st.selectbox(
                             "Malzeme Seçin *",
                             options=[ing.id for ing in ingredients],
-                            format_func=lambda x: next((ing.name for ing in ingredients if ing.id == x), ""),
+                            format_func=catalog.ingredient_name,
                             key="remove_ing"
                         )
                     
@@ -278,7 +369,8 @@ def render_inventory_page():
             with ing_tab4:
                 st.subheader("Malzeme Düzenle")
                 
-                ingredients = SalesManager.get_all_ingredients(db)
+                catalog = CatalogCache.get(db)
+                ingredients = catalog.active_ingredients()
                 
                 if not ingredients:
                     st.info("Düzenlenecek malzeme yok")
@@ -289,11 +381,12 @@ def render_inventory_page():
                         selected_ing = st.selectbox(
                             "Malzeme Seçin *",
                             options=[ing.id for ing in ingredients],
-                            format_func=lambda x: next((ing.name for ing in ingredients if ing.id == x), ""),
+                            format_func=catalog.ingredient_name,
                             key="edit_ing"
                         )
                     
-                    selected_ingredient = next((ing for ing in ingredients if ing.id == selected_ing), None)
+                    # Güncel stok ve maliyet için seçilen malzemeyi tabloda oku
+                    selected_ingredient = db.get(Ingredient, selected_ing) if selected_ing else None
                     
                     if selected_ingredient:
                         st.divider()
@@ -407,7 +500,8 @@ def render_inventory_page():
             with prod_tab1:
                 st.subheader("Ürün Listesi")
                 
-                categories = db.query(Category).filter(Category.is_active == True).all()
+                catalog = CatalogCache.get(db)
+                categories = catalog.active_categories()
                 category_dict = {0: "Tümü"}
                 category_dict.update({cat.id: cat.name for cat in categories})
                 
@@ -425,7 +519,8 @@ def render_inventory_page():
                 
                 products = InventoryManager.get_all_products(
                     db,
-                    category_id=selected_category if selected_category != 0 else None
+                    category_id=selected_category if selected_category != 0 else None,
+                    profile="report"
                 )
                 
                 if search_query:
@@ -438,7 +533,7 @@ def render_inventory_page():
                 if products:
                     prod_data = []
                     for prod in products:
-                        recipe_count = db.query(Recipe).filter(Recipe.product_id == prod.id).count()
+                        recipe_count = len(prod.recipe_items)
                         prod_data.append({
                             "Ürün": prod.name,
                             "Kod": prod.code,
@@ -465,11 +560,11 @@ def render_inventory_page():
                         prod_code = st.text_input("Ürün Kodu *", placeholder="örn: KAHVE-001")
                     
                     with col2:
-                        categories = db.query(Category).filter(Category.is_active == True).all()
+                        catalog = CatalogCache.get(db)
                         category_id = st.selectbox(
                             "Kategori *",
-                            options=[cat.id for cat in categories],
-                            format_func=lambda x: next((cat.name for cat in categories if cat.id == x), "")
+                            options=[cat.id for cat in catalog.active_categories()],
+                            format_func=catalog.category_name
                         )
                         prod_price = st.number_input("Satış Fiyatı (₺) *", min_value=0.01, value=10.0)
                     
@@ -512,16 +607,17 @@ def render_inventory_page():
             with prod_tab3:
                 st.subheader("Ürün Düzenle / Sil")
                 
-                products = InventoryManager.get_all_products(db)
+                catalog = CatalogCache.get(db)
+                products = catalog.active_products()
                 
                 if products:
                     selected_product = st.selectbox(
                         "Ürün Seçin",
                         options=[p.id for p in products],
-                        format_func=lambda x: next((p.name for p in products if p.id == x), "")
+                        format_func=catalog.product_name
                     )
                     
-                    prod = next((p for p in products if p.id == selected_product), None)
+                    prod = catalog.products_by_id.get(selected_product)
                     
                     if prod:
                         with st.form("edit_product_form"):
@@ -580,24 +676,27 @@ def render_inventory_page():
             with prod_tab4:
                 st.subheader("Reçete Yönetimi")
                 
-                products = InventoryManager.get_all_products(db)
+                catalog = CatalogCache.get(db)
+                products = catalog.active_products()
                 
                 if products:
                     selected_product = st.selectbox(
                         "Ürün Seçin",
                         options=[p.id for p in products],
-                        format_func=lambda x: next((p.name for p in products if p.id == x), ""),
+                        format_func=catalog.product_name,
                         key="recipe_product"
                     )
                     
-                    prod = next((p for p in products if p.id == selected_product), None)
+                    prod = catalog.products_by_id.get(selected_product)
                     
                     if prod:
                         st.markdown("---")
                         st.write(f"**Ürün:** {prod.name} ({prod.code})")
                         
                         # Mevcut Reçete
-                        recipes = db.query(Recipe).filter(Recipe.product_id == prod.id).all()
+                        recipes = db.query(Recipe).options(
+                            *loader_options(Recipe, "pos")
+                        ).filter(Recipe.product_id == prod.id).all()
                         
                         if recipes:
                             st.subheader("Mevcut Malzemeler")
@@ -622,7 +721,7 @@ def render_inventory_page():
                         st.subheader("Yeni Malzeme Ekle")
                         
                         with st.form("add_recipe_item_form"):
-                            ingredients = SalesManager.get_all_ingredients(db)
+                            ingredients = catalog.active_ingredients()
                             
                             col1, col2 = st.columns(2)
                             
@@ -630,14 +729,14 @@ def render_inventory_page():
                                 ingredient_id = st.selectbox(
                                     "Malzeme Seçin *",
                                     options=[ing.id for ing in ingredients],
-                                    format_func=lambda x: next((ing.name for ing in ingredients if ing.id == x), ""),
+                                    format_func=catalog.ingredient_name,
                                     key="recipe_ingredient"
                                 )
                             
                             with col2:
                                 quantity = st.number_input("Miktar *", min_value=0.01, value=1.0, key="recipe_qty")
                             
-                            selected_ing = next((ing for ing in ingredients if ing.id == ingredient_id), None)
+                            selected_ing = catalog.ingredients_by_id.get(ingredient_id)
                             unit = st.selectbox(
                                 "Birim *",
                                 options=["g", "ml", "adet", "kg", "l"],
@@ -0,0 +1,52 @@
+"""
+📄 CafeFlow - Sayfalı Liste Gezinmesi (Streamlit)
+
+İmleç tabanlı sayfaların (KeysetPage) önceki/sonraki gezinmesini yönetir.
+Ziyaret edilen sayfaların imleçleri oturum durumunda bir yığında tutulur;
+filtreler veya sıralama değişince gezinme ilk sayfaya döner.
+"""
+
+import streamlit as st
+
+
+def current_cursor(key: str, signature: tuple):
+    """
+    Listenin gösterilecek sayfasının imleci
+
+    Args:
+        key: Liste anahtarı (oturum durumunda benzersiz)
+        signature: Filtre ve sıralama değerleri; değişirse ilk sayfaya dönülür
+
+    Returns:
+        tuple: Sayfa imleci (ilk sayfa için None)
+    """
+    state = st.session_state.get(key)
+    if state is None or state["signature"] != signature:
+        state = {"signature": signature, "cursors": [None]}
+        st.session_state[key] = state
+    return state["cursors"][-1]
+
+
+def render_pager(key: str, page) -> None:
+    """
+    Önceki/sonraki sayfa düğmelerini göster
+
+    Args:
+        key: current_cursor ile kullanılan liste anahtarı
+        page: Gösterilen KeysetPage
+    """
+    cursors = st.session_state[key]["cursors"]
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Önceki", key=f"{key}_prev", disabled=len(cursors) == 1,
+                     use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Sayfa {len(cursors)} • {len(page.items)} kayıt")
+    with col3:
+        if st.button("Sonraki ▶", key=f"{key}_next", disabled=not page.has_more,
+                     use_container_width=True):
+            cursors.append(page.next_cursor)
+            st.rerun()
@@ -0,0 +1,152 @@
+"""
+🗃️ CafeFlow - Rapor Sonuç Önbelleği
+
+Rapor sorgularının sonuçlarını (fonksiyon, parametreler, veri sürümü)
+anahtarıyla süreç içinde saklar. Streamlit her etkileşimde sayfayı yeniden
+çalıştırdığı için değişmeyen raporların tekrar sorgulanmasını önler.
+
+Veri sürümü, veri yazan her oturumun commit'inden sonra artırılır
+(SQLAlchemy olayları); böylece yeni bir satış, iade veya masraf sonrası
+eski sonuçlar kullanılmaz. TTL, başka süreçlerdeki yazımlar için üst
+sınırdır.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class ReportCache:
+    """(fonksiyon, parametreler, veri sürümü) -> rapor sonucu önbelleği"""
+
+    ENABLED = os.getenv("REPORT_CACHE_ENABLED", "true").lower() == "true"
+    # Diğer süreçlerdeki değişiklikler için üst sınır (saniye)
+    TTL = float(os.getenv("REPORT_CACHE_TTL", "300"))
+    MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+
+    _entries = OrderedDict()   # anahtar -> (sonuç, zaman)
+    _version = 0
+    _hits = 0
+    _misses = 0
+    _invalidations = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def call(cls, func, db: Session, *args, **kwargs):
+        """
+        Rapor fonksiyonunu önbellek üzerinden çağır
+
+        Args:
+            func: Rapor fonksiyonu (ör: ReportsManager.get_sales_trend)
+            db: Veritabanı oturumu (anahtara dahil edilmez)
+            *args, **kwargs: Rapor parametreleri
+
+        Returns:
+            Rapor sonucu (önbellekten veya yeni hesaplanmış)
+        """
+        if not cls.ENABLED:
+            return func(db, *args, **kwargs)
+
+        with cls._lock:
+            version = cls._version
+            key = (func.__module__, func.__qualname__, args,
+                   tuple(sorted(kwargs.items())), version)
+            try:
+                cached = cls._entries.get(key)
+            except TypeError:
+                # Hashlenemeyen parametre: önbelleksiz çalış
+                key = cached = None
+
+            if cached and time.monotonic() - cached[1] < cls.TTL:
+                cls._entries.move_to_end(key)
+                cls._hits += 1
+                return cached[0]
+            cls._misses += 1
+
+        result = func(db, *args, **kwargs)
+
+        with cls._lock:
+            # Hesaplama sırasında veri değiştiyse sonucu saklama
+            if key is not None and version == cls._version:
+                cls._entries[key] = (result, time.monotonic())
+                cls._entries.move_to_end(key)
+                while len(cls._entries) > cls.MAX_ENTRIES:
+                    cls._entries.popitem(last=False)
+
+        return result
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Veri sürümünü artır ve tüm sonuçları geçersiz kıl"""
+        with cls._lock:
+            cls._version += 1
+            cls._invalidations += 1
+            cls._entries.clear()
+
+    @classmethod
+    def clear(cls) -> None:
+        """Önbelleği ve istatistikleri sıfırla"""
+        with cls._lock:
+            cls._version += 1
+            cls._entries.clear()
+            cls._hits = 0
+            cls._misses = 0
+            cls._invalidations = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Önbellek istatistikleri
+
+        Returns:
+            dict: hits, misses, hit_rate, entries, version, invalidations
+        """
+        with cls._lock:
+            total = cls._hits + cls._misses
+            return {
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "hit_rate": (cls._hits / total * 100) if total else 0,
+                "entries": len(cls._entries),
+                "version": cls._version,
+                "invalidations": cls._invalidations,
+                "ttl": cls.TTL,
+                "enabled": cls.ENABLED,
+            }
+
+
+# ============================================================
+# VERİ SÜRÜMÜ OLAYLARI
+# ============================================================
+
+_WRITTEN_KEY = "report_cache_written"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session, flush_context):
+    """Oturumun veri yazdığını işaretle (satış, iade, masraf, stok...)"""
+    if session.new or session.dirty or session.deleted:
+        session.info[_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_writes(orm_execute_state):
+    """Toplu UPDATE/DELETE ifadelerini de yazım olarak işaretle"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info[_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_data_version(session):
+    """Yazım içeren commit sonrası veri sürümünü artır"""
+    if session.info.pop(_WRITTEN_KEY, False):
+        ReportCache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session):
+    """Geri alınan yazımlar sürümü değiştirmez"""
+    session.info.pop(_WRITTEN_KEY, None)
@@ -4,37 +4,51 @@ Gelişmiş raporlama ve analiz işlemleri
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select, true
 from datetime import datetime, timedelta
-from decimal import Decimal
-from src.models import Sale, Expense, Product, Category, Ingredient, Recipe
+from src.models import Sale, Expense, ExpenseCategory, Product, Category, Ingredient, DailyRollup
+from src.utils.date_buckets import date_bucket, in_range
+import numpy as np
 import pandas as pd
 
 
 class ReportsManager:
-    """Raporlama Yönetimi - Analitiği"""
+    """
+    Raporlama Yönetimi - Analitiği
+    
+    İade edilen satışlar tüm satış toplamlarından hariç tutulur; ham satış
+    sorguları da günlük özet tablosuyla (DailyRollup) aynı sonucu verir.
+    """
+    
+    # Desteklenen takvim dilimleri (get_bucketed_summary)
+    BUCKETS = ('day', 'week', 'month', 'quarter')
+    
+    # Isı haritası satırları (get_sales_heatmap)
+    WEEKDAYS = ('Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar')
     
     # ================================================================
     # SATIŞ ANALİTİĞİ
     # ================================================================
     
     @staticmethod
-    def get_sales_trend(db: Session, days: int = 30) -> dict:
-        """Son N günün satış trendi (günlük satış sayısı)"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+    def get_sales_trend(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Satış trendi (günlük satış sayısı; varsayılan: son N gün)"""
+        start_day, end_day = ReportsManager._day_range(start_date, end_date, days)
         
-        # SQL: Günlük satış sayısı
+        # Günlük özet tablosundan (ham satış taraması yok)
         daily_sales = db.query(
-            func.date(Sale.created_at).label('date'),
-            func.count(Sale.id).label('count'),
-            func.sum(Sale.total_with_kdv).label('revenue')
+            DailyRollup.day.label('date'),
+            func.sum(DailyRollup.sale_count).label('count'),
+            func.sum(DailyRollup.revenue).label('revenue')
         ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
+            DailyRollup.day >= start_day,
+            DailyRollup.day <= end_day,
+            DailyRollup.product_id != DailyRollup.EXPENSE_PRODUCT_ID
         ).group_by(
-            func.date(Sale.created_at)
-        ).order_by('date').all()
+            DailyRollup.day
+        ).having(
+            func.sum(DailyRollup.sale_count) > 0
+        ).order_by(DailyRollup.day).all()
         
         result = {}
         for date, count, revenue in daily_sales:
@@ -46,14 +60,18 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_top_products(db: Session, limit: int = 10) -> list:
-        """En çok satılan ürünler"""
+    def get_top_products(db: Session, limit: int = 10, start_date=None, end_date=None,
+                         days: int = None) -> list:
+        """En çok satılan ürünler (aralık verilmezse tüm zamanlar)"""
         top_products = db.query(
             Product.name,
             func.count(Sale.id).label('sale_count'),
             func.sum(Sale.total_with_kdv).label('total_revenue')
         ).join(
             Sale, Sale.product_id == Product.id
+        ).filter(
+            ReportsManager._optional_range(Sale.created_at, start_date, end_date, days),
+            Sale.is_refunded == False
         ).group_by(
             Product.id
         ).order_by(
@@ -71,8 +89,8 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_category_sales(db: Session) -> dict:
-        """Kategoriye göre satış dağılımı"""
+    def get_category_sales(db: Session, start_date=None, end_date=None, days: int = None) -> dict:
+        """Kategoriye göre satış dağılımı (aralık verilmezse tüm zamanlar)"""
         category_sales = db.query(
             Category.name,
             func.count(Sale.id).label('sale_count'),
@@ -81,6 +99,9 @@ class ReportsManager:
             Product, Product.category_id == Category.id
         ).join(
             Sale, Sale.product_id == Product.id
+        ).filter(
+            ReportsManager._optional_range(Sale.created_at, start_date, end_date, days),
+            Sale.is_refunded == False
         ).group_by(
             Category.id
         ).all()
@@ -95,20 +116,21 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_hourly_sales(db: Session, date: datetime = None) -> dict:
-        """Saatlik satış dağılımı"""
-        if date is None:
-            date = datetime.now().date()
-        
-        start_dt = datetime.combine(date, datetime.min.time())
-        end_dt = datetime.combine(date, datetime.max.time())
+    def get_hourly_sales(db: Session, date: datetime = None, start_date=None, end_date=None) -> dict:
+        """Saatlik satış dağılımı (tek gün veya verilen aralık)"""
+        if start_date is None and end_date is None:
+            # datetime bitişi hariç tutulur: tek gün için tarihe indirgenir
+            if isinstance(date, datetime):
+                date = date.date()
+            start_date = end_date = date or datetime.now().date()
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, 0)
         
         hourly_sales = db.query(
-            func.strftime('%H', Sale.created_at).label('hour'),
+            date_bucket(db, Sale.created_at, 'hour').label('hour'),
             func.count(Sale.id).label('count')
         ).filter(
-            Sale.created_at >= start_dt,
-            Sale.created_at <= end_dt
+            in_range(Sale.created_at, start_dt, end_dt),
+            Sale.is_refunded == False
         ).group_by('hour').order_by('hour').all()
         
         result = {}
@@ -118,18 +140,66 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_payment_method_breakdown(db: Session, days: int = 30) -> dict:
-        """Ödeme yöntemine göre satışlar"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+    def get_sales_heatmap(db: Session, start_date=None, end_date=None, days: int = 30) -> dict:
+        """
+        Gün × saat satış yoğunluğu (7×24, tek gruplu sorgu)
+        
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (isteğe bağlı)
+            end_date: Bitiş (isteğe bağlı)
+            days: Aralık verilmezse son N gün
+            
+        Returns:
+            dict: 'count', 'revenue', 'avg_ticket' -> pd.DataFrame
+                (satırlar Pazartesi..Pazar, kolonlar 0..23. saat)
+        """
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
+        
+        # Haftanın günü '0' (Pazar)..'6', saat '00'..'23' (lehçe uyumlu dilimler)
+        weekday = date_bucket(db, Sale.created_at, 'weekday')
+        hour = date_bucket(db, Sale.created_at, 'hour')
+        cells = db.query(
+            weekday.label('weekday'),
+            hour.label('hour'),
+            func.count(Sale.id).label('count'),
+            func.sum(Sale.total_with_kdv).label('revenue')
+        ).filter(
+            in_range(Sale.created_at, start_dt, end_dt),
+            Sale.is_refunded == False
+        ).group_by(weekday, hour).all()
+        
+        counts = np.zeros((7, 24), dtype=np.int64)
+        revenues = np.zeros((7, 24), dtype=np.float64)
+        for day, hour_of_day, count, revenue in cells:
+            row = (int(day) + 6) % 7  # Pazartesi ilk satır
+            counts[row, int(hour_of_day)] = count or 0
+            revenues[row, int(hour_of_day)] = float(revenue or 0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_tickets = np.where(counts > 0, revenues / counts, 0.0)
+        
+        def frame(values) -> 'pd.DataFrame':
+            return pd.DataFrame(values, index=ReportsManager.WEEKDAYS, columns=range(24))
+        
+        return {
+            'count': frame(counts),
+            'revenue': frame(revenues),
+            'avg_ticket': frame(avg_tickets)
+        }
+    
+    @staticmethod
+    def get_payment_method_breakdown(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Ödeme yöntemine göre satışlar (varsayılan: son N gün)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
         
         payment_sales = db.query(
             Sale.payment_method,
             func.count(Sale.id).label('count'),
             func.sum(Sale.total_with_kdv).label('revenue')
         ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
+            in_range(Sale.created_at, start_dt, end_dt),
+            Sale.is_refunded == False
         ).group_by(
             Sale.payment_method
         ).all()
@@ -148,18 +218,16 @@ class ReportsManager:
     # ================================================================
     
     @staticmethod
-    def get_expense_breakdown(db: Session, days: int = 30) -> dict:
-        """Masraf kategorisine göre dağılım"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+    def get_expense_breakdown(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Masraf kategorisine göre dağılım (varsayılan: son N gün)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
         
         expense_data = db.query(
             Expense.category,
             func.sum(Expense.amount).label('total_amount'),
             func.count(Expense.id).label('count')
         ).filter(
-            Expense.created_at >= start_date,
-            Expense.created_at <= end_date
+            in_range(Expense.created_at, start_dt, end_dt)
         ).group_by(
             Expense.category
         ).all()
@@ -174,19 +242,18 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_expense_trend(db: Session, days: int = 30) -> dict:
-        """Masraf trendi (günlük masraflar)"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+    def get_expense_trend(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Masraf trendi (günlük masraflar; varsayılan: son N gün)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
         
+        expense_day = date_bucket(db, Expense.created_at, 'day')
         daily_expenses = db.query(
-            func.date(Expense.created_at).label('date'),
+            expense_day.label('date'),
             func.sum(Expense.amount).label('total_amount')
         ).filter(
-            Expense.created_at >= start_date,
-            Expense.created_at <= end_date
+            in_range(Expense.created_at, start_dt, end_dt)
         ).group_by(
-            func.date(Expense.created_at)
+            expense_day
         ).order_by('date').all()
         
         result = {}
@@ -200,37 +267,15 @@ class ReportsManager:
     # ================================================================
     
     @staticmethod
-    def get_profit_analysis(db: Session, days: int = 30) -> dict:
-        """Kâr/Zarar analizi"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Toplam gelir (satışlar)
-        total_revenue_query = db.query(
-            func.sum(Sale.total_with_kdv)
-        ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
-        ).scalar()
-        total_revenue = float(total_revenue_query or 0)
+    def get_profit_analysis(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Kâr/Zarar analizi (varsayılan: son N gün)"""
+        start_day, end_day = ReportsManager._day_range(start_date, end_date, days)
         
-        # Toplam maliyet (ingredient costs)
-        total_cost_query = db.query(
-            func.sum(Sale.product_cost)
-        ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
-        ).scalar()
-        total_cost = float(total_cost_query or 0)
-        
-        # Toplam masraf
-        total_expenses_query = db.query(
-            func.sum(Expense.amount)
-        ).filter(
-            Expense.created_at >= start_date,
-            Expense.created_at <= end_date
-        ).scalar()
-        total_expenses = float(total_expenses_query or 0)
+        # Gelir, maliyet ve masraf: günlük özetten tek sorgu
+        totals = ReportsManager._rollup_totals(db, start_day, end_day)
+        total_revenue = totals['revenue']
+        total_cost = totals['cost']
+        total_expenses = totals['expenses']
         
         # Hesaplamalar
         gross_profit = total_revenue - total_cost
@@ -247,22 +292,24 @@ class ReportsManager:
         }
     
     @staticmethod
-    def get_daily_profit(db: Session, days: int = 30) -> dict:
-        """Günlük kâr"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+    def get_daily_profit(db: Session, days: int = 30, start_date=None, end_date=None) -> dict:
+        """Günlük kâr (varsayılan: son N gün)"""
+        start_day, end_day = ReportsManager._day_range(start_date, end_date, days)
         
-        # Günlük satış ve maliyetler
+        # Günlük satış ve maliyetler (özet tablodan)
         daily_data = db.query(
-            func.date(Sale.created_at).label('date'),
-            func.sum(Sale.total_with_kdv).label('revenue'),
-            func.sum(Sale.product_cost).label('cost')
+            DailyRollup.day.label('date'),
+            func.sum(DailyRollup.revenue).label('revenue'),
+            func.sum(DailyRollup.product_cost).label('cost')
         ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
+            DailyRollup.day >= start_day,
+            DailyRollup.day <= end_day,
+            DailyRollup.product_id != DailyRollup.EXPENSE_PRODUCT_ID
         ).group_by(
-            func.date(Sale.created_at)
-        ).all()
+            DailyRollup.day
+        ).having(
+            func.sum(DailyRollup.sale_count) > 0
+        ).order_by(DailyRollup.day).all()
         
         result = {}
         for date, revenue, cost in daily_data:
@@ -271,6 +318,93 @@ class ReportsManager:
         
         return result
     
+    # ================================================================
+    # GÜNLÜK ÖZET (ROLLUP) YARDIMCILARI
+    # ================================================================
+    
+    @staticmethod
+    def _date_range(start_date=None, end_date=None, days: int = 30) -> tuple:
+        """
+        Rapor aralığını yarı açık [başlangıç, bitiş) datetime aralığına çevir
+        
+        `created_at >= başlangıç AND created_at < bitiş` olarak kullanılır
+        (indeksli aralık taraması). Tarih (date) sınırları gün olarak
+        dahildir; datetime bitişi hariç tutulur. Başlangıç verilmezse
+        bitişten N gün öncesi, bitiş verilmezse bugün kullanılır.
+        """
+        if end_date is None:
+            end_date = datetime.now().date()
+        
+        if isinstance(end_date, datetime):
+            end_dt = end_date
+        else:
+            end_dt = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        
+        if start_date is None:
+            start_date = (end_dt - timedelta(microseconds=1)).date() - timedelta(days=days)
+        
+        if isinstance(start_date, datetime):
+            start_dt = start_date
+        else:
+            start_dt = datetime.combine(start_date, datetime.min.time())
+        
+        return start_dt, end_dt
+    
+    @staticmethod
+    def _optional_range(column, start_date=None, end_date=None, days: int = None):
+        """
+        Rapor aralığı filtresi; aralık ve gün sayısı verilmezse filtre yok
+        
+        Yalnızca bitiş verilirse bitişe kadarki tüm kayıtlar alınır.
+        """
+        if start_date is None and days is None:
+            if end_date is None:
+                return true()
+            _, end_dt = ReportsManager._date_range(end_date, end_date, 0)
+            return column < end_dt
+        return in_range(column, *ReportsManager._date_range(start_date, end_date, days))
+    
+    @staticmethod
+    def _day_range(start_date=None, end_date=None, days: int = 30) -> tuple:
+        """Rapor aralığının (ilk gün, son gün) karşılığı (günlük özet tablosu için)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
+        return start_dt.date(), (end_dt - timedelta(microseconds=1)).date()
+    
+    @staticmethod
+    def _rollup_totals(db: Session, start_day, end_day) -> dict:
+        """Gün aralığı için satış ve masraf toplamları (tek sorgu)"""
+        totals = db.query(
+            func.sum(DailyRollup.sale_count).label('count'),
+            func.sum(DailyRollup.revenue).label('revenue'),
+            func.sum(DailyRollup.product_cost).label('cost'),
+            func.sum(DailyRollup.expense_amount).label('expenses')
+        ).filter(
+            DailyRollup.day >= start_day,
+            DailyRollup.day <= end_day
+        ).one()
+        
+        return {
+            'count': int(totals.count or 0),
+            'revenue': float(totals.revenue or 0),
+            'cost': float(totals.cost or 0),
+            'expenses': float(totals.expenses or 0)
+        }
+    
+    @staticmethod
+    def rebuild_daily_rollups(db: Session, start_date=None, end_date=None) -> int:
+        """
+        Günlük özet tabloyu ham tablolardan yeniden oluştur (backfill)
+        
+        Args:
+            db: Veritabanı oturumu
+            start_date: İlk gün (isteğe bağlı)
+            end_date: Son gün (isteğe bağlı, dahil)
+            
+        Returns:
+            int: Oluşturulan özet satırı sayısı
+        """
+        return DailyRollup.rebuild(db, start_date, end_date)
+    
     # ================================================================
     # STOK ANALİTİĞİ
     # ================================================================
@@ -330,32 +464,114 @@ class ReportsManager:
     # ================================================================
     
     @staticmethod
-    def get_summary_metrics(db: Session, start_date: datetime, end_date: datetime) -> dict:
-        """Dönem özet metrikleri"""
+    def get_dashboard_snapshot(db: Session, recent_limit: int = 10,
+                               ingredient_threshold: float = 100) -> dict:
+        """
+        Dashboard göstergeleri (sabit 3 SQL ifadesi)
+        
+        Sayaçlar skaler alt sorgularla tek SELECT'te, son satışlar ve düşük
+        stoklu malzemeler birer SELECT'te okunur; ifade sayısı satır
+        sayısından bağımsızdır (test_query_budgets.py bu bütçeyi sabitler).
+        Sonuç düz sözlük/listelerden oluşur; ReportCache ile veri sürümü
+        başına saklanabilir.
+        
+        Args:
+            db: Veritabanı oturumu
+            recent_limit: Son satış sayısı
+            ingredient_threshold: Düşük stok malzeme eşiği
+            
+        Returns:
+            dict: counts, recent_sales, low_stock_ingredients
+        """
+        # Sayaçlar: skaler alt sorgular, tek SELECT
+        counts = db.query(
+            select(func.count(Category.id)).scalar_subquery().label('categories'),
+            select(func.count(Product.id)).scalar_subquery().label('products'),
+            select(func.count(Product.id)).where(
+                Product.is_active == True
+            ).scalar_subquery().label('active_products'),
+            select(func.count(Product.id)).where(
+                Product.quantity <= Product.min_stock_level
+            ).scalar_subquery().label('low_stock_products'),
+            select(func.count(Sale.id)).scalar_subquery().label('sales'),
+            select(func.count(Expense.id)).scalar_subquery().label('expenses')
+        ).one()
+        
+        # Son satışlar ürün adıyla birlikte (satır başına ürün sorgusu yok)
+        recent_sales = db.query(
+            Sale.sale_number,
+            Product.name,
+            Sale.quantity,
+            Sale.total_price,
+            Sale.payment_method,
+            Sale.created_at
+        ).outerjoin(
+            Product, Sale.product_id == Product.id
+        ).order_by(
+            Sale.created_at.desc()
+        ).limit(recent_limit).all()
+        
+        low_stock_ingredients = db.query(
+            Ingredient.name,
+            Ingredient.quantity,
+            Ingredient.unit
+        ).filter(
+            Ingredient.quantity < ingredient_threshold,
+            Ingredient.is_active == True
+        ).order_by(Ingredient.quantity).limit(recent_limit).all()
+        
+        return {
+            'counts': dict(counts._mapping),
+            'recent_sales': [
+                {
+                    'sale_number': sale_number,
+                    'product': product_name,
+                    'quantity': quantity,
+                    'total_price': float(total_price or 0),
+                    'payment_method': payment_method,
+                    'created_at': created_at
+                }
+                for sale_number, product_name, quantity, total_price, payment_method, created_at in recent_sales
+            ],
+            'low_stock_ingredients': [
+                {
+                    'name': name,
+                    'quantity': quantity,
+                    'unit': unit,
+                    'threshold': ingredient_threshold
+                }
+                for name, quantity, unit in low_stock_ingredients
+            ]
+        }
+    
+    @staticmethod
+    def get_summary_metrics(db: Session, start_date=None, end_date=None, days: int = 30) -> dict:
+        """Dönem özet metrikleri (varsayılan: son N gün)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
+        
         # Satış sayısı ve gelir
         sales_data = db.query(
             func.count(Sale.id).label('count'),
             func.sum(Sale.total_with_kdv).label('revenue'),
             func.avg(Sale.total_with_kdv).label('avg_value')
         ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
+            in_range(Sale.created_at, start_dt, end_dt),
+            Sale.is_refunded == False
         ).first()
         
         # Masraf toplamı
         total_expenses = db.query(
             func.sum(Expense.amount)
         ).filter(
-            Expense.created_at >= start_date,
-            Expense.created_at <= end_date
+            in_range(Expense.created_at, start_dt, end_dt)
         ).scalar() or 0
         
         # Ürün maliyeti toplamı
         total_cost = db.query(
             func.sum(Sale.product_cost)
         ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
+            in_range(Sale.created_at, start_dt, end_dt),
+            Sale.is_refunded == False
         ).scalar() or 0
         
         total_sales = sales_data.count or 0
@@ -378,8 +594,11 @@ class ReportsManager:
         }
     
     @staticmethod
-    def get_product_profitability(db: Session, limit: int = 20) -> list:
-        """Ürün kârlılık analizi"""
+    def get_product_profitability(db: Session, limit: int = 20, start_date=None, end_date=None,
+                                  days: int = 30) -> list:
+        """Ürün kârlılık analizi (varsayılan: son N gün)"""
+        start_dt, end_dt = ReportsManager._date_range(start_date, end_date, days)
+        
         product_profits = db.query(
             Product.name,
             func.count(Sale.id).label('sales_count'),
@@ -387,6 +606,9 @@ class ReportsManager:
             func.sum(Sale.product_cost).label('cost')
         ).join(
             Sale, Sale.product_id == Product.id
+        ).filter(
+            ReportsManager._optional_range(Sale.created_at, start_date, end_date, days),
+            Sale.is_refunded == False
         ).group_by(
             Product.id
         ).order_by(
@@ -412,81 +634,288 @@ class ReportsManager:
         return result
     
     @staticmethod
-    def get_monthly_comparison(db: Session, months: int = 3) -> dict:
-        """Aylık karşılaştırma"""
-        today = datetime.now()
-        result = {}
+    def get_monthly_comparison(db: Session, months: int = 3, end_date=None) -> dict:
+        """Aylık karşılaştırma (bitiş tarihinden geriye N takvim ayı, en yeni önce)"""
+        _, end_day = ReportsManager._day_range(None, end_date, 0)
+        start_day = ReportsManager._shift_months(end_day.replace(day=1), -(months - 1))
         
-        for i in range(months):
-            month_start = (today - timedelta(days=30*i)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        summary = ReportsManager.get_bucketed_summary(db, start_day, end_day, bucket='month')
+        return dict(reversed(list(summary.items())))
+    
+    @staticmethod
+    def get_bucketed_summary(db: Session, start_day, end_day, bucket: str = 'month') -> dict:
+        """
+        Takvim dilimlerine göre gelir, maliyet, masraf ve kâr özeti
+        
+        Tüm aralık günlük özet tablosundan tek sorguyla okunur ve
+        günler takvim dilimlerine toplanır. Verisi olmayan dilimler
+        sıfır değerlerle döner.
+        
+        Args:
+            db: Veritabanı oturumu
+            start_day: İlk gün (dahil)
+            end_day: Son gün (dahil)
+            bucket: 'day', 'week' (Pazartesi başlangıçlı), 'month' veya 'quarter'
             
-            month_str = month_start.strftime('%Y-%m')
+        Returns:
+            dict: {dilim etiketi: metrikler} (eskiden yeniye)
+        """
+        if bucket not in ReportsManager.BUCKETS:
+            raise ValueError(f"Geçersiz dilim: {bucket} ({', '.join(ReportsManager.BUCKETS)})")
+        
+        daily_rows = db.query(
+            DailyRollup.day,
+            func.sum(DailyRollup.sale_count),
+            func.sum(DailyRollup.revenue),
+            func.sum(DailyRollup.product_cost),
+            func.sum(DailyRollup.expense_amount)
+        ).filter(
+            DailyRollup.day >= start_day,
+            DailyRollup.day <= end_day
+        ).group_by(DailyRollup.day).all()
+        
+        # Aralıktaki tüm dilimler (boş olanlar dahil)
+        totals = {}
+        labels = {}
+        current = ReportsManager._bucket_start(start_day, bucket)
+        while current <= end_day:
+            totals[current] = {'count': 0, 'revenue': 0.0, 'cost': 0.0, 'expenses': 0.0}
+            labels[current] = ReportsManager._bucket_label(current, bucket)
+            current = ReportsManager._next_bucket(current, bucket)
+        
+        for day, count, revenue, cost, expenses in daily_rows:
+            entry = totals[ReportsManager._bucket_start(day, bucket)]
+            entry['count'] += int(count or 0)
+            entry['revenue'] += float(revenue or 0)
+            entry['cost'] += float(cost or 0)
+            entry['expenses'] += float(expenses or 0)
+        
+        result = {}
+        for bucket_start, entry in totals.items():
+            total_sales = entry['count']
+            total_revenue = entry['revenue']
+            gross_profit = total_revenue - entry['cost']
             
-            # Bu ay için metrikleri al
-            metrics = ReportsManager.get_summary_metrics(db, month_start, month_end)
-            result[month_str] = metrics
+            result[labels[bucket_start]] = {
+                'total_sales': total_sales,
+                'total_revenue': total_revenue,
+                'avg_sale_value': total_revenue / total_sales if total_sales else 0,
+                'total_cost': entry['cost'],
+                'total_expenses': entry['expenses'],
+                'gross_profit': gross_profit,
+                'net_profit': gross_profit - entry['expenses'],
+                'profit_margin': round((gross_profit / total_revenue * 100) if total_revenue > 0 else 0, 2)
+            }
         
         return result
     
+    @staticmethod
+    def _bucket_start(day, bucket: str):
+        """Günün içinde bulunduğu takvim diliminin ilk günü"""
+        if bucket == 'week':
+            return day - timedelta(days=day.weekday())
+        if bucket == 'month':
+            return day.replace(day=1)
+        if bucket == 'quarter':
+            return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+        return day
+    
+    @staticmethod
+    def _next_bucket(bucket_start, bucket: str):
+        """Sonraki takvim diliminin ilk günü"""
+        if bucket == 'week':
+            return bucket_start + timedelta(days=7)
+        if bucket == 'month':
+            return ReportsManager._shift_months(bucket_start, 1)
+        if bucket == 'quarter':
+            return ReportsManager._shift_months(bucket_start, 3)
+        return bucket_start + timedelta(days=1)
+    
+    @staticmethod
+    def _bucket_label(bucket_start, bucket: str) -> str:
+        """Takvim dilimi etiketi (2025-03-14, 2025-W11, 2025-03, 2025-Q1)"""
+        if bucket == 'week':
+            year, week, _ = bucket_start.isocalendar()
+            return f"{year}-W{week:02d}"
+        if bucket == 'month':
+            return bucket_start.strftime('%Y-%m')
+        if bucket == 'quarter':
+            return f"{bucket_start.year}-Q{(bucket_start.month - 1) // 3 + 1}"
+        return str(bucket_start)
+    
+    @staticmethod
+    def _shift_months(month_start, months: int):
+        """Ayın ilk gününü N ay ileri/geri kaydır"""
+        index = month_start.year * 12 + month_start.month - 1 + months
+        return month_start.replace(year=index // 12, month=index % 12 + 1, day=1)
+    
     # ================================================================
     # ÖZELLİK: DATAFRAME DÖNÜŞTÜRME
     # ================================================================
     
+    # Tipli DataFrame kolonları (para kolonları sayısal, tekrar eden metinler kategorik)
+    SALES_FRAME_DTYPES = {
+        'id': 'int64',
+        'sale_number': 'string',
+        'created_at': 'datetime64[ns]',
+        'product': 'category',
+        'category': 'category',
+        'quantity': 'int64',
+        'sale_price_without_kdv': 'float64',
+        'kdv_amount': 'float64',
+        'total_with_kdv': 'float64',
+        'product_cost': 'float64',
+        'net_profit': 'float64',
+        'payment_method': 'category',
+        'is_refunded': 'bool',
+    }
+    
+    EXPENSES_FRAME_DTYPES = {
+        'id': 'int64',
+        'created_at': 'datetime64[ns]',
+        'category': 'category',
+        'description': 'string',
+        'amount': 'float64',
+        'payment_method': 'category',
+        'is_recurring': 'bool',
+        'notes': 'string',
+    }
+    
     @staticmethod
-    def sales_to_dataframe(db: Session, days: int = 30) -> 'pd.DataFrame':
-        """Satışları DataFrame'e dönüştür"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        sales = db.query(
+    def load_sales_frame(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        chunksize: int = None
+    ):
+        """
+        Satışları tipli DataFrame olarak yükle (ORM nesnesi oluşturmadan)
+        
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (isteğe bağlı)
+            end_date: Bitiş (isteğe bağlı)
+            chunksize: Verilirse en fazla bu kadar satırlık DataFrame'ler üreten
+                bir iterator döner (büyük aralıklar için)
+            
+        Returns:
+            pd.DataFrame veya DataFrame iterator'ı
+        """
+        query = select(
             Sale.id,
+            Sale.sale_number,
             Sale.created_at,
             Product.name.label('product'),
+            Category.name.label('category'),
             Sale.quantity,
-            Sale.total_with_kdv
+            Sale.sale_price_without_kdv,
+            Sale.kdv_amount,
+            Sale.total_with_kdv,
+            Sale.product_cost,
+            Sale.net_profit,
+            Sale.payment_method,
+            Sale.is_refunded
         ).join(
             Product, Sale.product_id == Product.id
-        ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date
-        ).order_by(desc(Sale.created_at)).all()
-        
-        data = {
-            'ID': [s.id for s in sales],
-            'Tarih': [s.created_at for s in sales],
-            'Ürün': [s.product for s in sales],
-            'Miktar': [s.quantity for s in sales],
-            'Toplam': [f"₺{s.total_with_kdv:.2f}" for s in sales]
-        }
+        ).join(
+            Category, Product.category_id == Category.id
+        )
         
-        return pd.DataFrame(data)
+        if start_date:
+            query = query.where(Sale.created_at >= start_date)
+        if end_date:
+            query = query.where(Sale.created_at <= end_date)
+        
+        return ReportsManager._read_frame(
+            db, query.order_by(Sale.id), ReportsManager.SALES_FRAME_DTYPES, chunksize
+        )
     
     @staticmethod
-    def expenses_to_dataframe(db: Session, days: int = 30) -> 'pd.DataFrame':
-        """Masrafları DataFrame'e dönüştür"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        expenses = db.query(
+    def load_expenses_frame(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        chunksize: int = None
+    ):
+        """
+        Masrafları tipli DataFrame olarak yükle (ORM nesnesi oluşturmadan)
+        
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (isteğe bağlı)
+            end_date: Bitiş (isteğe bağlı)
+            chunksize: Verilirse DataFrame parçaları üreten iterator döner
+            
+        Returns:
+            pd.DataFrame veya DataFrame iterator'ı
+        """
+        query = select(
             Expense.id,
             Expense.created_at,
-            Category.name.label('category'),
+            func.coalesce(ExpenseCategory.name, Expense.category).label('category'),
+            Expense.description,
             Expense.amount,
+            Expense.payment_method,
+            Expense.is_recurring,
             Expense.notes
-        ).join(
-            Category, Expense.category_id == Category.id
-        ).filter(
-            Expense.created_at >= start_date,
-            Expense.created_at <= end_date
-        ).order_by(desc(Expense.created_at)).all()
-        
-        data = {
-            'ID': [e.id for e in expenses],
-            'Tarih': [e.created_at for e in expenses],
-            'Kategori': [e.category for e in expenses],
-            'Miktar': [f"₺{e.amount:.2f}" for e in expenses],
-            'Notlar': [e.notes or "-" for e in expenses]
-        }
+        ).outerjoin(
+            ExpenseCategory, ExpenseCategory.code == Expense.category
+        )
+        
+        if start_date:
+            query = query.where(Expense.created_at >= start_date)
+        if end_date:
+            query = query.where(Expense.created_at <= end_date)
+        
+        return ReportsManager._read_frame(
+            db, query.order_by(Expense.id), ReportsManager.EXPENSES_FRAME_DTYPES, chunksize
+        )
+    
+    @staticmethod
+    def _read_frame(db: Session, statement, dtypes: dict, chunksize: int = None):
+        """Sorgu sonucunu imleçten doğrudan tipli DataFrame'e aktar"""
+        result = db.execute(statement, execution_options={'stream_results': True})
+        columns = list(result.keys())
+        
+        def to_frame(rows) -> 'pd.DataFrame':
+            return pd.DataFrame.from_records(rows, columns=columns).astype(dtypes)
+        
+        if not chunksize:
+            return to_frame(result.all())
         
-        return pd.DataFrame(data)
+        def chunks():
+            try:
+                for rows in result.partitions(chunksize):
+                    yield to_frame(rows)
+            finally:
+                result.close()
+        
+        return chunks()
+    
+    @staticmethod
+    def sales_to_dataframe(db: Session, days: int = 30) -> 'pd.DataFrame':
+        """Satışları DataFrame'e dönüştür (son N gün, en yeni önce)"""
+        start_date = datetime.now() - timedelta(days=days)
+        frame = ReportsManager.load_sales_frame(db, start_date=start_date)
+        
+        return frame[['id', 'created_at', 'product', 'quantity', 'total_with_kdv']].rename(columns={
+            'id': 'ID',
+            'created_at': 'Tarih',
+            'product': 'Ürün',
+            'quantity': 'Miktar',
+            'total_with_kdv': 'Toplam'
+        }).iloc[::-1].reset_index(drop=True)
+    
+    @staticmethod
+    def expenses_to_dataframe(db: Session, days: int = 30) -> 'pd.DataFrame':
+        """Masrafları DataFrame'e dönüştür (son N gün, en yeni önce)"""
+        start_date = datetime.now() - timedelta(days=days)
+        frame = ReportsManager.load_expenses_frame(db, start_date=start_date)
+        
+        return frame[['id', 'created_at', 'category', 'amount', 'notes']].rename(columns={
+            'id': 'ID',
+            'created_at': 'Tarih',
+            'category': 'Kategori',
+            'amount': 'Miktar',
+            'notes': 'Notlar'
+        }).iloc[::-1].reset_index(drop=True)
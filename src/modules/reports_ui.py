@@ -6,9 +6,10 @@ Advanced Reporting & Analytics Dashboard
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from src.database.db_connection import get_db
+from src.database.db_connection import get_read_db
 from src.modules.reports import ReportsManager
-from src.utils.locale_utils import format_currency
+from src.modules.report_cache import ReportCache
+from src.utils.locale_utils import format_currency, format_frame
 
 
 def render_reports_page():
@@ -16,7 +17,7 @@ def render_reports_page():
     
     st.markdown("# 📊 Gelişmiş Raporlama")
     
-    db = next(get_db())
+    db = next(get_read_db())
     
     # Date range selector
     col1, col2 = st.columns(2)
@@ -29,6 +30,10 @@ def render_reports_page():
                                  value=datetime.now(),
                                  key="end_date")
     
+    if start_date > end_date:
+        st.error("✗ Başlangıç tarihi bitiş tarihinden sonra olamaz!")
+        return
+    
     st.divider()
     
     # Create 4 tabs
@@ -49,8 +54,8 @@ def render_reports_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("📈 Satış Trendi (Son 30 gün)")
-            sales_trend = ReportsManager.get_sales_trend(db, days=30)
+            st.subheader("📈 Satış Trendi")
+            sales_trend = ReportCache.call(ReportsManager.get_sales_trend, db, start_date=start_date, end_date=end_date)
             
             if sales_trend:
                 dates = list(sales_trend.keys())
@@ -70,7 +75,7 @@ def render_reports_page():
         
         with col2:
             st.subheader("🏷️ Kategoriye Göre Satışlar")
-            category_sales = ReportsManager.get_category_sales(db)
+            category_sales = ReportCache.call(ReportsManager.get_category_sales, db, start_date=start_date, end_date=end_date)
             
             if category_sales:
                 categories = list(category_sales.keys())
@@ -98,7 +103,7 @@ def render_reports_page():
         
         # Row 2: Top Products
         st.subheader("🏆 En Çok Satılan Ürünler (Top 10)")
-        top_products = ReportsManager.get_top_products(db, limit=10)
+        top_products = ReportCache.call(ReportsManager.get_top_products, db, limit=10, start_date=start_date, end_date=end_date)
         
         if top_products:
             products_df = pd.DataFrame(top_products)
@@ -122,7 +127,7 @@ def render_reports_page():
         
         # Row 3: Payment Method Breakdown
         st.subheader("💳 Ödeme Yöntemi Dağılımı")
-        payment_breakdown = ReportsManager.get_payment_method_breakdown(db, days=30)
+        payment_breakdown = ReportCache.call(ReportsManager.get_payment_method_breakdown, db, start_date=start_date, end_date=end_date)
         
         if payment_breakdown:
             payment_df = pd.DataFrame([
@@ -147,6 +152,23 @@ def render_reports_page():
                         f"{row['Satış Sayısı']} adet"
                     )
     
+        # Row 4: Weekday x Hour Heatmap
+        st.subheader("🗓️ Gün × Saat Yoğunluğu")
+        heatmap = ReportCache.call(ReportsManager.get_sales_heatmap, db, start_date=start_date, end_date=end_date)
+        
+        heatmap_metric = st.radio(
+            "Gösterge",
+            options=['count', 'revenue', 'avg_ticket'],
+            format_func=lambda m: {'count': 'Satış Sayısı', 'revenue': 'Gelir (₺)', 'avg_ticket': 'Ortalama Fiş (₺)'}[m],
+            horizontal=True,
+            key="heatmap_metric"
+        )
+        
+        if heatmap['count'].to_numpy().any():
+            st.dataframe(heatmap[heatmap_metric].round(2), use_container_width=True)
+        else:
+            st.info("Satış verisi yok")
+    
     # ============================================================================
     # TAB 2: INGREDIENT REPORTS
     # ============================================================================
@@ -158,8 +180,8 @@ def render_reports_page():
         
         with col1:
             st.subheader("📦 Toplam Stok Değeri")
-            stock_value_detail = ReportsManager.get_stock_value(db)
-            total_value = ReportsManager.get_stock_value_total(db)
+            stock_value_detail = ReportCache.call(ReportsManager.get_stock_value, db)
+            total_value = ReportCache.call(ReportsManager.get_stock_value_total, db)
             
             st.metric("Toplam Değer", format_currency(total_value))
             
@@ -168,16 +190,20 @@ def render_reports_page():
                     {
                         'Malzeme': name,
                         'Miktar': f"{data['quantity']:.2f} {data['unit']}",
-                        'Birim Fiyat': format_currency(data['cost_per_unit']),
-                        'Toplam': format_currency(data['total_value'])
+                        'Birim Fiyat': data['cost_per_unit'],
+                        'Toplam': data['total_value']
                     }
                     for name, data in stock_value_detail.items()
                 ])
-                st.dataframe(stock_df, use_container_width=True, hide_index=True)
+                st.dataframe(
+                    format_frame(stock_df, currency=('Birim Fiyat', 'Toplam')),
+                    use_container_width=True,
+                    hide_index=True
+                )
         
         with col2:
             st.subheader("⚠️ Düşük Stok Uyarıları")
-            low_stock = ReportsManager.get_low_stock_items(db, threshold=100)
+            low_stock = ReportCache.call(ReportsManager.get_low_stock_items, db, threshold=100)
             
             if low_stock:
                 st.warning(f"⚠️ {len(low_stock)} malzeme kritik stok seviyesinde!")
@@ -206,7 +232,7 @@ def render_reports_page():
         
         with col1:
             st.subheader("💸 Masraf Dağılımı")
-            expense_breakdown = ReportsManager.get_expense_breakdown(db, days=30)
+            expense_breakdown = ReportCache.call(ReportsManager.get_expense_breakdown, db, start_date=start_date, end_date=end_date)
             
             if expense_breakdown:
                 categories = list(expense_breakdown.keys())
@@ -237,8 +263,8 @@ def render_reports_page():
                 st.info("Masraf verisi yok")
         
         with col2:
-            st.subheader("📉 Masraf Trendi (Son 30 gün)")
-            expense_trend = ReportsManager.get_expense_trend(db, days=30)
+            st.subheader("📉 Masraf Trendi")
+            expense_trend = ReportCache.call(ReportsManager.get_expense_trend, db, start_date=start_date, end_date=end_date)
             
             if expense_trend:
                 dates = list(expense_trend.keys())
@@ -254,8 +280,8 @@ def render_reports_page():
                 st.info("Masraf trendi verisi yok")
         
         # Row 2: Profit Analysis
-        st.subheader("💰 Kâr Metrikleri (Son 30 gün)")
-        profit_analysis = ReportsManager.get_profit_analysis(db, days=30)
+        st.subheader("💰 Kâr Metrikleri")
+        profit_analysis = ReportCache.call(ReportsManager.get_profit_analysis, db, start_date=start_date, end_date=end_date)
         
         if profit_analysis:
             # Metrics in columns
@@ -287,7 +313,7 @@ def render_reports_page():
         
         # Row 3: Daily Profit Trend
         st.subheader("📊 Günlük Kâr Trendi")
-        daily_profit = ReportsManager.get_daily_profit(db, days=30)
+        daily_profit = ReportCache.call(ReportsManager.get_daily_profit, db, start_date=start_date, end_date=end_date)
         
         if daily_profit:
             dates = list(daily_profit.keys())
@@ -309,7 +335,8 @@ def render_reports_page():
         # Summary Metrics
         st.subheader("📈 Kilit Performans Göstergeleri (KPI)")
         
-        summary_metrics = ReportsManager.get_summary_metrics(
+        summary_metrics = ReportCache.call(
+            ReportsManager.get_summary_metrics,
             db,
             start_date=start_date,
             end_date=end_date
@@ -350,28 +377,34 @@ def render_reports_page():
         
         # Product Profitability Analysis
         st.subheader("🎯 Ürün Kârlılık Analizi")
-        profitability = ReportsManager.get_product_profitability(db, limit=20)
+        profitability = ReportCache.call(ReportsManager.get_product_profitability, db, limit=20, start_date=start_date, end_date=end_date)
         
         if profitability:
             profit_df = pd.DataFrame([
                 {
                     'Ürün': item['product'],
                     'Satış Sayısı': item['sales'],
-                    'Toplam Gelir': format_currency(item['revenue']),
-                    'Toplam Maliyeti': format_currency(item['cost']),
-                    'Kâr': format_currency(item['profit']),
-                    'Marj %': f"{item['margin']:.1f}%"
+                    'Toplam Gelir': item['revenue'],
+                    'Toplam Maliyeti': item['cost'],
+                    'Kâr': item['profit'],
+                    'Marj %': item['margin']
                 }
                 for item in profitability
             ])
             
+            profit_df = format_frame(
+                profit_df,
+                currency=('Toplam Gelir', 'Toplam Maliyeti', 'Kâr'),
+                number=('Marj %',),
+                decimal_places=1
+            )
             st.dataframe(profit_df, use_container_width=True, hide_index=True)
         else:
             st.info("Ürün kârlılık verisi yok")
         
         # Monthly Comparison
-        st.subheader("📅 Aylık Karşılaştırma (Son 3 Ay)")
-        monthly_comparison = ReportsManager.get_monthly_comparison(db, months=3)
+        st.subheader("📅 Aylık Karşılaştırma (Bitiş Tarihinden Geriye 3 Ay)")
+        monthly_comparison = ReportCache.call(ReportsManager.get_monthly_comparison, db, months=3, end_date=end_date)
         
         if monthly_comparison:
             monthly_data = []
@@ -379,12 +412,12 @@ def render_reports_page():
                 monthly_data.append({
                     'Ay': month_str,
                     'Satış Sayısı': metrics.get('total_sales', 0),
-                    'Gelir': format_currency(metrics.get('total_revenue', 0)),
-                    'Masraf': format_currency(metrics.get('total_expenses', 0)),
-                    'Kâr': format_currency(metrics.get('net_profit', 0))
+                    'Gelir': metrics.get('total_revenue', 0),
+                    'Masraf': metrics.get('total_expenses', 0),
+                    'Kâr': metrics.get('net_profit', 0)
                 })
             
-            monthly_df = pd.DataFrame(monthly_data)
+            monthly_df = format_frame(pd.DataFrame(monthly_data), currency=('Gelir', 'Masraf', 'Kâr'))
             st.dataframe(monthly_df, use_container_width=True, hide_index=True)
         else:
             st.info("Aylık karşılaştırma verisi yok")
@@ -0,0 +1,326 @@
+"""
+📥 CafeFlow - Satış Kuyruğu (Toplu Commit)
+
+Yoğun, çok kasalı kullanımda her satışın ayrı commit (fsync) beklemesini
+önler. Satış, stok defteri üzerinden senkron olarak doğrulanır ve kuyruğa
+alınır; arka plandaki yazıcı iş parçacığı birikmiş satışları her
+FLUSH_INTERVAL_MS milisaniyede bir tek transaction ile yazar.
+
+Onay modları:
+    - Kalıcı onay (durable=True): çağıran, satış diske yazılana kadar bekler
+    - Hızlı onay (durable=False): çağıran satış numarasını hemen alır;
+      süreç yazım öncesi çökerse kuyruktaki satışlar kaybolur
+"""
+
+import os
+import queue
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, CancelledError, TimeoutError as FutureTimeoutError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from src.database import DatabaseEngine
+from src.models import Product
+from src.modules.stock_ledger import StockLedger, SYNCED_SESSION_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class PendingOrder:
+    """Kuyruğa alınmış sipariş (yazım sonucu için bekleme noktası)"""
+
+    def __init__(self, lines: list, order: dict, sale_numbers: list,
+                 payment_method: str, notes: str, reservation: dict):
+        self.lines = lines
+        self.price_infos = order["price_infos"]
+        self.product_totals = order["product_totals"]
+        self.unit_needs = order["unit_needs"]
+        self.sale_numbers = sale_numbers
+        self.payment_method = payment_method
+        self.notes = notes
+        self.reservation = reservation
+        self.future = Future()
+
+    def done(self) -> bool:
+        """Sipariş yazıldı (veya yazılamadı) mı?"""
+        return self.future.done()
+
+    def wait(self, timeout: float = None) -> list:
+        """
+        Siparişin veritabanına yazılmasını bekle
+
+        Süre dolduğunda sipariş henüz yazıma alınmadıysa iptal edilir ve
+        ayrılan stoğu geri verilir; yazım sürüyorsa sonucu yazıcı belirler.
+
+        Args:
+            timeout: En fazla bekleme süresi (saniye)
+
+        Returns:
+            list: Yazılan satış numaraları
+
+        Raises:
+            ValueError: Yazım başarısız olduysa, iptal edildiyse veya süre dolduysa
+        """
+        try:
+            return self.future.result(timeout)
+        except FutureTimeoutError:
+            if self.cancel():
+                raise ValueError("Satış zaman aşımına uğradı ve kaydedilmedi, tekrar deneyin!")
+            raise ValueError(
+                f"Satış onayı gecikti ({', '.join(self.sale_numbers)}); "
+                f"tekrar denemeden önce satış geçmişini kontrol edin!"
+            )
+        except CancelledError:
+            raise ValueError("Satış iptal edildi ve kaydedilmedi!")
+        except Exception as e:
+            raise ValueError(f"Satış kaydedilemedi: {e}") from e
+
+    def cancel(self) -> bool:
+        """
+        Henüz yazıma alınmamış siparişi iptal et ve ayrılan stoğu geri ver
+
+        Returns:
+            bool: İptal edildiyse True (yazım başladıysa False)
+        """
+        if not self.future.cancel():
+            return False
+        StockLedger.release(self.reservation)
+        return True
+
+
+class SaleIngestionQueue:
+    """Satışları biriktirip toplu commit eden yazıcı"""
+
+    ENABLED = os.getenv("SALE_QUEUE_ENABLED", "false").lower() == "true"
+    DURABLE_ACK = os.getenv("SALE_QUEUE_DURABLE", "true").lower() == "true"
+    FLUSH_INTERVAL_MS = int(os.getenv("SALE_QUEUE_FLUSH_MS", "50"))
+    MAX_BATCH = int(os.getenv("SALE_QUEUE_MAX_BATCH", "200"))
+    ACK_TIMEOUT = float(os.getenv("SALE_QUEUE_ACK_TIMEOUT", "30"))
+
+    _queue = queue.Queue()
+    _worker = None
+    _stopping = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def submit(
+        cls,
+        db: Session,
+        lines: list,
+        payment_method: str,
+        notes: str = None,
+        durable: bool = None
+    ) -> PendingOrder:
+        """
+        Siparişi doğrula, stoğunu ayır ve yazım kuyruğuna al
+
+        Args:
+            db: Ürün ve reçetelerin okunacağı oturum (yazma yapılmaz)
+            lines: [(product_id, quantity), ...] sipariş satırları
+            payment_method: Ödeme yöntemi
+            notes: Notlar
+            durable: True ise yazım tamamlanana kadar bekle
+                (varsayılan: DURABLE_ACK)
+
+        Returns:
+            PendingOrder: Satış numaraları ve yazım sonucu
+
+        Raises:
+            ValueError: Geçersiz sipariş, yetersiz stok veya (kalıcı onayda)
+                yazım hatası / onay zaman aşımı
+        """
+        from src.modules.sales import SalesManager
+
+        order = SalesManager._prepare_order(db, lines)
+        reservation = StockLedger.reserve(
+            order["product_totals"],
+            order["ingredient_needs"],
+            order["products"],
+            order["ingredients"]
+        )
+
+        try:
+            sale_numbers = SalesManager.next_sale_numbers(len(lines))
+            pending = PendingOrder(
+                list(lines), order, sale_numbers, payment_method, notes, reservation
+            )
+            cls._ensure_worker()
+            cls._queue.put(pending)
+        except Exception:
+            StockLedger.release(reservation)
+            raise
+
+        if durable if durable is not None else cls.DURABLE_ACK:
+            pending.wait(cls.ACK_TIMEOUT)
+
+        return pending
+
+    @classmethod
+    def flush(cls, timeout: float = None) -> None:
+        """Kuyruktaki tüm siparişlerin yazılmasını bekle"""
+        marker = Future()
+        cls._ensure_worker()
+        cls._queue.put(marker)
+        marker.result(timeout)
+
+    @classmethod
+    def stop(cls, timeout: float = None) -> None:
+        """Kuyruğu boşalt ve yazıcıyı durdur"""
+        with cls._lock:
+            worker = cls._worker
+            if worker is None:
+                return
+            cls._stopping = True
+            cls._queue.put(None)
+
+        worker.join(timeout)
+        with cls._lock:
+            cls._worker = None
+            cls._stopping = False
+
+    @classmethod
+    def pending_count(cls) -> int:
+        """Yazılmayı bekleyen yaklaşık sipariş sayısı"""
+        return cls._queue.qsize()
+
+    @classmethod
+    def _ensure_worker(cls) -> None:
+        """Yazıcı iş parçacığını gerekirse başlat"""
+        with cls._lock:
+            if cls._stopping:
+                raise ValueError("Satış kuyruğu kapatılıyor, satış alınamaz!")
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(
+                    target=cls._run, name="sale-ingestion", daemon=True
+                )
+                cls._worker.start()
+
+    @classmethod
+    def _run(cls) -> None:
+        """Yazıcı döngüsü: ilk siparişten sonra FLUSH_INTERVAL_MS kadar biriktir"""
+        interval = cls.FLUSH_INTERVAL_MS / 1000
+        running = True
+
+        while running:
+            item = cls._queue.get()
+            batch, markers = [], []
+
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, PendingOrder):
+                    # İptal edilen siparişler (onay süresi dolan) yazılmaz
+                    if item.future.set_running_or_notify_cancel():
+                        batch.append(item)
+                else:
+                    markers.append(item)
+
+                if not running or len(batch) >= cls.MAX_BATCH:
+                    break
+                try:
+                    item = cls._queue.get(timeout=interval if batch else 0)
+                except queue.Empty:
+                    break
+
+            if not running:
+                # Kapanış: kalan her şeyi boşalt
+                while True:
+                    try:
+                        item = cls._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, PendingOrder):
+                        if item.future.set_running_or_notify_cancel():
+                            batch.append(item)
+                    elif item is not None:
+                        markers.append(item)
+
+            if batch:
+                cls._write_batch(batch)
+            for marker in markers:
+                marker.set_result(None)
+
+    @classmethod
+    def _write_batch(cls, batch: list) -> None:
+        """Siparişleri tek commit ile yaz; başarısız olursa tek tek dene"""
+        try:
+            cls._commit(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                cls._fail(batch[0], e)
+                return
+            logger.warning(f"⚠️ Toplu satış yazımı başarısız, tek tek deneniyor: {e}")
+            for pending in batch:
+                cls._write_batch([pending])
+            return
+
+        for pending in batch:
+            StockLedger.confirm(pending.reservation)
+            pending.future.set_result(pending.sale_numbers)
+
+    @classmethod
+    def _commit(cls, batch: list) -> None:
+        """
+        Satışları ekle, ürün ve malzeme stoklarını korumalı göreli UPDATE ile
+        düş ve commit et
+
+        Malzeme tüketimi hareket defterine ve aynı transaction'da
+        `ingredients` tablosuna yazılır.
+        """
+        from src.modules.sales import SalesManager
+
+        product_totals = {}
+        records = []
+        for pending in batch:
+            for sale_number, (product_id, quantity) in zip(pending.sale_numbers, pending.lines):
+                records.append(SalesManager._build_sale(
+                    sale_number=sale_number,
+                    product_id=product_id,
+                    quantity=quantity,
+                    price_info=pending.price_infos[product_id],
+                    payment_method=pending.payment_method,
+                    notes=pending.notes
+                ))
+            records.extend(SalesManager._consumption_movements(
+                pending.unit_needs, pending.lines, pending.sale_numbers
+            ))
+            for product_id, quantity in pending.product_totals.items():
+                product_totals[product_id] = product_totals.get(product_id, 0) + quantity
+
+        db = DatabaseEngine.create_session()
+        # Stok defteri bu yazımları rezervasyon sırasında düştü
+        db.info[SYNCED_SESSION_KEY] = True
+        try:
+            db.add_all(records)
+            for product_id, quantity in product_totals.items():
+                # Başka bir süreç stoğu düşürdüyse toplu yazım geri alınır;
+                # tek tek denemede yalnızca yetmeyen sipariş başarısız olur
+                result = db.execute(
+                    update(Product)
+                    .where(Product.id == product_id, Product.quantity >= quantity)
+                    .values(quantity=Product.quantity - quantity)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 0:
+                    raise ValueError(
+                        f"Yetersiz ürün stoku! (Ürün ID: {product_id}) İstenen: {quantity}"
+                    )
+            StockLedger.write_consumption(db, [pending.reservation for pending in batch])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fail(pending: PendingOrder, error: Exception) -> None:
+        """Yazılamayan siparişin stoğunu geri ver ve hatayı bildir"""
+        logger.error(f"✗ Satış yazılamadı ({', '.join(pending.sale_numbers)}): {error}")
+        StockLedger.release(pending.reservation)
+        pending.future.set_exception(error)
+
+
+# Süreç kapanırken kuyruktaki satışları yaz
+atexit.register(SaleIngestionQueue.stop)
@@ -8,11 +8,23 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from src.database import DatabaseEngine
-from src.models import Product, Sale, Ingredient, Recipe, StockMovement
+from sqlalchemy import func, select, update, case
+from src.database import DatabaseEngine, SequenceAllocator, KeysetPage, keyset_paginate
+from src.models import Product, Sale, Ingredient, Recipe, IngredientMovement, Category, loader_options
+from src.modules.cost_cache import ProductCostCache
+from src.modules.sale_queue import SaleIngestionQueue
+from src.modules.stock_ledger import StockLedger
+from src.modules.inventory import InventoryManager
+from src.modules.catalog import CatalogCache
+from src.modules.pager_ui import current_cursor, render_pager
 from decimal import Decimal
-from src.utils.locale_utils import format_currency, format_datetime
+from src.utils.locale_utils import format_currency, format_frame
+from src.utils.date_buckets import date_bucket
+
+
+def _seed_sale_number(conn) -> int:
+    """Satış numarası sayacının başlangıç değeri (mevcut numaralandırmanın devamı)"""
+    return (conn.execute(select(func.max(Sale.id))).scalar() or 0) + 1
 
 
 class SalesManager:
@@ -71,11 +83,10 @@ class SalesManager:
             raise ValueError(f"Malzeme bulunamadı (ID: {ingredient_id})")
         
         if quantity_change > 0:
-            ingredient.add_stock(quantity_change)
+            InventoryManager.add_ingredient_stock(db, ingredient_id, quantity_change, reason)
         elif quantity_change < 0:
-            ingredient.remove_stock(-quantity_change)
+            InventoryManager.remove_ingredient_stock(db, ingredient_id, -quantity_change, reason)
         
-        db.commit()
         return True
     
     # ============================================================
@@ -115,21 +126,16 @@ class SalesManager:
         return recipe
     
     @staticmethod
-    def get_recipe(db: Session, product_id: int) -> list:
-        """Ürünün reçetesini al"""
-        return db.query(Recipe).filter(Recipe.product_id == product_id).all()
+    def get_recipe(db: Session, product_id: int, profile: str = "pos") -> list:
+        """Ürünün reçetesini al (varsayılan: malzemeleriyle birlikte)"""
+        return db.query(Recipe).options(
+            *loader_options(Recipe, profile)
+        ).filter(Recipe.product_id == product_id).all()
     
     @staticmethod
     def calculate_product_cost(db: Session, product_id: int) -> float:
-        """Ürünün toplam malzeme maliyetini hesapla"""
-        recipe_items = db.query(Recipe).filter(Recipe.product_id == product_id).all()
-        
-        total_cost = 0
-        for item in recipe_items:
-            if item.ingredient:
-                total_cost += item.quantity * item.ingredient.cost_per_unit
-        
-        return total_cost
+        """Ürünün toplam malzeme maliyetini hesapla (önbellekli)"""
+        return ProductCostCache.get(db, product_id)
     
     # ============================================================
     # SATIŞLAR
@@ -143,37 +149,271 @@ class SalesManager:
         payment_method: str,
         notes: str = None
     ) -> Sale:
-        """Satış oluştur (Stok düşmesi otomatik)"""
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
-            raise ValueError(f"Ürün bulunamadı (ID: {product_id})")
+        """
+        Satış oluştur (Stok düşmesi otomatik)
         
-        if quantity <= 0:
-            raise ValueError("Miktar 0'dan büyük olmalı!")
+        SALE_QUEUE_ENABLED açıksa satış toplu commit kuyruğuna alınır.
+        Kalıcı onay modunda yazılmış kayıt, hızlı onay modunda ise
+        numarası ve tutarları dolu, henüz kaydedilmemiş satış döner.
+        """
+        if SaleIngestionQueue.ENABLED:
+            pending = SaleIngestionQueue.submit(
+                db,
+                lines=[(product_id, quantity)],
+                payment_method=payment_method,
+                notes=notes
+            )
+            if pending.done():
+                # Hızlı onayda da yazım hatası kullanıcıya ValueError olarak döner
+                pending.wait(0)
+                return db.query(Sale).filter(
+                    Sale.sale_number == pending.sale_numbers[0]
+                ).one()
+            return SalesManager._build_sale(
+                sale_number=pending.sale_numbers[0],
+                product_id=product_id,
+                quantity=quantity,
+                price_info=pending.price_infos[product_id],
+                payment_method=payment_method,
+                notes=notes
+            )
         
-        if product.quantity < quantity:
-            raise ValueError(f"Yetersiz ürün stoku! Mevcut: {product.quantity}, İstenen: {quantity}")
+        sale = SalesManager.create_order(
+            db,
+            lines=[(product_id, quantity)],
+            payment_method=payment_method,
+            notes=notes
+        )[0]
+        db.refresh(sale)
         
-        # Malzeme stok kontrolü
-        recipe_items = SalesManager.get_recipe(db, product_id)
-        for item in recipe_items:
-            required_quantity = item.quantity * quantity
-            if item.ingredient.quantity < required_quantity:
+        return sale
+    
+    @staticmethod
+    def create_order(
+        db: Session,
+        lines: list,
+        payment_method: str,
+        notes: str = None
+    ) -> list:
+        """
+        Çok kalemli sipariş oluştur (tek transaction)
+        
+        Sepetteki tüm ürünlerin ürün stokları tek seferde kontrol edilir;
+        malzeme stokları StockLedger üzerinden sepet toplamı kadar ayrılır
+        ve satış kayıtları ile stok düşümleri tek commit ile yazılır.
+        
+        Args:
+            db: Veritabanı oturumu
+            lines: [(product_id, quantity), ...] sipariş satırları
+            payment_method: Ödeme yöntemi
+            notes: Notlar (tüm satırlara yazılır)
+            
+        Returns:
+            list: Oluşturulan satış kayıtları (satır sırasıyla)
+        """
+        order = SalesManager._prepare_order(db, lines)
+        products = order["products"]
+        
+        for product_id, total_quantity in order["product_totals"].items():
+            product = products[product_id]
+            if product.quantity < total_quantity:
                 raise ValueError(
-                    f"Yetersiz malzeme stoku! "
-                    f"{item.ingredient.name}: Gerekli {required_quantity}{item.unit}, "
-                    f"Mevcut: {item.ingredient.quantity}{item.unit}"
+                    f"Yetersiz ürün stoku! {product.name}: "
+                    f"Mevcut: {product.quantity}, İstenen: {total_quantity}"
+                )
+        
+        # Malzeme stoğu önce bellek içi defterden ayrılır (malzeme satırı okunmaz)
+        reservation = StockLedger.reserve(
+            {}, order["ingredient_needs"], {}, order["ingredients"]
+        )
+        
+        try:
+            # Satış numaraları (süreç içi bloktan, sorgusuz)
+            sale_numbers = SalesManager.next_sale_numbers(len(lines))
+            
+            sales = []
+            for sale_number, (product_id, quantity) in zip(sale_numbers, lines):
+                sales.append(SalesManager._build_sale(
+                    sale_number=sale_number,
+                    product_id=product_id,
+                    quantity=quantity,
+                    price_info=order["price_infos"][product_id],
+                    payment_method=payment_method,
+                    notes=notes
+                ))
+            
+            # Ürün stok düşümü: ürün başına bir kez, göreli ve korumalı UPDATE
+            # (eşzamanlı satışlar birbirinin düşümünü ezemez, stok eksiye düşmez)
+            for product_id, total_quantity in order["product_totals"].items():
+                result = db.execute(
+                    update(Product)
+                    .where(Product.id == product_id, Product.quantity >= total_quantity)
+                    .values(quantity=Product.quantity - total_quantity)
+                    .execution_options(synchronize_session=False)
                 )
+                if result.rowcount == 0:
+                    raise ValueError(
+                        f"Yetersiz ürün stoku! {products[product_id].name}: "
+                        f"İstenen: {total_quantity}"
+                    )
+            
+            db.add_all(sales)
+            # Malzeme tüketimi hareket defterine (satır başına, kendi satış
+            # numarasıyla) ve aynı transaction'da tabloya yazılır
+            db.add_all(SalesManager._consumption_movements(
+                order["unit_needs"], lines, sale_numbers
+            ))
+            StockLedger.write_consumption(db, [reservation])
+            db.commit()
+        except Exception:
+            db.rollback()
+            StockLedger.release(reservation)
+            raise
+        
+        # Göreli UPDATE flush olaylarına düşmez: ürün düşümü deftere ayrıca yansıtılır
+        StockLedger.apply_changes(
+            {product_id: -quantity for product_id, quantity in order["product_totals"].items()}
+        )
+        StockLedger.confirm(reservation)
+        
+        return sales
+    
+    @staticmethod
+    def _prepare_order(db: Session, lines: list) -> dict:
+        """
+        Sipariş satırlarını doğrula; ürünleri, reçeteleri ve fiyatları yükle
+        
+        Stok kontrolü yapılmaz (çağıran taraf veritabanı veya stok defteri
+        üzerinden kontrol eder).
+        
+        Args:
+            db: Veritabanı oturumu
+            lines: [(product_id, quantity), ...] sipariş satırları
+            
+        Returns:
+            dict: products, product_totals, ingredients, ingredient_needs,
+                unit_needs, price_infos
+        """
+        if not lines:
+            raise ValueError("Sipariş en az bir ürün içermeli!")
+        
+        # Aynı ürün birden fazla satırda olabilir: stok kontrolü toplam üzerinden
+        product_totals = {}
+        for product_id, quantity in lines:
+            if quantity <= 0:
+                raise ValueError("Miktar 0'dan büyük olmalı!")
+            product_totals[product_id] = product_totals.get(product_id, 0) + quantity
+        
+        products = {
+            p.id: p
+            for p in db.query(Product).filter(Product.id.in_(product_totals)).all()
+        }
+        for product_id in product_totals:
+            if product_id not in products:
+                raise ValueError(f"Ürün bulunamadı (ID: {product_id})")
+        
+        # Sepetin tüm reçeteleri ve malzemeleri tek sorguda
+        recipe_items = db.query(Recipe).options(
+            *loader_options(Recipe, "pos")
+        ).filter(Recipe.product_id.in_(product_totals)).all()
+        
+        recipes_by_product = {}
+        for item in recipe_items:
+            recipes_by_product.setdefault(item.product_id, []).append(item)
+        
+        # Malzeme ihtiyacı (malzemenin stok biriminde) - sepet toplamı;
+        # hareket satırları için ürün başına 1 adetlik ihtiyaç (temel birimde)
+        ingredient_needs = {}
+        unit_needs = {}
+        ingredients = {}
+        for item in recipe_items:
+            ingredient = item.ingredient
+            required = Ingredient.convert_quantity(
+                item.quantity * product_totals[item.product_id],
+                item.unit,
+                ingredient.unit
+            )
+            ingredients[ingredient.id] = ingredient
+            ingredient_needs[ingredient.id] = ingredient_needs.get(ingredient.id, 0) + required
+            
+            per_unit = unit_needs.setdefault(item.product_id, {})
+            per_unit[ingredient.id] = per_unit.get(ingredient.id, 0) + Ingredient.to_base(
+                Ingredient.convert_quantity(item.quantity, item.unit, ingredient.unit),
+                ingredient.unit
+            )
+        
+        # Ürün başına fiyat bilgisi (önceden yüklenmiş reçeteden)
+        price_infos = {}
+        for product_id, product in products.items():
+            ingredient_cost = ProductCostCache.compute(
+                product_id, recipes_by_product.get(product_id, [])
+            )
+            price_infos[product_id] = SalesManager._build_price_info(product, ingredient_cost)
+        
+        return {
+            "products": products,
+            "product_totals": product_totals,
+            "ingredients": ingredients,
+            "ingredient_needs": ingredient_needs,
+            "unit_needs": unit_needs,
+            "price_infos": price_infos,
+        }
+    
+    @staticmethod
+    def _consumption_movements(unit_needs: dict, lines: list, sale_numbers: list) -> list:
+        """
+        Sipariş satırlarının malzeme tüketim hareketlerini oluştur
+        
+        Her satırın tüketimi kendi satış numarasıyla yazılır (iade veya
+        satış bazlı inceleme doğru satırı bulur).
         
-        # Fiyat hesapla
-        price_info = SalesManager.calculate_sale_price(db, product_id, quantity)
+        Args:
+            unit_needs: {product_id: {ingredient_id: 1 adet için temel birimde ihtiyaç}}
+            lines: [(product_id, quantity), ...] sipariş satırları
+            sale_numbers: Satırların satış numaraları (satır sırasıyla)
+            
+        Returns:
+            list: IngredientMovement nesneleri (oturuma eklenmemiş)
+        """
+        movements = []
+        for sale_number, (product_id, quantity) in zip(sale_numbers, lines):
+            movements.extend(IngredientMovement.for_consumption(
+                {
+                    ingredient_id: need * quantity
+                    for ingredient_id, need in unit_needs.get(product_id, {}).items()
+                },
+                sale_number
+            ))
+        return movements
+    
+    @staticmethod
+    def next_sale_numbers(count: int = 1) -> list:
+        """
+        Benzersiz satış numaraları ayır
         
-        # Satış numarası oluştur
-        last_sale = db.query(Sale).order_by(Sale.id.desc()).first()
-        sale_number = f"SAT-{(last_sale.id if last_sale else 0) + 1:06d}"
+        Numaralar paralel kasalar arasında çakışmaz; okuma-yazma yarışı
+        olmadan SequenceAllocator bloklarından dağıtılır.
         
-        # Satış kaydı oluştur
-        sale = Sale(
+        Args:
+            count: İstenen numara sayısı
+            
+        Returns:
+            list: "SAT-000123" biçiminde satış numaraları
+        """
+        allocator = SequenceAllocator.get("sale_number", seed=_seed_sale_number)
+        return [f"SAT-{value:06d}" for value in allocator.next_values(count)]
+    
+    @staticmethod
+    def _build_sale(
+        sale_number: str,
+        product_id: int,
+        quantity: int,
+        price_info: dict,
+        payment_method: str,
+        notes: str = None
+    ) -> Sale:
+        """Fiyat bilgisinden satış kaydı oluştur (veritabanına eklemeden)"""
+        return Sale(
             sale_number=sale_number,
             product_id=product_id,
             quantity=quantity,
@@ -189,35 +429,84 @@ class SalesManager:
             payment_method=payment_method,
             notes=notes
         )
-        
-        # Ürün stok düş
-        product.quantity -= quantity
-        
-        # Malzeme stok düş (birim dönüşümü ile)
-        for item in recipe_items:
-            required_quantity = item.quantity * quantity
-            # item.unit = recipe'deki birim, ingredient.unit = malzemenin stoğunun birimi
-            item.ingredient.remove_stock(required_quantity, amount_unit=item.unit)
-        
-        db.add(sale)
-        db.commit()
-        db.refresh(sale)
-        
-        return sale
     
     @staticmethod
-    def get_sales_by_period(db: Session, start_date: datetime, end_date: datetime) -> list:
-        """Tarih aralığına göre satışları al"""
-        return db.query(Sale).filter(
+    def get_sales_by_period(db: Session, start_date: datetime, end_date: datetime,
+                            profile: str = "history") -> list:
+        """Tarih aralığına göre satışları al (varsayılan: ürünleriyle birlikte)"""
+        return db.query(Sale).options(
+            *loader_options(Sale, profile)
+        ).filter(
             Sale.created_at >= start_date,
             Sale.created_at <= end_date
         ).order_by(Sale.created_at.desc()).all()
     
     @staticmethod
-    def get_all_sales(db: Session) -> list:
-        """Tüm satışları al"""
-        return db.query(Sale).order_by(Sale.created_at.desc()).all()
-    
+    def get_all_sales(db: Session, profile: str = "history") -> list:
+        """Tüm satışları al (varsayılan: ürünleriyle birlikte)"""
+        return db.query(Sale).options(
+            *loader_options(Sale, profile)
+        ).order_by(Sale.created_at.desc()).all()
+
+    # Sayfalı liste sıralamaları: ad -> (sıralama anahtarı, azalan mı?)
+    PAGE_SORTS = {
+        "newest": ((Sale.created_at, Sale.id), True),
+        "oldest": ((Sale.created_at, Sale.id), False),
+        "total_desc": ((Sale.total_with_kdv, Sale.id), True),
+    }
+
+    @staticmethod
+    def get_sales_page(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        product_id: int = None,
+        payment_method: str = None,
+        is_refunded: bool = None,
+        sort: str = "newest",
+        cursor: tuple = None,
+        limit: int = 50,
+        profile: str = "history"
+    ) -> KeysetPage:
+        """
+        Satışları imleç tabanlı sayfalarla al
+
+        Filtreler ve sıralama veritabanında uygulanır; her çağrı yalnızca bir
+        sayfa (limit + 1 satır) okur.
+
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (dahil)
+            end_date: Bitiş (dahil)
+            product_id: Ürün filtresi
+            payment_method: Ödeme yöntemi filtresi
+            is_refunded: İade filtresi (None: tümü)
+            sort: Sıralama (newest, oldest, total_desc)
+            cursor: Önceki sayfanın next_cursor değeri
+            limit: Sayfa boyutu
+            profile: İlişki yükleme profili
+
+        Returns:
+            KeysetPage: Satışlar ve sonraki sayfa imleci
+        """
+        if sort not in SalesManager.PAGE_SORTS:
+            raise ValueError(f"Geçersiz sıralama: {sort}")
+        sort_columns, descending = SalesManager.PAGE_SORTS[sort]
+
+        query = db.query(Sale).options(*loader_options(Sale, profile))
+        if start_date is not None:
+            query = query.filter(Sale.created_at >= start_date)
+        if end_date is not None:
+            query = query.filter(Sale.created_at <= end_date)
+        if product_id is not None:
+            query = query.filter(Sale.product_id == product_id)
+        if payment_method is not None:
+            query = query.filter(Sale.payment_method == payment_method)
+        if is_refunded is not None:
+            query = query.filter(Sale.is_refunded == is_refunded)
+
+        return keyset_paginate(query, sort_columns, cursor, limit, descending)
+
     @staticmethod
     def calculate_sale_price(
         db: Session,
@@ -232,13 +521,19 @@ class SalesManager:
         - Brüt Kâr = (Satış Fiyatı - KDV) - Malzeme Maliyeti
         - Net Kâr = Brüt Kâr (KDV zaten satış fiyatından düşüldü)
         """
-        product = db.query(Product).filter(Product.id == product_id).first()
+        # Oturumda yüklüyse sorgu atmadan kimlik haritasından gelir
+        product = db.get(Product, product_id)
         if not product:
             raise ValueError(f"Ürün bulunamadı (ID: {product_id})")
         
         # Toplam malzeme maliyeti
         total_ingredient_cost = SalesManager.calculate_product_cost(db, product_id)
         
+        return SalesManager._build_price_info(product, total_ingredient_cost)
+    
+    @staticmethod
+    def _build_price_info(product: Product, total_ingredient_cost: float) -> dict:
+        """Ürün ve malzeme maliyetinden birim fiyat bilgisini hesapla"""
         # Seçenek A: Satış fiyatı ürünün önceden belirlenen fiyatı
         sale_price_without_kdv = float(product.price)
         
@@ -268,48 +563,126 @@ class SalesManager:
     # RAPORLAR
     # ============================================================
     
+    # get_sales_report gruplama boyutları: ad -> (kolonlar(db), gereken join'ler)
+    # Saat, get_hourly_sales ile aynı lehçe uyumlu dilimdir ("00".."23")
+    REPORT_DIMENSIONS = {
+        "product": (
+            lambda db: (Sale.product_id.label("product_id"), Product.name.label("product")),
+            ("product",)
+        ),
+        "category": (
+            lambda db: (Category.id.label("category_id"), Category.name.label("category")),
+            ("product", "category")
+        ),
+        "payment_method": (
+            lambda db: (Sale.payment_method.label("payment_method"),),
+            ()
+        ),
+        "hour": (
+            lambda db: (date_bucket(db, Sale.created_at, "hour").label("hour"),),
+            ()
+        ),
+    }
+    
     @staticmethod
-    def get_sales_report(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
-        """Satış raporu"""
-        query = db.query(Sale)
+    def get_sales_report(
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        group_by=None
+    ):
+        """
+        Satış raporu (tek SQL toplama sorgusu)
+        
+        İade edilen satışlar gelir/kâr toplamlarına katılmaz; ayrıca
+        refund_count ve total_refunded olarak raporlanır.
+        
+        Args:
+            db: Veritabanı oturumu
+            start_date: Başlangıç (isteğe bağlı)
+            end_date: Bitiş (isteğe bağlı)
+            group_by: Gruplama boyutu veya boyutları
+                ("product", "category", "payment_method", "hour";
+                saat "00".."23" metni olarak döner)
+            
+        Returns:
+            dict: Gruplama yoksa toplamlar
+            list: Gruplama varsa boyut değerleri + toplamlar içeren satırlar
+        """
+        if isinstance(group_by, str):
+            group_by = (group_by,)
+        group_by = tuple(group_by or ())
+        
+        for dimension in group_by:
+            if dimension not in SalesManager.REPORT_DIMENSIONS:
+                raise ValueError(
+                    f"Geçersiz gruplama: {dimension} "
+                    f"({', '.join(SalesManager.REPORT_DIMENSIONS)})"
+                )
+        
+        def active(column):
+            return func.coalesce(func.sum(case((Sale.is_refunded == False, column), else_=0)), 0)
+        
+        dimension_columns = []
+        joins = []
+        for dimension in group_by:
+            columns, required_joins = SalesManager.REPORT_DIMENSIONS[dimension]
+            dimension_columns.extend(columns(db))
+            joins.extend(j for j in required_joins if j not in joins)
+        
+        query = db.query(
+            *dimension_columns,
+            func.count(case((Sale.is_refunded == False, Sale.id))).label("total_sales"),
+            active(Sale.total_with_kdv).label("total_revenue"),
+            active(Sale.kdv_amount).label("total_kdv"),
+            active(Sale.product_cost).label("total_ingredient_cost"),
+            active(Sale.gross_profit).label("total_gross_profit"),
+            active(Sale.net_profit).label("total_net_profit"),
+            func.count(case((Sale.is_refunded == True, Sale.id))).label("refund_count"),
+            func.coalesce(
+                func.sum(case((Sale.is_refunded == True, Sale.total_with_kdv), else_=0)), 0
+            ).label("total_refunded")
+        ).select_from(Sale)
+        
+        if "product" in joins:
+            query = query.join(Product, Sale.product_id == Product.id)
+        if "category" in joins:
+            query = query.join(Category, Product.category_id == Category.id)
         
         if start_date:
             query = query.filter(Sale.created_at >= start_date)
         if end_date:
             query = query.filter(Sale.created_at <= end_date)
         
-        sales = query.all()
-        
-        if not sales:
-            return {
-                "total_sales": 0,
-                "total_revenue": 0,
-                "total_kdv": 0,
-                "total_ingredient_cost": 0,
-                "total_gross_profit": 0,
-                "total_net_profit": 0,
-                "average_per_sale": 0
+        if dimension_columns:
+            query = query.group_by(*dimension_columns).order_by(*dimension_columns)
+        
+        def build(row) -> dict:
+            total_sales = row.total_sales or 0
+            total_revenue = float(row.total_revenue)
+            result = {
+                "total_sales": total_sales,
+                "total_revenue": round(total_revenue, 2),
+                "total_kdv": round(float(row.total_kdv), 2),
+                "total_ingredient_cost": round(float(row.total_ingredient_cost), 2),
+                "total_gross_profit": round(float(row.total_gross_profit), 2),
+                "total_net_profit": round(float(row.total_net_profit), 2),
+                "average_per_sale": round(total_revenue / total_sales, 2) if total_sales else 0,
+                "refund_count": row.refund_count or 0,
+                "total_refunded": round(float(row.total_refunded), 2),
             }
+            for column in dimension_columns:
+                result[column.key] = getattr(row, column.key)
+            return result
         
-        total_revenue = sum(float(s.total_with_kdv) for s in sales)
-        total_kdv = sum(float(s.kdv_amount) for s in sales)
-        total_cost = sum(float(s.product_cost) for s in sales)
-        total_gross_profit = sum(float(s.gross_profit) for s in sales)
-        total_net_profit = sum(float(s.net_profit) for s in sales)
+        if not group_by:
+            return build(query.one())
         
-        return {
-            "total_sales": len(sales),
-            "total_revenue": round(total_revenue, 2),
-            "total_kdv": round(total_kdv, 2),
-            "total_ingredient_cost": round(total_cost, 2),
-            "total_gross_profit": round(total_gross_profit, 2),
-            "total_net_profit": round(total_net_profit, 2),
-            "average_per_sale": round(total_revenue / len(sales), 2) if sales else 0
-        }
+        return [build(row) for row in query.all()]
     
     @staticmethod
     def get_product_sales_summary(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
-        """Ürün bazlı satış özeti"""
+        """Ürün bazlı satış özeti (iade edilen satışlar hariç)"""
         query = db.query(
             Sale.product_id,
             Product.name,
@@ -317,7 +690,9 @@ class SalesManager:
             func.sum(Sale.quantity).label("total_quantity"),
             func.sum(Sale.total_with_kdv).label("total_revenue"),
             func.sum(Sale.net_profit).label("total_profit")
-        ).join(Product).group_by(Sale.product_id, Product.name)
+        ).join(Product).filter(
+            Sale.is_refunded == False
+        ).group_by(Sale.product_id, Product.name)
         
         if start_date:
             query = query.filter(Sale.created_at >= start_date)
@@ -362,7 +737,8 @@ def render_sales_page():
         with tab1:
             st.subheader("Satış Yap")
             
-            products = db.query(Product).filter(Product.is_active == True).order_by(Product.name).all()
+            catalog = CatalogCache.get(db)
+            products = catalog.active_products()
             
             if not products:
                 st.warning("Aktif ürün yok! Lütfen Malzeme ve Ürün Yönetimi sayfasında ürün oluşturun.")
@@ -374,7 +750,7 @@ def render_sales_page():
                         product_id = st.selectbox(
                             "Ürün Seçin *",
                             options=[p.id for p in products],
-                            format_func=lambda x: next((p.name for p in products if p.id == x), "")
+                            format_func=catalog.product_name
                         )
                     
                     with col2:
@@ -452,28 +828,73 @@ def render_sales_page():
             with col2:
                 end_date = st.date_input("Bitiş Tarihi", value=datetime.now(), key="sales_end")
             
-            sales = SalesManager.get_sales_by_period(
+            catalog = CatalogCache.get(db)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                history_product = st.selectbox(
+                    "Ürün",
+                    [None] + [p.id for p in catalog.products],
+                    format_func=lambda x: "Tümü" if x is None else catalog.product_name(x),
+                    key="sales_history_product"
+                )
+            with col2:
+                history_payment = st.selectbox(
+                    "Ödeme Yöntemi",
+                    [None] + list(Sale.PAYMENT_METHODS.keys()),
+                    format_func=lambda x: "Tümü" if x is None else Sale.PAYMENT_METHODS.get(x, x),
+                    key="sales_history_payment"
+                )
+            with col3:
+                history_sort = st.selectbox(
+                    "Sıralama",
+                    list(SalesManager.PAGE_SORTS.keys()),
+                    format_func=lambda x: {
+                        "newest": "En yeni", "oldest": "En eski", "total_desc": "En yüksek tutar"
+                    }[x],
+                    key="sales_history_sort"
+                )
+            with col4:
+                page_size = st.selectbox("Sayfa Boyutu", [25, 50, 100, 200], index=1, key="sales_page_size")
+            
+            signature = (start_date, end_date, history_product, history_payment, history_sort, page_size)
+            page = SalesManager.get_sales_page(
                 db,
-                datetime.combine(start_date, datetime.min.time()),
-                datetime.combine(end_date, datetime.max.time())
+                start_date=datetime.combine(start_date, datetime.min.time()),
+                end_date=datetime.combine(end_date, datetime.max.time()),
+                product_id=history_product,
+                payment_method=history_payment,
+                sort=history_sort,
+                cursor=current_cursor("sales_history_pages", signature),
+                limit=page_size
             )
+            sales = page.items
             
             if sales:
-                sales_data = []
-                for sale in sales:
-                    sales_data.append({
-                        "Satış No": sale.sale_number,
-                        "Tarih": sale.created_at.strftime("%d.%m.%Y %H:%M"),
-                        "Ürün": sale.product.name if sale.product else "N/A",
-                        "Miktar": sale.quantity,
-                        "Ürün Maliyeti": format_currency(float(sale.product_cost) / sale.quantity if sale.quantity > 0 else 0),
-                        "Tutar (KDV-)": format_currency(float(sale.sale_price_without_kdv)),
-                        "KDV": format_currency(float(sale.kdv_amount)),
-                        "Toplam": format_currency(float(sale.total_with_kdv)),
-                        "Kâr": format_currency(float(sale.net_profit))
-                    })
+                sales_df = pd.DataFrame({
+                    "Satış No": [sale.sale_number for sale in sales],
+                    "Tarih": [sale.created_at for sale in sales],
+                    "Ürün": [sale.product.name if sale.product else "N/A" for sale in sales],
+                    "Miktar": [sale.quantity for sale in sales],
+                    "Ürün Maliyeti": [
+                        float(sale.product_cost) / sale.quantity if sale.quantity > 0 else 0
+                        for sale in sales
+                    ],
+                    "Tutar (KDV-)": [float(sale.sale_price_without_kdv) for sale in sales],
+                    "KDV": [float(sale.kdv_amount) for sale in sales],
+                    "Toplam": [float(sale.total_with_kdv) for sale in sales],
+                    "Kâr": [float(sale.net_profit) for sale in sales],
+                })
                 
-                st.dataframe(pd.DataFrame(sales_data), use_container_width=True, hide_index=True)
+                st.dataframe(
+                    format_frame(
+                        sales_df,
+                        currency=("Ürün Maliyeti", "Tutar (KDV-)", "KDV", "Toplam", "Kâr"),
+                        datetime_columns={"Tarih": "%d.%m.%Y %H:%M"}
+                    ),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                render_pager("sales_history_pages", page)
             else:
                 st.info("Satış kaydı bulunamadı")
         
@@ -523,17 +944,22 @@ def render_sales_page():
             product_summary = SalesManager.get_product_sales_summary(db, start_dt, end_dt)
             
             if product_summary:
-                summary_data = []
-                for product_name, data in product_summary.items():
-                    summary_data.append({
+                summary_df = pd.DataFrame([
+                    {
                         "Ürün": product_name,
                         "Adet": data["count"],
                         "Miktar": data["quantity"],
-                        "Gelir": format_currency(data['revenue']),
-                        "Kâr": format_currency(data['profit'])
-                    })
+                        "Gelir": data["revenue"],
+                        "Kâr": data["profit"]
+                    }
+                    for product_name, data in product_summary.items()
+                ])
                 
-                st.dataframe(pd.DataFrame(summary_data), use_container_width=True, hide_index=True)
+                st.dataframe(
+                    format_frame(summary_df, currency=("Gelir", "Kâr")),
+                    use_container_width=True,
+                    hide_index=True
+                )
             else:
                 st.info("Satış kaydı yok")
     
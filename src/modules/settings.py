@@ -6,6 +6,9 @@ import streamlit as st
 import pandas as pd
 from src.database import DatabaseEngine
 from src.models import Category, Expense, Product, ExpenseCategory
+from src.modules.report_cache import ReportCache
+from src.modules.catalog import CatalogCache
+from src.modules.catalog_import import CatalogImporter
 
 
 def render_settings_page():
@@ -18,10 +21,12 @@ def render_settings_page():
     
     try:
         # Main tabs
-        tab1, tab2, tab3 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
             "👤 Kullanıcı Ayarları",
             "🏷️ Ürün Kategorileri",
-            "💰 Masraf Kategorileri"
+            "💰 Masraf Kategorileri",
+            "🗃️ Rapor Önbelleği",
+            "📥 Katalog İçe Aktarımı"
         ])
         
         # ============================================================
@@ -123,7 +128,8 @@ def render_settings_page():
             with col2:
                 st.subheader("📋 Mevcut Kategoriler")
                 
-                categories = db.query(Category).order_by(Category.name).all()
+                catalog = CatalogCache.get(db)
+                categories = catalog.categories
                 
                 if categories:
                     cat_data = []
@@ -142,11 +148,12 @@ def render_settings_page():
                     selected_cat = st.selectbox(
                         "Düzenlemek için kategori seçin",
                         options=[c.id for c in categories],
-                        format_func=lambda x: next((c.name for c in categories if c.id == x), "")
+                        format_func=catalog.category_name
                     )
                     
                     if selected_cat:
-                        selected = next((c for c in categories if c.id == selected_cat), None)
+                        # Düzenleme/silme için kaydı oturuma yükle
+                        selected = db.get(Category, selected_cat)
                         
                         col_edit, col_delete = st.columns(2)
                         
@@ -212,14 +219,15 @@ def render_settings_page():
                     st.markdown("---")
                     st.subheader("✏️ Düzenle / ❌ Sil")
 
+                    expense_cats_by_id = {c.id: c for c in expense_cats}
                     sel = st.selectbox(
                         "Düzenlemek için kategori seçin",
-                        options=[c.id for c in expense_cats],
-                        format_func=lambda x: next((c.name for c in expense_cats if c.id == x), "")
+                        options=list(expense_cats_by_id),
+                        format_func=lambda x: expense_cats_by_id[x].name
                     )
 
                     if sel:
-                        selected = next((c for c in expense_cats if c.id == sel), None)
+                        selected = expense_cats_by_id.get(sel)
                         if selected:
                             col_e, col_d = st.columns(2)
                             with col_e:
@@ -296,6 +304,84 @@ def render_settings_page():
                 Masraf kategorileri artık veritabanında saklanıyor. Uygulamaya eklenen kategoriler buradan yönetilebilir.
                 * Kod alanı, masraf kayıtlarında saklanan kısa anahtar (ör: KIRA) olmalıdır.
                 """)
+        
+        # ============================================================
+        # TAB 4: RAPOR ÖNBELLEĞİ
+        # ============================================================
+        with tab4:
+            st.subheader("Rapor Önbelleği")
+            
+            cache_stats = ReportCache.stats()
+            
+            if not cache_stats["enabled"]:
+                st.warning("⚠️ Rapor önbelleği devre dışı (REPORT_CACHE_ENABLED=false)")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("İsabet", cache_stats["hits"])
+            col2.metric("Iskalama", cache_stats["misses"])
+            col3.metric("İsabet Oranı", f"%{cache_stats['hit_rate']:.1f}")
+            col4.metric("Kayıt Sayısı", cache_stats["entries"])
+            
+            st.caption(
+                f"Veri sürümü: {cache_stats['version']} · "
+                f"Geçersiz kılma: {cache_stats['invalidations']} · "
+                f"TTL: {cache_stats['ttl']:.0f} sn"
+            )
+            
+            if st.button("🧹 Önbelleği Temizle", key="clear_report_cache"):
+                ReportCache.clear()
+                st.success("✓ Rapor önbelleği temizlendi!")
+                st.rerun()
+        
+        # ============================================================
+        # TAB 5: KATALOG İÇE AKTARIMI
+        # ============================================================
+        with tab5:
+            st.subheader("📥 Malzeme, Ürün ve Reçete İçe Aktarımı")
+            
+            st.caption(
+                "XLSX: 'ingredients', 'products', 'recipes' sayfaları · "
+                "CSV: tek dosya, 'record_type' kolonu (ingredient / product / recipe). "
+                "Reçete birimleri malzemenin stok birimine çevrilir; hatalı satır "
+                "varsa hiçbir kayıt yazılmaz."
+            )
+            
+            upload = st.file_uploader("Katalog Dosyası", type=["csv", "xlsx"], key="catalog_import_file")
+            dry_run = st.checkbox("Yalnızca doğrula (kaydetme)", value=True, key="catalog_import_dry_run")
+            
+            if upload is not None and st.button("📥 İçe Aktar", key="catalog_import_run"):
+                try:
+                    frames = CatalogImporter.read_file(upload, file_name=upload.name)
+                    report = CatalogImporter.import_frames(db, dry_run=dry_run, **frames)
+                except ValueError as e:
+                    st.error(f"✗ Hata: {str(e)}")
+                else:
+                    valid = report["valid_rows"]
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Malzeme", valid["ingredients"])
+                    col2.metric("Ürün", valid["products"])
+                    col3.metric("Reçete Satırı", valid["recipes"])
+                    
+                    if report["errors"]:
+                        st.error(f"✗ {len(report['errors'])} hata bulundu, kayıt yapılmadı")
+                        st.dataframe(
+                            pd.DataFrame({"Hata": report["errors"]}),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                    elif report["written"]:
+                        st.success(
+                            "✓ İçe aktarıldı · "
+                            f"Malzeme: {report['ingredients']['created']} yeni, "
+                            f"{report['ingredients']['updated']} güncellendi · "
+                            f"Ürün: {report['products']['created']} yeni, "
+                            f"{report['products']['updated']} güncellendi · "
+                            f"Reçete: {report['recipes']['created']} yeni, "
+                            f"{report['recipes']['updated']} güncellendi, "
+                            f"{report['recipes']['deleted']} silindi"
+                        )
+                    else:
+                        st.info("✓ Doğrulama başarılı; kaydetmek için 'Yalnızca doğrula' seçeneğini kaldırın")
     
     finally:
         db.close()
@@ -0,0 +1,421 @@
+"""
+📦 CafeFlow - Bellek İçi Stok Defteri
+
+Ürün ve malzeme stoklarının süreç içindeki güncel değerini tutar.
+Satışlar stok kontrolünü veritabanına gitmeden bu defter üzerinden yapar;
+rezervasyonlar atomik olarak düşülür, başarısız olursa geri verilir.
+
+Tablo esastır: defter, tablodaki commit edilmiş miktarın üzerinde bir
+rezervasyon katmanıdır. Ayrılan malzeme tüketimi, satış ve hareket
+satırlarıyla aynı transaction içinde korumalı göreli UPDATE
+(quantity = quantity - tüketim, quantity >= tüketim) ile tabloya yazılır;
+böylece süreç çökmesi veya birden çok süreç tüketim kaybettirmez ve
+başka süreçlerin satışları ikinci kez satılamaz.
+Malzeme miktarları defterde temel birimde (g, ml, adet) tutulur.
+
+Defter dışındaki ürün stok değişiklikleri SQLAlchemy flush/commit
+olaylarıyla yakalanır ve fark olarak deftere yansıtılır; malzeme
+miktarına doğrudan atama (stok sayımı) o malzemenin defter kaydını
+düşürür. Defter REFRESH_SECONDS aralıkla veritabanından tazelenir.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, func
+from sqlalchemy.orm import Session
+from src.database import DatabaseEngine
+from src.models import Product, Ingredient, IngredientSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class StockLedger:
+    """Ürün/malzeme ID'si -> mevcut stok defteri"""
+
+    # Defterin veritabanından tazelenme aralığı (saniye)
+    REFRESH_SECONDS = float(os.getenv("STOCK_LEDGER_REFRESH_SECONDS", "5"))
+    # Malzeme hareket defterinin anlık görüntü aralığı (saat)
+    SNAPSHOT_HOURS = float(os.getenv("INGREDIENT_SNAPSHOT_HOURS", "24"))
+
+    _products = {}              # product_id -> (kullanılabilir adet, ad)
+    _ingredients = {}           # ingredient_id -> (kullanılabilir temel miktar, ad, birim)
+    _reserved_products = {}     # product_id -> ayrılmış, henüz yazılmamış adet
+    _reserved_ingredients = {}  # ingredient_id -> ayrılmış temel miktar
+    _lock = threading.Lock()
+
+    _refresher = None
+    _stop_event = threading.Event()
+    _last_snapshot = None       # time.monotonic() değeri
+
+    @classmethod
+    def reserve(
+        cls,
+        product_totals: dict,
+        ingredient_needs: dict,
+        products: dict,
+        ingredients: dict
+    ) -> dict:
+        """
+        Sipariş için ürün ve malzeme stoğu ayır (hepsi ya da hiçbiri)
+
+        Deftere henüz girmemiş kalemler verilen ORM nesnelerinin
+        stok değerleriyle başlatılır.
+
+        Args:
+            product_totals: {product_id: adet}
+            ingredient_needs: {ingredient_id: malzemenin stok biriminde miktar}
+            products: {product_id: Product} (yüklü ürünler)
+            ingredients: {ingredient_id: Ingredient} (yüklü malzemeler)
+
+        Returns:
+            dict: Rezervasyon (confirm veya release için saklanmalı)
+
+        Raises:
+            ValueError: Stok yetersizse (hiçbir şey ayrılmaz)
+        """
+        with cls._lock:
+            for product_id in product_totals:
+                if product_id not in cls._products:
+                    product = products[product_id]
+                    cls._products[product_id] = (
+                        (product.quantity or 0) - cls._reserved_products.get(product_id, 0),
+                        product.name
+                    )
+            for ingredient_id in ingredient_needs:
+                if ingredient_id not in cls._ingredients:
+                    ingredient = ingredients[ingredient_id]
+                    cls._load_ingredient(
+                        ingredient_id, ingredient.quantity, ingredient.name, ingredient.unit
+                    )
+
+            for product_id, quantity in product_totals.items():
+                available, name = cls._products[product_id]
+                if available < quantity:
+                    raise ValueError(
+                        f"Yetersiz ürün stoku! {name}: "
+                        f"Mevcut: {available}, İstenen: {quantity}"
+                    )
+
+            base_needs = {}
+            for ingredient_id, required in ingredient_needs.items():
+                available, name, unit = cls._ingredients[ingredient_id]
+                base_needs[ingredient_id] = Ingredient.to_base(required, unit)
+                if available < base_needs[ingredient_id]:
+                    raise ValueError(
+                        f"Yetersiz malzeme stoku! "
+                        f"{name}: Gerekli {required:.4f}{unit}, "
+                        f"Mevcut: {Ingredient.from_base(available, unit):.4f}{unit}"
+                    )
+
+            for product_id, quantity in product_totals.items():
+                available, name = cls._products[product_id]
+                cls._products[product_id] = (available - quantity, name)
+                cls._reserved_products[product_id] = (
+                    cls._reserved_products.get(product_id, 0) + quantity
+                )
+
+            for ingredient_id, required in base_needs.items():
+                available, name, unit = cls._ingredients[ingredient_id]
+                cls._ingredients[ingredient_id] = (available - required, name, unit)
+                cls._reserved_ingredients[ingredient_id] = (
+                    cls._reserved_ingredients.get(ingredient_id, 0) + required
+                )
+
+        return {
+            "products": dict(product_totals),
+            "ingredients": base_needs,
+            "units": {
+                ingredient_id: cls._ingredients[ingredient_id][2]
+                for ingredient_id in base_needs
+            },
+        }
+
+    @classmethod
+    def confirm(cls, reservation: dict) -> None:
+        """
+        Yazılan siparişin rezervasyonunu kesinleştir
+
+        Ürün adetleri ve malzeme tüketimi sipariş ile birlikte tabloya
+        yazılmıştır; defterdeki düşülmüş değer korunur.
+        """
+        with cls._lock:
+            for product_id, quantity in reservation["products"].items():
+                cls._release_reserved(cls._reserved_products, product_id, quantity)
+            for ingredient_id, required in reservation["ingredients"].items():
+                cls._release_reserved(cls._reserved_ingredients, ingredient_id, required)
+
+        cls._ensure_refresher()
+
+    @staticmethod
+    def write_consumption(db: Session, reservations: list) -> None:
+        """
+        Rezervasyonların malzeme tüketimini tabloya yaz (çağıranın transaction'ında)
+
+        Her malzeme tek, korumalı göreli UPDATE ile düşülür; commit veya
+        rollback çağırana aittir.
+
+        Args:
+            db: Satış ve hareket satırlarını yazan oturum
+            reservations: reserve() dönüş değerleri
+
+        Raises:
+            ValueError: Tablodaki stok yetmiyorsa (örn. başka bir süreç düşürdüyse)
+        """
+        totals, units = {}, {}
+        for reservation in reservations:
+            for ingredient_id, required in reservation["ingredients"].items():
+                totals[ingredient_id] = totals.get(ingredient_id, 0) + required
+                units[ingredient_id] = reservation["units"][ingredient_id]
+
+        for ingredient_id, required in totals.items():
+            unit = units[ingredient_id]
+            amount = Ingredient.from_base(required, unit)
+            result = db.execute(
+                update(Ingredient)
+                .where(
+                    Ingredient.id == ingredient_id,
+                    Ingredient.unit == unit,
+                    Ingredient.quantity >= amount - 1e-9
+                )
+                .values(quantity=Ingredient.quantity - amount)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                raise ValueError(
+                    f"Yetersiz malzeme stoku! (Malzeme ID: {ingredient_id}) "
+                    f"Gerekli: {amount:.4f}{unit}"
+                )
+
+    @classmethod
+    def release(cls, reservation: dict) -> None:
+        """Yazılamayan bir siparişin ayrılan stoğunu geri ver"""
+        with cls._lock:
+            for product_id, quantity in reservation["products"].items():
+                cls._release_reserved(cls._reserved_products, product_id, quantity)
+                if product_id in cls._products:
+                    available, name = cls._products[product_id]
+                    cls._products[product_id] = (available + quantity, name)
+            for ingredient_id, required in reservation["ingredients"].items():
+                cls._release_reserved(cls._reserved_ingredients, ingredient_id, required)
+                if ingredient_id in cls._ingredients:
+                    available, name, unit = cls._ingredients[ingredient_id]
+                    cls._ingredients[ingredient_id] = (available + required, name, unit)
+
+    @classmethod
+    def apply_changes(cls, product_deltas: dict) -> None:
+        """
+        Defter dışı ürün stok değişikliklerini fark olarak uygula
+
+        Args:
+            product_deltas: {product_id: adet farkı}
+        """
+        with cls._lock:
+            for product_id, delta in product_deltas.items():
+                if product_id in cls._products:
+                    available, name = cls._products[product_id]
+                    cls._products[product_id] = (available + delta, name)
+
+    @classmethod
+    def available_ingredient(cls, ingredient_id: int):
+        """
+        Malzemenin defterdeki kullanılabilir miktarı (stok biriminde)
+
+        Returns:
+            float | None: Malzeme defterde değilse None
+        """
+        with cls._lock:
+            entry = cls._ingredients.get(ingredient_id)
+        if entry is None:
+            return None
+        return Ingredient.from_base(entry[0], entry[2])
+
+    @classmethod
+    def refresh(cls) -> int:
+        """
+        Defterdeki kalemleri veritabanından tazele
+
+        Başka süreçlerin veya doğrudan SQL değişikliklerinin deftere
+        yansımasını sağlar; tabloya yazma yapılmaz.
+
+        Returns:
+            int: Tazelenen kalem sayısı
+        """
+        with cls._lock:
+            ingredient_ids = list(cls._ingredients)
+            product_ids = list(cls._products)
+
+        if not ingredient_ids and not product_ids:
+            return 0
+
+        db = DatabaseEngine.create_session()
+        try:
+            ingredient_rows = db.execute(
+                select(Ingredient.id, Ingredient.quantity, Ingredient.name, Ingredient.unit)
+                .where(Ingredient.id.in_(ingredient_ids))
+            ).all() if ingredient_ids else []
+            product_rows = db.execute(
+                select(Product.id, Product.quantity, Product.name)
+                .where(Product.id.in_(product_ids))
+            ).all() if product_ids else []
+        finally:
+            db.close()
+
+        with cls._lock:
+            for ingredient_id, quantity, name, unit in ingredient_rows:
+                cls._load_ingredient(ingredient_id, quantity, name, unit)
+            for product_id, quantity, name in product_rows:
+                cls._products[product_id] = (
+                    (quantity or 0) - cls._reserved_products.get(product_id, 0), name
+                )
+
+        return len(ingredient_rows) + len(product_rows)
+
+    @classmethod
+    def forget(cls, product_ids=(), ingredient_ids=()) -> None:
+        """Verilen kalemleri defterden çıkar (bir sonraki kullanımda yeniden yüklenir)"""
+        with cls._lock:
+            for product_id in product_ids:
+                cls._products.pop(product_id, None)
+            for ingredient_id in ingredient_ids:
+                cls._ingredients.pop(ingredient_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Defteri tamamen temizle (kalemler bir sonraki kullanımda yeniden yüklenir)"""
+        with cls._lock:
+            cls._products = {}
+            cls._ingredients = {}
+
+    @classmethod
+    def stop(cls) -> None:
+        """Tazeleme iş parçacığını durdur"""
+        cls._stop_event.set()
+        if cls._refresher is not None:
+            cls._refresher.join()
+            cls._refresher = None
+        cls._stop_event.clear()
+
+    @classmethod
+    def _ensure_refresher(cls) -> None:
+        """Tazeleme iş parçacığını gerekirse başlat"""
+        with cls._lock:
+            if cls._refresher is None or not cls._refresher.is_alive():
+                cls._refresher = threading.Thread(
+                    target=cls._run, name="stock-ledger", daemon=True
+                )
+                cls._refresher.start()
+
+    @classmethod
+    def _run(cls) -> None:
+        """Tazeleme ve anlık görüntü döngüsü"""
+        while not cls._stop_event.wait(cls.REFRESH_SECONDS):
+            try:
+                cls.refresh()
+                cls._snapshot_if_due()
+            except Exception as e:
+                logger.error(f"✗ Stok defteri tazelenemedi: {e}")
+
+    @classmethod
+    def _snapshot_if_due(cls) -> None:
+        """Son anlık görüntü SNAPSHOT_HOURS'tan eskiyse yenisini al"""
+        interval = cls.SNAPSHOT_HOURS * 3600
+        if cls._last_snapshot is not None and time.monotonic() - cls._last_snapshot < interval:
+            return
+
+        db = DatabaseEngine.create_session()
+        try:
+            latest = db.execute(select(func.max(IngredientSnapshot.created_at))).scalar()
+            age = (datetime.utcnow() - latest).total_seconds() if latest else interval
+            if age >= interval:
+                count = IngredientSnapshot.take(db)
+                logger.info(f"✓ Malzeme stok görüntüsü alındı ({count} malzeme)")
+                age = 0
+            cls._last_snapshot = time.monotonic() - age
+        finally:
+            db.close()
+
+    @classmethod
+    def _load_ingredient(cls, ingredient_id: int, quantity: float, name: str, unit: str) -> None:
+        """Tablodaki değerden defter kaydı oluştur (kilit altında çağrılır)"""
+        cls._ingredients[ingredient_id] = (
+            Ingredient.to_base(quantity or 0, unit)
+            - cls._reserved_ingredients.get(ingredient_id, 0),
+            name,
+            unit
+        )
+
+    @staticmethod
+    def _release_reserved(reserved: dict, key: int, amount: float) -> None:
+        remaining = reserved.get(key, 0) - amount
+        if abs(remaining) < 1e-9:
+            reserved.pop(key, None)
+        else:
+            reserved[key] = remaining
+
+
+# Süreç kapanırken tazeleme iş parçacığını durdur
+atexit.register(StockLedger.stop)
+
+
+# ============================================================
+# DEFTER DIŞI DEĞİŞİKLİKLER (FLUSH/COMMIT OLAYLARI)
+# ============================================================
+
+_PENDING_KEY = "stock_ledger_pending"
+
+# Bu bayrakla işaretlenen oturumların stok yazımları defterde zaten işlenmiştir
+SYNCED_SESSION_KEY = "stock_ledger_synced"
+
+
+def _quantity_delta(obj) -> float:
+    """Flush edilen nesnenin stok miktarı farkı (yeni - eski)"""
+    history = inspect(obj).attrs.quantity.history
+    if not history.has_changes() or not history.deleted:
+        return 0
+    return (history.added[0] if history.added else 0) - (history.deleted[0] or 0)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stock_changes(session, flush_context):
+    """Flush edilen ürün/malzeme stok değişikliklerini topla"""
+    if session.info.get(SYNCED_SESSION_KEY):
+        return
+
+    # (ürün farkları, defterden çıkarılacak ürünler, defterden çıkarılacak malzemeler)
+    pending = None
+    for obj in session.dirty:
+        if isinstance(obj, Product):
+            delta = _quantity_delta(obj)
+            if delta:
+                pending = pending or session.info.setdefault(_PENDING_KEY, ({}, set(), set()))
+                pending[0][obj.id] = pending[0].get(obj.id, 0) + delta
+        elif isinstance(obj, Ingredient):
+            state = inspect(obj).attrs
+            if state.quantity.history.has_changes() or state.unit.history.has_changes():
+                # Stok sayımı veya birim değişikliği: kayıt tablodan yeniden yüklenir
+                pending = pending or session.info.setdefault(_PENDING_KEY, ({}, set(), set()))
+                pending[2].add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, (Product, Ingredient)):
+            pending = pending or session.info.setdefault(_PENDING_KEY, ({}, set(), set()))
+            (pending[1] if isinstance(obj, Product) else pending[2]).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_stock_changes(session):
+    """Commit edilen stok değişikliklerini deftere yansıt"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        StockLedger.apply_changes(pending[0])
+        StockLedger.forget(pending[1], pending[2])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stock_changes(session):
+    """Geri alınan işlemin bekleyen stok değişikliklerini bırak"""
+    session.info.pop(_PENDING_KEY, None)
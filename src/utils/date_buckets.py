@@ -0,0 +1,114 @@
+"""
+📅 Tarih Dilimleme Yardımcıları
+
+Yıl/ay/gün filtrelerini indeks dostu, yarı açık `created_at` aralıklarına
+([başlangıç, bitiş)) çevirir ve veritabanı lehçesine uygun dilim
+ifadeleri üretir (SQLite: strftime, PostgreSQL: to_char).
+
+Kolon üzerinde fonksiyon çağıran filtreler (ör. strftime('%Y', ...) = '2025')
+indeks kullanamaz; bu modüldeki aralıklar ise doğrudan indekslenmiş
+kolonla karşılaştırılır.
+"""
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, func, cast, extract, Integer, String
+
+
+# Dilim birimi: (SQLite strftime biçimi, PostgreSQL to_char biçimi)
+BUCKET_FORMATS = {
+    "year": ("%Y", "YYYY"),
+    "month": ("%Y-%m", "YYYY-MM"),
+    "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "hour": ("%H", "HH24"),
+    "month_of_year": ("%m", "MM"),
+}
+
+
+def period_range(year: int, month: int = None, day: int = None) -> tuple:
+    """
+    Yıl, ay veya günü yarı açık datetime aralığına çevir
+
+    Örnek: (2025, 2) -> (2025-02-01 00:00, 2025-03-01 00:00)
+
+    Args:
+        year: Yıl
+        month: Ay (isteğe bağlı)
+        day: Gün (isteğe bağlı, ay gerektirir)
+
+    Returns:
+        tuple: (başlangıç, bitiş) — bitiş hariç
+    """
+    if day is not None and month is None:
+        raise ValueError("Gün filtresi için ay belirtilmelidir!")
+
+    if day is not None:
+        start = date(year, month, day)
+        end = start + timedelta(days=1)
+    elif month is not None:
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    else:
+        start = date(year, 1, 1)
+        end = date(year + 1, 1, 1)
+
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end, datetime.min.time()),
+    )
+
+
+def days_range(start_day: date, end_day: date) -> tuple:
+    """
+    Gün aralığını (iki uç dahil) yarı açık datetime aralığına çevir
+
+    Returns:
+        tuple: (ilk gün 00:00, son günden sonraki gün 00:00)
+    """
+    return (
+        datetime.combine(start_day, datetime.min.time()),
+        datetime.combine(end_day + timedelta(days=1), datetime.min.time()),
+    )
+
+
+def in_range(column, start: datetime, end: datetime):
+    """Yarı açık aralık filtresi: start <= column < end"""
+    return and_(column >= start, column < end)
+
+
+def in_period(column, year: int, month: int = None, day: int = None):
+    """
+    Yıl/ay/gün filtresini sargable aralık ifadesine çevir
+
+    Örnek: in_period(Expense.created_at, 2025) ->
+        created_at >= '2025-01-01' AND created_at < '2026-01-01'
+    """
+    return in_range(column, *period_range(year, month, day))
+
+
+def date_bucket(db, column, unit: str):
+    """
+    Tarih kolonunu lehçeye uygun dilim anahtarına (metin) çevir
+
+    Args:
+        db: Veritabanı oturumu (lehçe tespiti için)
+        column: Tarih/zaman kolonu
+        unit: Dilim birimi (year, month, day, hour, month_of_year, weekday)
+
+    Returns:
+        SQL ifadesi (ör. 'day' için '2025-03-14', 'weekday' için
+        '0' (Pazar) .. '6' (Cumartesi))
+    """
+    if unit not in BUCKET_FORMATS and unit != "weekday":
+        raise ValueError(f"Geçersiz tarih dilimi: {unit}")
+
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    if unit == "weekday":
+        # to_char('D') 1=Pazar'dan başlar; SQLite %w ile aynı değerler için EXTRACT(DOW)
+        if sqlite:
+            return func.strftime("%w", column)
+        return cast(extract("dow", column), Integer).cast(String)
+
+    sqlite_format, postgresql_format = BUCKET_FORMATS[unit]
+    if sqlite:
+        return func.strftime(sqlite_format, column)
+    return func.to_char(column, postgresql_format)
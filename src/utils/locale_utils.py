@@ -7,6 +7,8 @@ Tarih, saat, para birimi ve sayı formatı Türkiye standardına göre.
 from datetime import datetime
 from decimal import Decimal
 from typing import Union
+import numpy as np
+import pandas as pd
 
 
 # Türkiye Tarih/Saat Ayarları
@@ -123,6 +125,126 @@ def format_datetime(dt_obj: datetime, fmt: str = DATETIME_FORMAT) -> str:
     return dt_obj.strftime(fmt)
 
 
+# ============================================================
+# SÜTUN (SERIES) BİÇİMLENDİRME
+# ============================================================
+
+def _format_numbers(values, decimal_places: int, suffix: str, na_rep: str) -> pd.Series:
+    """Farklı değerleri bir kez biçimlendirip sütuna yay"""
+    numbers = values if isinstance(values, pd.Series) else pd.Series(values)
+    if not pd.api.types.is_float_dtype(numbers):
+        # Decimal / None / karışık değerler
+        numbers = pd.to_numeric(numbers.astype(object), errors="coerce").astype(float)
+
+    codes, uniques = pd.factorize(numbers.to_numpy())
+    format_str = f"{{:,.{decimal_places}f}}".format
+    # Ayırıcı değişimi ve sembol ekleme tüm etiketler birleştirilip tek seferde yapılır
+    text = "\n".join(map(format_str, uniques.tolist()))
+    text = text.replace(",", " ").replace(".", ",").replace(" ", ".")
+    text = text.replace("\n", suffix + "\n") + suffix
+    labels = np.array((text.split("\n") if len(uniques) else []) + [na_rep], dtype=object)
+
+    # factorize boş değerlere -1 verir: son etiket (na_rep)
+    return pd.Series(labels[codes], index=numbers.index, dtype=object)
+
+
+def format_number_series(values, decimal_places: int = 2, na_rep: str = "-") -> pd.Series:
+    """
+    Sayı sütununu tek seferde Türkiye formatına çevir
+
+    Değerler önce tekilleştirilir (pd.factorize); yalnızca farklı değerler
+    biçimlendirilir ve sonuç kodlarla tüm sütuna yayılır. Satış tablolarında
+    fiyatlar çok tekrarlandığından 50 bin satır birkaç yüz biçimlendirmeye iner.
+
+    Örnek: [1234.5678, None] -> ["1.234,57", "-"]
+
+    Args:
+        values: Series, dizi veya liste (float/Decimal/None)
+        decimal_places: Ondalık basamak sayısı
+        na_rep: Boş değerlerin gösterimi
+
+    Returns:
+        pd.Series: Biçimlendirilmiş metin sütunu (girdi indeksiyle)
+    """
+    return _format_numbers(values, decimal_places, "", na_rep)
+
+
+def format_currency_series(values, symbol: str = CURRENCY_SYMBOL, na_rep: str = "-") -> pd.Series:
+    """
+    Tutar sütununu tek seferde Türkiye formatına çevir
+
+    Örnek: [1234.56, 50] -> ["1.234,56 ₺", "50,00 ₺"]
+
+    Args:
+        values: Series, dizi veya liste
+        symbol: Para birimi sembolü (varsayılan: ₺)
+        na_rep: Boş değerlerin gösterimi
+
+    Returns:
+        pd.Series: Biçimlendirilmiş metin sütunu
+    """
+    return _format_numbers(values, 2, f" {symbol}", na_rep)
+
+
+def format_datetime_series(values, fmt: str = DATETIME_FORMAT, na_rep: str = "-") -> pd.Series:
+    """
+    Tarih-saat sütununu tek seferde biçimlendir
+
+    Args:
+        values: Series, dizi veya liste (datetime/None)
+        fmt: Format string (varsayılan: DD.MM.YYYY HH:MM:SS)
+        na_rep: Boş değerlerin gösterimi
+
+    Returns:
+        pd.Series: Biçimlendirilmiş metin sütunu
+    """
+    stamps = values if isinstance(values, pd.Series) else pd.Series(values)
+    stamps = pd.to_datetime(stamps, errors="coerce")
+
+    # Formatın göstermediği hassasiyet atılır (ör. tarih formatında saat);
+    # böylece aynı güne/dakikaya düşen kayıtlar bir kez biçimlendirilir
+    if "%f" not in fmt and "%S" not in fmt:
+        shows_time = any(token in fmt for token in ("%H", "%I", "%M"))
+        stamps = stamps.dt.floor("min" if shows_time else "D")
+
+    codes, uniques = pd.factorize(stamps)
+    labels = np.array(
+        [value.strftime(fmt) for value in uniques.to_pydatetime()] + [na_rep],
+        dtype=object
+    )
+    return pd.Series(labels[codes], index=stamps.index, dtype=object)
+
+
+def format_frame(
+    df: pd.DataFrame,
+    currency: tuple = (),
+    number: tuple = (),
+    datetime_columns: dict = None,
+    decimal_places: int = 2
+) -> pd.DataFrame:
+    """
+    Tablonun sütunlarını görüntüleme için toplu biçimlendir
+
+    Args:
+        df: Ham değerli tablo (sayılar ve datetime'lar)
+        currency: Tutar sütunları
+        number: Sayı sütunları
+        datetime_columns: {sütun: format} tarih-saat sütunları
+        decimal_places: Sayı sütunlarının ondalık basamağı
+
+    Returns:
+        pd.DataFrame: Biçimlendirilmiş kopya
+    """
+    formatted = df.copy()
+    for column in currency:
+        formatted[column] = format_currency_series(df[column])
+    for column in number:
+        formatted[column] = format_number_series(df[column], decimal_places)
+    for column, fmt in (datetime_columns or {}).items():
+        formatted[column] = format_datetime_series(df[column], fmt)
+    return formatted
+
+
 def get_month_name_tr(month: int) -> str:
     """
     Ay numarasını Türkçe ay adıyla döndür
@@ -0,0 +1,83 @@
+"""
+Malzeme Hareket Defteri Testi
+Test: quantities_at, anlık görüntüden önceki bir an için tüm geçmişten,
+sonraki bir an için "görüntü + sonraki hareketler" ile aynı stoğu vermeli
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models import IngredientMovement, IngredientSnapshot, Sale
+from src.modules.sales import SalesManager
+
+
+def _move(db, ingredient_id: int, quantity: float, at: datetime) -> None:
+    db.add(IngredientMovement(
+        ingredient_id=ingredient_id,
+        movement_type="GİRİŞ" if quantity > 0 else "ÇIKIŞ",
+        quantity=quantity,
+        reason="Test",
+        created_at=at
+    ))
+    db.commit()
+
+
+def _backdate_opening_stock(db, at: datetime) -> None:
+    """Örnek verinin açılış stoku hareketini geçmişe al"""
+    db.execute(update(IngredientMovement).values(created_at=at))
+    db.commit()
+
+
+def test_quantities_before_and_after_snapshot(db, latte):
+    _, milk_id = latte
+    now = datetime.utcnow()
+    _backdate_opening_stock(db, now - timedelta(days=1))
+    assert IngredientMovement.quantity_at(db, milk_id) == 10000  # Açılış stoku (10 l)
+
+    _move(db, milk_id, 2000, now - timedelta(hours=3))
+    _move(db, milk_id, -500, now - timedelta(hours=2))
+    before_snapshot = now - timedelta(hours=1)
+
+    assert IngredientSnapshot.take(db) >= 1
+    _move(db, milk_id, -300, datetime.utcnow())
+
+    # Görüntüden önce: görüntü kullanılmaz, tüm geçmiş toplanır
+    assert IngredientMovement.quantity_at(db, milk_id, before_snapshot) == 11500
+    assert IngredientMovement.quantity_at(db, milk_id, now - timedelta(hours=2, minutes=30)) == 12000
+    # Görüntüden sonra: görüntü + sonraki hareket
+    assert IngredientMovement.quantity_at(db, milk_id) == 11200
+    assert IngredientMovement.quantities_at(db)[milk_id] == 11200
+
+
+def test_snapshot_replaces_earlier_history(db, latte):
+    _, milk_id = latte
+    before_snapshot = datetime.utcnow() - timedelta(hours=1)
+    _backdate_opening_stock(db, before_snapshot - timedelta(days=1))
+    _move(db, milk_id, -1000, before_snapshot - timedelta(hours=1))
+
+    IngredientSnapshot.take(db)
+    _move(db, milk_id, -250, datetime.utcnow())
+
+    # Görüntüden önceki bir hareket sonradan bozulursa yalnızca
+    # görüntü öncesi sorgular etkilenir: sonraki anlar görüntüden okunur
+    db.execute(
+        update(IngredientMovement)
+        .where(IngredientMovement.quantity == -1000)
+        .values(quantity=-4000)
+    )
+    db.commit()
+
+    assert IngredientMovement.quantity_at(db, milk_id, before_snapshot) == 6000
+    assert IngredientMovement.quantity_at(db, milk_id) == 8750
+
+
+def test_order_consumption_is_logged_per_sale_line(db, latte):
+    product_id, milk_id = latte
+
+    sales = SalesManager.create_order(db, [(product_id, 1), (product_id, 3)], "Nakit")
+
+    logged = {
+        movement.reference_number: movement.quantity
+        for movement in db.query(IngredientMovement).filter_by(movement_type="SATIŞ")
+    }
+    assert logged == {sales[0].sale_number: -200, sales[1].sale_number: -600}
+    assert db.query(Sale).count() == 2
@@ -0,0 +1,101 @@
+"""
+Sorgu Bütçesi Testi
+Test: Satış ve liste ekranlarının SQL ifade sayısı satır sayısıyla
+artmamalı (N+1 gerilemesi assert_max_statements ile yakalanır)
+"""
+
+import pytest
+from src.database import StatementCounter, assert_max_statements
+from src.models import Product, Ingredient, Recipe
+from src.modules.sales import SalesManager
+from src.modules.inventory import InventoryManager
+from src.modules.reports import ReportsManager
+
+
+@pytest.fixture
+def menu(db, latte):
+    """Latte'ye ek olarak iki malzemeli Mocha"""
+    product_id, milk_id = latte
+    latte_product = db.get(Product, product_id)
+    mocha = Product(
+        name="Mocha", code="MOCHA", category_id=latte_product.category_id,
+        price=60, kdv_rate=10, quantity=100
+    )
+    cocoa = Ingredient(name="Kakao", unit="g", cost_per_unit=0.5, quantity=1000)
+    db.add_all([mocha, cocoa])
+    db.flush()
+    db.add_all([
+        Recipe(product_id=mocha.id, ingredient_id=milk_id, quantity=180, unit="ml"),
+        Recipe(product_id=mocha.id, ingredient_id=cocoa.id, quantity=15, unit="g"),
+    ])
+    db.commit()
+
+    # Birkaç satış: geçmiş listeleri boş olmasın
+    SalesManager.create_order(db, [(product_id, 1), (mocha.id, 1), (product_id, 2)], "Nakit")
+    db.expire_all()
+    return product_id, mocha.id
+
+
+def test_create_order_reads_catalog_in_two_selects(db, menu):
+    latte_id, mocha_id = menu
+
+    with StatementCounter() as counter:
+        SalesManager.create_order(
+            db, [(latte_id, 1), (mocha_id, 2), (latte_id, 1)], "Kart"
+        )
+
+    # Ürünler ve reçeteler (malzemeleriyle) birer sorgu; numara sayacı hariç
+    catalog_reads = [
+        statement for statement in counter.statements
+        if statement.lstrip().upper().startswith("SELECT")
+        and "number_sequences" not in statement
+    ]
+    assert len(catalog_reads) == 2, catalog_reads
+
+
+def test_pos_profile_loads_recipe_ingredients(db, menu):
+    _, mocha_id = menu
+
+    with assert_max_statements(1):
+        recipe = SalesManager.get_recipe(db, mocha_id)
+        names = sorted(item.ingredient.name for item in recipe)
+
+    assert names == ["Kakao", "Süt"]
+
+
+def test_history_profile_loads_sale_products(db, menu):
+    with assert_max_statements(1):
+        sales = SalesManager.get_all_sales(db)
+        products = {sale.product.name for sale in sales}
+
+    assert len(sales) == 3
+    assert products == {"Latte", "Mocha"}
+
+
+def test_report_profile_loads_categories_and_recipes(db, menu):
+    # Ürün + kategori (join) ve reçete + malzeme (selectin)
+    with assert_max_statements(2):
+        products = InventoryManager.get_all_products(db, profile="report")
+        rows = [
+            (product.category.name, [item.ingredient.name for item in product.recipe_items])
+            for product in products
+        ]
+
+    assert len(rows) == 2
+    assert all(category == "Sıcak İçecekler" for category, _ in rows)
+
+
+def test_dashboard_snapshot_is_three_statements(db, menu):
+    _, mocha_id = menu
+    for _ in range(5):
+        SalesManager.create_order(db, [(mocha_id, 1)], "Nakit")
+    db.expire_all()
+
+    # Sayaçlar, son satışlar ve düşük stoklu malzemeler
+    with assert_max_statements(3):
+        snapshot = ReportsManager.get_dashboard_snapshot(db, ingredient_threshold=10_000)
+
+    assert snapshot["counts"]["sales"] == 8
+    assert snapshot["counts"]["products"] == 2
+    assert len(snapshot["recent_sales"]) == 8
+    assert {item["name"] for item in snapshot["low_stock_ingredients"]} == {"Süt", "Kakao"}
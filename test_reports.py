@@ -0,0 +1,52 @@
+"""
+Rapor Testi
+Test: Saatlik dağılım datetime ile çağrıldığında o günü raporlamalı; ürün ve
+kategori raporları aralık verilmediğinde tüm zamanları kapsamalı; ısı haritası
+ve saat gruplaması aynı tarih dilimlerini kullanmalı
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models import Sale
+from src.modules.sales import SalesManager
+from src.modules.reports import ReportsManager
+
+
+def test_hourly_sales_accepts_a_datetime(db, latte):
+    product_id, _ = latte
+    sale = SalesManager.create_order(db, [(product_id, 2)], "Nakit")[0]
+
+    hourly = ReportsManager.get_hourly_sales(db, sale.created_at)
+
+    assert hourly == {f"{sale.created_at.hour:02d}:00": 1}
+    assert ReportsManager.get_hourly_sales(db, sale.created_at.date()) == hourly
+
+
+def test_top_products_and_categories_default_to_all_time(db, latte):
+    product_id, _ = latte
+    SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+    SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+    # Bir satış 90 gün önce yapılmış
+    db.execute(
+        update(Sale).where(Sale.id == 1)
+        .values(created_at=datetime.utcnow() - timedelta(days=90))
+    )
+    db.commit()
+
+    assert ReportsManager.get_top_products(db)[0]["count"] == 2
+    assert ReportsManager.get_category_sales(db)["Sıcak İçecekler"]["count"] == 2
+    assert ReportsManager.get_top_products(db, days=30)[0]["count"] == 1
+
+
+def test_heatmap_and_hour_report_share_date_buckets(db, latte):
+    product_id, _ = latte
+    sale = SalesManager.create_order(db, [(product_id, 1)], "Nakit")[0]
+
+    heatmap = ReportsManager.get_sales_heatmap(db)
+    weekday = ReportsManager.WEEKDAYS[sale.created_at.weekday()]
+    assert heatmap["count"].loc[weekday, sale.created_at.hour] == 1
+    assert heatmap["count"].to_numpy().sum() == 1
+
+    # Saat boyutu get_hourly_sales ile aynı biçimde ("00".."23")
+    rows = SalesManager.get_sales_report(db, group_by="hour")
+    assert [row["hour"] for row in rows] == [f"{sale.created_at.hour:02d}"]
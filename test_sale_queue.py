@@ -0,0 +1,144 @@
+"""
+Satış Kuyruğu Testi
+Test: Kuyruktan geçen satışlar yazılmalı; yazılamayan veya onayı zaman
+aşımına uğrayan satışlar ValueError vermeli ve ayrılan stoğu geri vermeli
+"""
+
+import threading
+import pytest
+from sqlalchemy import update
+from src.database import DatabaseEngine
+from src.models import Product, Sale
+from src.modules.sales import SalesManager
+from src.modules.sale_queue import SaleIngestionQueue
+from src.modules.stock_ledger import StockLedger
+
+
+@pytest.fixture
+def queue_enabled(monkeypatch):
+    monkeypatch.setattr(SaleIngestionQueue, "ENABLED", True)
+    monkeypatch.setattr(SaleIngestionQueue, "DURABLE_ACK", True)
+
+
+def _nothing_reserved() -> bool:
+    return not StockLedger._reserved_products and not StockLedger._reserved_ingredients
+
+
+def test_durable_sale_is_written(db, latte, queue_enabled):
+    product_id, _ = latte
+
+    sale = SalesManager.create_sale(db, product_id, 2, "Nakit")
+
+    assert sale.id is not None
+    db.expire_all()
+    assert db.get(Product, product_id).quantity == 98
+    assert _nothing_reserved()
+
+
+def test_failed_write_raises_value_error_and_releases(db, latte, queue_enabled, monkeypatch):
+    product_id, _ = latte
+
+    def fail(batch):
+        raise RuntimeError("disk dolu")
+    monkeypatch.setattr(SaleIngestionQueue, "_commit", staticmethod(fail))
+
+    with pytest.raises(ValueError, match="kaydedilemedi"):
+        SalesManager.create_sale(db, product_id, 1, "Nakit")
+
+    assert _nothing_reserved()
+    assert db.query(Sale).count() == 0
+
+
+def test_fast_ack_failure_is_reported_as_value_error(db, latte, queue_enabled, monkeypatch):
+    product_id, _ = latte
+
+    def fail(batch):
+        raise RuntimeError("disk dolu")
+    monkeypatch.setattr(SaleIngestionQueue, "_commit", staticmethod(fail))
+
+    pending = SaleIngestionQueue.submit(db, [(product_id, 1)], "Nakit", durable=False)
+    SaleIngestionQueue.flush(5)
+
+    assert pending.done()
+    with pytest.raises(ValueError, match="kaydedilemedi"):
+        pending.wait(0)
+    assert _nothing_reserved()
+
+
+def test_timeout_before_pickup_cancels_the_sale(db, latte, queue_enabled, monkeypatch):
+    product_id, _ = latte
+    monkeypatch.setattr(SaleIngestionQueue, "ACK_TIMEOUT", 0.2)
+
+    # Yazıcı ilk satışı yazarken takılı kalır; ikinci satış kuyrukta bekler
+    gate = threading.Event()
+    commit = SaleIngestionQueue._commit
+
+    def slow(batch):
+        gate.wait(5)
+        commit(batch)
+    monkeypatch.setattr(SaleIngestionQueue, "_commit", staticmethod(slow))
+
+    with pytest.raises(ValueError, match="gecikti"):
+        SalesManager.create_sale(db, product_id, 1, "Nakit")
+    with pytest.raises(ValueError, match="kaydedilmedi"):
+        SalesManager.create_sale(db, product_id, 1, "Nakit")
+
+    gate.set()
+    SaleIngestionQueue.flush(5)
+
+    # Yalnızca yazıma alınmış ilk satış kaydedilir
+    assert db.query(Sale).count() == 1
+    db.expire_all()
+    assert db.get(Product, product_id).quantity == 99
+    assert _nothing_reserved()
+
+
+def test_two_registers_selling_the_last_unit(db, latte, queue_enabled):
+    product_id, _ = latte
+    db.get(Product, product_id).quantity = 1
+    db.commit()
+
+    results = []
+    start = threading.Barrier(2)
+
+    def register():
+        session = DatabaseEngine.create_session()
+        try:
+            start.wait()
+            SalesManager.create_sale(session, product_id, 1, "Nakit")
+            results.append("ok")
+        except ValueError:
+            results.append("stok")
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=register) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ["ok", "stok"]
+    db.expire_all()
+    assert db.get(Product, product_id).quantity == 0
+    assert db.query(Sale).count() == 1
+
+
+def test_batch_guard_fails_only_the_short_order(db, latte, queue_enabled):
+    product_id, _ = latte
+    # Defter 100 adet bilir; başka bir süreç stoğu 1'e indirmiş
+    SalesManager.create_sale(db, product_id, 1, "Nakit")
+    db.execute(update(Product).where(Product.id == product_id).values(quantity=1))
+    db.commit()
+
+    first = SaleIngestionQueue.submit(db, [(product_id, 1)], "Nakit", durable=False)
+    second = SaleIngestionQueue.submit(db, [(product_id, 1)], "Nakit", durable=False)
+    SaleIngestionQueue.flush(5)
+
+    assert first.wait(0) == first.sale_numbers
+    with pytest.raises(ValueError, match="Yetersiz ürün stoku"):
+        second.wait(0)
+    db.expire_all()
+    assert db.get(Product, product_id).quantity == 0
+    assert db.query(Sale).count() == 2
+    assert _nothing_reserved()
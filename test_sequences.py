@@ -0,0 +1,105 @@
+"""
+Numara Dağıtıcı Testi
+Test: Aynı sayacı paylaşan iki dağıtıcı (iki kasa süreci) eşzamanlı
+çalıştığında numaralar çakışmamalı; numaralar artan ama boşluklu olabilir
+"""
+
+import threading
+import pytest
+from sqlalchemy import update
+from src.database import SequenceAllocator, assert_max_statements
+from src.models import Ingredient
+from src.modules.sales import SalesManager
+from src.modules.inventory import InventoryManager
+
+THREADS_PER_ALLOCATOR = 4
+VALUES_PER_THREAD = 25
+
+
+def _draw_concurrently(allocators: list) -> list:
+    """Her dağıtıcıdan birden fazla iş parçacığıyla aynı anda numara çek"""
+    values = []
+    lock = threading.Lock()
+    start = threading.Barrier(len(allocators) * THREADS_PER_ALLOCATOR)
+
+    def worker(allocator):
+        start.wait()
+        drawn = [allocator.next_value() for _ in range(VALUES_PER_THREAD)]
+        with lock:
+            values.extend(drawn)
+
+    threads = [
+        threading.Thread(target=worker, args=(allocator,))
+        for allocator in allocators
+        for _ in range(THREADS_PER_ALLOCATOR)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return values
+
+
+def test_two_allocators_never_share_a_number(db):
+    # Ayrı nesneler: ayrı süreçlerdeki dağıtıcılar gibi yalnızca tabloyu paylaşır
+    allocators = [
+        SequenceAllocator("test_numbers", block_size=5),
+        SequenceAllocator("test_numbers", block_size=5),
+    ]
+    values = _draw_concurrently(allocators)
+
+    expected = len(allocators) * THREADS_PER_ALLOCATOR * VALUES_PER_THREAD
+    assert len(values) == expected
+    assert len(set(values)) == expected, "Aynı numara iki kez dağıtıldı"
+
+
+def test_block_size_one_loses_no_block_numbers(db):
+    allocators = [
+        SequenceAllocator("test_numbers", block_size=1),
+        SequenceAllocator("test_numbers", block_size=1),
+    ]
+    values = _draw_concurrently(allocators)
+
+    # Dağıtılan her numara kullanıldı: kalan blok yok
+    assert sorted(values) == list(range(1, len(values) + 1))
+
+
+def test_restart_skips_unused_block_numbers(db):
+    # BLOCK_SIZE > 1 yalnızca artan numara garantisi verir
+    first = SequenceAllocator("test_numbers", block_size=10)
+    assert first.next_values(3) == [1, 2, 3]
+
+    # Yeniden başlayan süreç kalan 4..10 numaralarını bilmez
+    restarted = SequenceAllocator("test_numbers", block_size=10)
+    assert restarted.next_value() == 11
+
+
+def test_multi_value_request_is_one_round_trip(db):
+    allocator = SequenceAllocator("test_numbers", block_size=1)
+    allocator.next_value()
+
+    # Eksik numaralar tek blokta: UPDATE + SELECT
+    with assert_max_statements(2):
+        values = allocator.next_values(5)
+
+    assert values == [2, 3, 4, 5, 6]
+    assert SequenceAllocator("test_numbers", block_size=1).next_value() == 7
+
+
+def test_rolled_back_order_leaves_a_gap(db, latte):
+    product_id, milk_id = latte
+    first = SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+
+    # Başka bir süreç sütü bitirmiş: numara ayrıldıktan sonra sipariş geri alınır
+    db.execute(update(Ingredient).where(Ingredient.id == milk_id).values(quantity=0))
+    db.commit()
+    with pytest.raises(ValueError):
+        SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+
+    InventoryManager.add_ingredient_stock(db, milk_id, 1)
+    second = SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+
+    # Numaralar artan, ancak geri alınan siparişinki tekrar kullanılmaz
+    first_number = int(first[0].sale_number.split("-")[1])
+    second_number = int(second[0].sale_number.split("-")[1])
+    assert second_number == first_number + 2
@@ -0,0 +1,143 @@
+"""
+Stok Defteri Testi
+Test: Eşzamanlı satışlar son stoğu iki kez satamamalı; malzeme tüketimi ve
+stok girişi tabloya satışla/girişle aynı commit'te yazılmalı; defter eski
+kalsa bile tablodaki korumalı UPDATE stoğu eksiye düşürmemeli
+"""
+
+import threading
+import pytest
+from sqlalchemy import update
+from src.database import DatabaseEngine
+from src.models import Product, Ingredient, IngredientMovement, Sale
+from src.modules.sales import SalesManager
+from src.modules.inventory import InventoryManager
+from src.modules.stock_ledger import StockLedger
+
+
+def _sell_concurrently(product_id: int, registers: int = 2) -> list:
+    """Her kasa kendi oturumuyla aynı anda 1 adet satar"""
+    results = []
+    start = threading.Barrier(registers)
+
+    def register():
+        session = DatabaseEngine.create_session()
+        try:
+            start.wait()
+            SalesManager.create_order(session, [(product_id, 1)], "Nakit")
+            results.append("ok")
+        except ValueError:
+            results.append("stok")
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=register) for _ in range(registers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(results)
+
+
+def _quantity(db, model, object_id: int) -> float:
+    db.expire_all()
+    return db.get(model, object_id).quantity
+
+
+def test_two_threads_selling_the_last_product_unit(db, latte):
+    product_id, _ = latte
+    db.get(Product, product_id).quantity = 1
+    db.commit()
+
+    assert _sell_concurrently(product_id) == ["ok", "stok"]
+    assert _quantity(db, Product, product_id) == 0
+    assert db.query(Sale).count() == 1
+    assert not StockLedger._reserved_ingredients
+
+
+def test_two_threads_selling_the_last_ingredient_portion(db, latte):
+    product_id, milk_id = latte
+    # Tek latte'lik süt (200 ml)
+    db.get(Ingredient, milk_id).quantity = 0.2
+    db.commit()
+
+    assert _sell_concurrently(product_id) == ["ok", "stok"]
+    assert db.query(Sale).count() == 1
+    assert abs(_quantity(db, Ingredient, milk_id)) < 1e-9
+
+
+def test_consumption_is_written_with_the_sale(db, latte):
+    product_id, milk_id = latte
+
+    SalesManager.create_order(db, [(product_id, 5)], "Nakit")
+
+    # Tüketim satışla aynı commit'te tabloya ve hareket defterine yazılır
+    assert StockLedger.available_ingredient(milk_id) == 9
+    assert _quantity(db, Ingredient, milk_id) == 9
+    assert IngredientMovement.quantity_at(db, milk_id) == 9000
+    assert not StockLedger._reserved_ingredients
+
+
+def test_sale_fails_when_another_process_used_the_stock(db, latte):
+    product_id, milk_id = latte
+    SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+
+    # Defter 9.8 l bilir; başka bir süreç sütü 0.1 l'ye indirmiş
+    db.execute(update(Ingredient).where(Ingredient.id == milk_id).values(quantity=0.1))
+    db.commit()
+
+    with pytest.raises(ValueError, match="Yetersiz malzeme stoku"):
+        SalesManager.create_order(db, [(product_id, 1)], "Nakit")
+
+    assert db.query(Sale).count() == 1
+    assert _quantity(db, Ingredient, milk_id) == 0.1
+    assert not StockLedger._reserved_ingredients
+
+    # Tazeleme sonrası defter tablodaki değeri görür
+    StockLedger.refresh()
+    assert StockLedger.available_ingredient(milk_id) == 0.1
+
+
+def test_stock_entry_updates_quantity_immediately(db, latte):
+    product_id, milk_id = latte
+    SalesManager.create_order(db, [(product_id, 5)], "Nakit")
+
+    InventoryManager.add_ingredient_stock(db, milk_id, 2)
+
+    assert _quantity(db, Ingredient, milk_id) == 11
+    assert IngredientMovement.quantity_at(db, milk_id) == 11000
+
+    # Kalan 11 l tam 55 latte'ye yeter
+    SalesManager.create_order(db, [(product_id, 55)], "Nakit")
+    assert abs(StockLedger.available_ingredient(milk_id)) < 1e-9
+    assert abs(_quantity(db, Ingredient, milk_id)) < 1e-9
+
+
+def test_manual_count_replaces_ledger_entry(db, latte):
+    product_id, milk_id = latte
+    SalesManager.create_order(db, [(product_id, 5)], "Nakit")
+    assert _quantity(db, Ingredient, milk_id) == 9
+
+    # Sayım: rafta 7 l süt var
+    db.get(Ingredient, milk_id).quantity = 7
+    db.commit()
+
+    assert StockLedger.available_ingredient(milk_id) is None
+    assert IngredientMovement.quantity_at(db, milk_id) == 7000
+
+    # Sayımdan sonraki satışlar sayılan değerden düşülür
+    SalesManager.create_order(db, [(product_id, 5)], "Nakit")
+    assert _quantity(db, Ingredient, milk_id) == 6
+    assert StockLedger.available_ingredient(milk_id) == 6
+    assert IngredientMovement.quantity_at(db, milk_id) == 6000
+
+
+def test_stock_removal_updates_quantity_immediately(db, latte):
+    _, milk_id = latte
+
+    InventoryManager.remove_ingredient_stock(db, milk_id, 1.5, reason="Fire")
+
+    assert _quantity(db, Ingredient, milk_id) == 8.5
+    assert IngredientMovement.quantity_at(db, milk_id) == 8500
+    assert StockLedger.available_ingredient(milk_id) == 8.5
+    assert not StockLedger._reserved_ingredients